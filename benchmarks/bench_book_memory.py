@@ -0,0 +1,102 @@
+"""
+Benchmark de memoria de los libros: la dataclass original (con __dict__ e
+id en texto), `Book` con slots y `BookBatch` columnar.
+
+Las filas se generan como llegarían del scraping o de SQLite: cada campo es
+una cadena nueva, aunque el autor o el formato se repitan.
+
+Uso:
+    python -m benchmarks.bench_book_memory --records 1000000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Iterator, Tuple
+
+from src.domain.entities.book import Book
+from src.domain.entities.book_batch import BookBatch
+
+FORMATS = ["pdf", "epub", "djvu", "mobi", "azw3"]
+
+
+@dataclass
+class LegacyBook:
+    """Copia de la entidad Book anterior"""
+    id: str
+    title: str
+    author: str
+    url: str
+    cover_url: str
+    file_format: str
+
+
+def rows(count: int) -> Iterator[Tuple[int, str, str, str, str, str]]:
+    for i in range(count):
+        yield (
+            i,
+            f"Título del libro número {i}",
+            "".join(["Autor ", str(i % 20000)]),  # ~50 libros por autor
+            f"https://libgen.is/book/index.php?md5={i:032x}",
+            f"https://libgen.is/covers/{i // 1000}/{i:032x}.jpg",
+            "".join(FORMATS[i % len(FORMATS)]),  # cadena nueva, como al parsear
+        )
+
+
+def build_legacy(count: int):
+    return [LegacyBook(str(i), t, a, u, c, f) for i, t, a, u, c, f in rows(count)]
+
+
+def build_slotted(count: int):
+    return [Book(str(i), t, a, u, c, f) for i, t, a, u, c, f in rows(count)]
+
+
+def build_batch(count: int):
+    batch = BookBatch()
+    for row in rows(count):
+        batch.append_row(*row)
+    return batch
+
+
+def measure(build: Callable[[int], object], count: int) -> Tuple[float, float, float]:
+    """Devuelve MB retenidos, segundos de construcción y segundos de recorrido"""
+    gc.collect()
+    tracemalloc.start()
+    container = build(count)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del container
+    gc.collect()
+
+    start = time.perf_counter()
+    container = build(count)
+    build_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for book in container:
+        book.title
+    iterate_time = time.perf_counter() - start
+    del container
+    gc.collect()
+    return retained / 1024 ** 2, build_time, iterate_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    print(f"{args.records:,} libros")
+    print(f"{'contenedor':<22}{'MB':>10}{'B/libro':>10}{'crear s':>10}{'recorrer s':>12}")
+    for name, build in [
+        ("dataclass original", build_legacy),
+        ("Book con slots", build_slotted),
+        ("BookBatch", build_batch),
+    ]:
+        mb, build_time, iterate_time = measure(build, args.records)
+        per_record = mb * 1024 ** 2 / args.records
+        print(f"{name:<22}{mb:>10.1f}{per_record:>10.0f}{build_time:>10.2f}{iterate_time:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Benchmark de descarga: ruta anterior (sesión nueva, fragmentos de 8 KB y
+escritura síncrona) frente a FileDownloader (cliente compartido y escritura
+por bloques en un hilo) con una sola conexión, por tramos desde el principio
+y en modo adaptativo (el predeterminado: una conexión que pasa a tramos si
+resulta lenta).
+
+Con `--throttle-mb-s` el servidor limita cada conexión a esa velocidad, como
+hacen muchos mirrors; es el caso en que los tramos compensan.
+
+Uso:
+    python -m benchmarks.bench_download --size-mb 300 --repeat 3
+    python -m benchmarks.bench_download --size-mb 100 --throttle-mb-s 5
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import tempfile
+import time
+from pathlib import Path
+
+import aiohttp
+from aiohttp import web
+
+from src.infrastructure.network import FileDownloader, HttpClient
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _serve(file_path: str, port: int, throttle: float = 0.0):
+    size = os.path.getsize(file_path)
+    headers = {"Accept-Ranges": "bytes", "ETag": '"payload"'}
+
+    async def handler(request):
+        if not throttle:
+            return web.FileResponse(file_path)
+        # Respuesta propia para limitar los bytes/s de cada conexión
+        start, end = 0, size - 1
+        if request.http_range.start is not None:
+            start = request.http_range.start
+            end = min(request.http_range.stop - 1, end) if request.http_range.stop else end
+        length = end - start + 1
+        response_headers = dict(headers, **{"Content-Length": str(length)})
+        status = 200
+        if request.headers.get("Range"):
+            status = 206
+            response_headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        if request.method == "HEAD":
+            return web.Response(status=status, headers=response_headers)
+        response = web.StreamResponse(status=status, headers=response_headers)
+        await response.prepare(request)
+        chunk_size = 64 * 1024
+        started = time.perf_counter()
+        sent = 0
+        try:
+            with open(file_path, "rb") as f:
+                f.seek(start)
+                while sent < length:
+                    chunk = f.read(min(chunk_size, length - sent))
+                    await response.write(chunk)
+                    sent += len(chunk)
+                    ahead = sent / throttle - (time.perf_counter() - started)
+                    if ahead > 0:
+                        await asyncio.sleep(ahead)
+            await response.write_eof()
+        except ConnectionError:
+            pass  # el modo adaptativo corta la conexión única al pasar a tramos
+        return response
+
+    app = web.Application()
+    app.router.add_get("/file", handler)
+    web.run_app(app, host="127.0.0.1", port=port, print=None)
+
+
+def _make_payload(path: Path, size_mb: int):
+    block = os.urandom(1024 * 1024)
+    with open(path, "wb") as f:
+        for _ in range(size_mb):
+            f.write(block)
+
+
+async def _noop_progress(current: int, total: int):
+    pass
+
+
+async def legacy_download(url: str, file_path: str):
+    """Copia de la implementación original de BookDownloader.download_file"""
+    async with aiohttp.ClientSession() as session:
+        async with session.get(url) as response:
+            response.raise_for_status()
+            total_size = int(response.headers.get('Content-Length', 0))
+            downloaded = 0
+            with open(file_path, 'wb') as f:
+                async for chunk in response.content.iter_chunked(8192):
+                    f.write(chunk)
+                    downloaded += len(chunk)
+                    await _noop_progress(downloaded, total_size)
+    return file_path
+
+
+async def _measure(name: str, func, url: str, target: str, repeat: int) -> dict:
+    walls, cpus = [], []
+    for _ in range(repeat):
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        await func(url, target)
+        walls.append(time.perf_counter() - wall_start)
+        cpus.append(time.process_time() - cpu_start)
+    size = os.path.getsize(target)
+    best = min(walls)
+    return {
+        "name": name,
+        "bytes": size,
+        "best_seconds": round(best, 3),
+        "throughput_mb_s": round(size / best / 2**20, 1),
+        "cpu_seconds": round(min(cpus), 3),
+    }
+
+
+async def run(size_mb: int, repeat: int, throttle: float = 0.0) -> list:
+    with tempfile.TemporaryDirectory() as tmp:
+        payload = Path(tmp) / "payload.bin"
+        _make_payload(payload, size_mb)
+        port = _free_port()
+        server = multiprocessing.Process(target=_serve, args=(str(payload), port, throttle), daemon=True)
+        server.start()
+        url = f"http://127.0.0.1:{port}/file"
+        try:
+            for _ in range(50):  # esperar a que el servidor acepte conexiones
+                try:
+                    socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+                    break
+                except OSError:
+                    await asyncio.sleep(0.1)
+
+            client = HttpClient()
+
+            def mode(**options):
+                # Un FileDownloader nuevo por descarga: el modo adaptativo no
+                # recuerda hosts lentos de la repetición anterior
+                async def download(url, target):
+                    return await FileDownloader(client, **options).download(url, target, _noop_progress)
+                return download
+
+            target = str(Path(tmp) / "out.bin")
+            results = [
+                await _measure("legacy (8 KB, escritura síncrona)", legacy_download, url, target, repeat),
+                await _measure("FileDownloader, una conexión", mode(segments=1), url, target, repeat),
+                await _measure("FileDownloader, tramos", mode(adaptive=False), url, target, repeat),
+                await _measure("FileDownloader, adaptativo", mode(), url, target, repeat),
+            ]
+            await client.close()
+            return results
+        finally:
+            server.terminate()
+            server.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--throttle-mb-s", type=float, default=0.0, help="límite por conexión del servidor (0: sin límite)")
+    args = parser.parse_args()
+
+    for result in asyncio.run(run(args.size_mb, args.repeat, args.throttle_mb_s * 2**20)):
+        print(
+            f"{result['name']:<36} {result['throughput_mb_s']:>8} MB/s "
+            f"{result['best_seconds']:>7} s  cpu {result['cpu_seconds']} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Benchmark de emparejadores de portadas: fuerza bruta con verificación
+cruzada frente a FLANN-LSH con test de ratio, con y sin RANSAC.
+
+Cada portada se compara con una "foto" suya (deformación de perspectiva,
+giro, cambio de brillo, ruido y desenfoque sobre un fondo) y con el resto
+de portadas. Se mide el tiempo por comparación, el acierto top-1 (la
+portada correcta es la mejor puntuada) y cuántos pares verdaderos y falsos
+supera el umbral de `is_match` de cada emparejador.
+
+Sin `--covers` las portadas se generan; con `--covers DIR` se usan las
+imágenes de esa carpeta.
+
+Uso:
+    python -m benchmarks.bench_matchers --pairs 40
+    python -m benchmarks.bench_matchers --covers ~/portadas
+"""
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+
+from src.infrastructure.cache import CoverCache
+from src.infrastructure.ml.descriptor_index import CoverFeatures
+from src.infrastructure.ml.feature_matching_model import FeatureMatchingModel
+
+BACKENDS = [
+    ("bf", False),
+    ("bf", True),
+    ("flann", False),
+    ("flann", True),
+]
+
+
+def synthetic_cover(rng: np.random.Generator, width: int = 300, height: int = 450) -> np.ndarray:
+    """Portada inventada: fondo con textura, formas y un título"""
+    noise = rng.integers(0, 256, (height // 8, width // 8), dtype=np.uint8)
+    cover = cv2.resize(noise, (width, height), interpolation=cv2.INTER_CUBIC)
+    for _ in range(rng.integers(4, 9)):
+        color = int(rng.integers(0, 256))
+        x1, y1 = int(rng.integers(0, width)), int(rng.integers(0, height))
+        x2, y2 = int(rng.integers(0, width)), int(rng.integers(0, height))
+        if rng.random() < 0.5:
+            cv2.rectangle(cover, (x1, y1), (x2, y2), color, -1)
+        else:
+            cv2.circle(cover, (x1, y1), int(rng.integers(10, 80)), color, -1)
+    words = ["LIBRO", "REVISTA", "HISTORIA", "CIENCIA", "NOVELA", "VOL", "2024"]
+    for row in range(3):
+        text = " ".join(rng.choice(words, 2))
+        cv2.putText(cover, text, (15, 80 + row * 60), cv2.FONT_HERSHEY_SIMPLEX, 0.9, 255, 2)
+    return cover
+
+
+def synthetic_photo(cover: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Foto simulada de una portada: perspectiva, giro, luz, ruido y desenfoque"""
+    height, width = cover.shape
+    canvas_w, canvas_h = int(width * 1.6), int(height * 1.4)
+    jitter = 0.12
+    src = np.float32([[0, 0], [width, 0], [width, height], [0, height]])
+    offset = np.float32([(canvas_w - width) / 2, (canvas_h - height) / 2])
+    dst = (src + offset + rng.uniform(-jitter, jitter, (4, 2)) * [width, height]).astype(np.float32)
+    matrix = cv2.getPerspectiveTransform(src, dst)
+
+    background = cv2.GaussianBlur(rng.integers(0, 256, (canvas_h, canvas_w), dtype=np.uint8), (31, 31), 0)
+    warped = cv2.warpPerspective(cover, matrix, (canvas_w, canvas_h))
+    mask = cv2.warpPerspective(np.full_like(cover, 255), matrix, (canvas_w, canvas_h))
+    photo = np.where(mask > 0, warped, background)
+
+    angle = rng.uniform(-10, 10)
+    rotation = cv2.getRotationMatrix2D((canvas_w / 2, canvas_h / 2), angle, rng.uniform(0.8, 1.2))
+    photo = cv2.warpAffine(photo, rotation, (canvas_w, canvas_h), borderMode=cv2.BORDER_REFLECT)
+
+    photo = cv2.convertScaleAbs(photo, alpha=rng.uniform(0.7, 1.3), beta=rng.uniform(-30, 30))
+    photo = cv2.GaussianBlur(photo, (3, 3), 0)
+    noise = rng.normal(0, 6, photo.shape)
+    return np.clip(photo + noise, 0, 255).astype(np.uint8)
+
+
+def load_covers(folder: Path, limit: int) -> List[np.ndarray]:
+    covers = []
+    for path in sorted(folder.iterdir()):
+        image = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+        if image is not None:
+            covers.append(image)
+        if len(covers) >= limit:
+            break
+    return covers
+
+
+def features(orb, image: np.ndarray) -> CoverFeatures:
+    keypoints, descriptors = orb.detectAndCompute(image, None)
+    return FeatureMatchingModel._features(keypoints, descriptors)
+
+
+def run_backend(
+    model: FeatureMatchingModel,
+    photos: List[CoverFeatures],
+    covers: List[CoverFeatures]
+) -> Tuple[float, float, float, float]:
+    """Devuelve ms por comparación, acierto top-1, verdaderos y falsos positivos"""
+    timings, top1, true_pos, false_pos = [], 0, 0, 0
+    for index, photo in enumerate(photos):
+        scores = []
+        for cover in covers:
+            start = time.perf_counter()
+            n_matches, ratio = model.score_features(photo, cover)
+            timings.append(time.perf_counter() - start)
+            scores.append((ratio, n_matches))
+        best = max(range(len(covers)), key=lambda i: scores[i])
+        top1 += best == index
+        for cover_index, (ratio, n_matches) in enumerate(scores):
+            if model.is_match(n_matches, ratio):
+                if cover_index == index:
+                    true_pos += 1
+                else:
+                    false_pos += 1
+    n_photos = len(photos)
+    n_negatives = max(n_photos * (len(covers) - 1), 1)
+    return (
+        statistics.mean(timings) * 1000,
+        top1 / n_photos,
+        true_pos / n_photos,
+        false_pos / n_negatives,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pairs", type=int, default=30)
+    parser.add_argument("--covers", type=Path, default=None)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    if args.covers:
+        cover_images = load_covers(args.covers.expanduser(), args.pairs)
+    else:
+        cover_images = [synthetic_cover(rng) for _ in range(args.pairs)]
+    photo_images = [synthetic_photo(cover, rng) for cover in cover_images]
+
+    orb = cv2.ORB_create()
+    covers = [features(orb, image) for image in cover_images]
+    photos = [features(orb, image) for image in photo_images]
+    print(f"{len(covers)} pares portada/foto, "
+          f"{statistics.mean(len(c) for c in covers):.0f} keypoints por portada")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cover_cache = CoverCache(tmp)
+        print(f"{'backend':<16}{'ms/comp':>10}{'top-1':>9}{'TPR':>9}{'FPR':>9}")
+        for matcher, ransac in BACKENDS:
+            model = FeatureMatchingModel(None, None, cover_cache, matcher=matcher, ransac=ransac)
+            ms, top1, tpr, fpr = run_backend(model, photos, covers)
+            name = matcher + ("+ransac" if ransac else "")
+            print(f"{name:<16}{ms:>10.2f}{top1:>9.1%}{tpr:>9.1%}{fpr:>9.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark de reconocimiento de voz: latencia y tasa de error por palabra
+(WER) de cada motor sobre grabaciones en español.
+
+Cada fixture es un `.wav` con su transcripción de referencia en un `.txt`
+del mismo nombre. Se mide la primera llamada (incluye cargar el modelo
+local) y la media de las siguientes. El texto se compara sin acentos ni
+mayúsculas ni signos.
+
+Uso:
+    python -m benchmarks.bench_speech --fixtures ~/fixtures_es --backends google,vosk,whisper
+"""
+import argparse
+import statistics
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+import speech_recognition as sr
+
+from src.infrastructure.ml.speech_recognition_model import create_backend
+from src.infrastructure.search.trigram_index import fold
+
+
+def word_errors(reference: str, hypothesis: str) -> Tuple[int, int]:
+    """Distancia de edición por palabras y número de palabras de la referencia"""
+    ref, hyp = fold(reference).split(), fold(hypothesis).split()
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word)
+            ))
+        previous = current
+    return previous[-1], len(ref)
+
+
+def load_fixtures(folder: Path) -> List[Tuple[Path, str, sr.AudioData]]:
+    fixtures = []
+    for wav_path in sorted(folder.glob("*.wav")):
+        txt_path = wav_path.with_suffix(".txt")
+        if not txt_path.exists():
+            continue
+        with sr.AudioFile(str(wav_path)) as source:
+            audio = sr.Recognizer().record(source)
+        fixtures.append((wav_path, txt_path.read_text(encoding="utf-8").strip(), audio))
+    return fixtures
+
+
+def run_backend(name: str, fixtures) -> Tuple[float, float, float, int]:
+    """Devuelve segundos de la primera llamada, media de las demás, WER y fallos"""
+    backend = create_backend(name)
+    timings, errors, words, failures = [], 0, 0, 0
+    for _, reference, audio in fixtures:
+        start = time.perf_counter()
+        try:
+            text = backend.recognize(audio)
+        except sr.UnknownValueError:
+            text = ""
+        except sr.RequestError as e:
+            print(f"  {name}: {e}")
+            failures += 1
+            text = ""
+        timings.append(time.perf_counter() - start)
+        edit, count = word_errors(reference, text)
+        errors += edit
+        words += count
+    rest = statistics.mean(timings[1:]) if len(timings) > 1 else timings[0]
+    return timings[0], rest, errors / max(words, 1), failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", type=Path, required=True)
+    parser.add_argument("--backends", default="google,vosk,whisper")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures.expanduser())
+    if not fixtures:
+        parser.error(f"No hay pares .wav/.txt en {args.fixtures}")
+    seconds = sum(len(audio.frame_data) / (audio.sample_rate * audio.sample_width) for _, _, audio in fixtures)
+    print(f"{len(fixtures)} grabaciones, {seconds:.0f} s de audio")
+
+    print(f"{'motor':<10}{'1ª s':>8}{'media s':>10}{'WER':>8}{'fallos':>8}")
+    for name in args.backends.split(","):
+        first, mean, wer, failures = run_backend(name.strip(), fixtures)
+        print(f"{name:<10}{first:>8.2f}{mean:>10.2f}{wer:>8.1%}{failures:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark de arranque: cuánto cuesta importar cada dependencia al cargar la
+vista y cuánto tarda la ventana en dibujarse.
+
+Cada medida se hace en un proceso nuevo (con el intérprete incluido), como
+al abrir la aplicación. "Primer dibujo" es el momento en que `main` llama a
+`page.add` con una página simulada: cubre imports, `BookDownloaderApp()` y
+la construcción de los controles, pero no el arranque del cliente de Flet.
+"Servicios listos" añade la construcción de todos los servicios que la
+precarga hace en segundo plano (sin abrir el navegador).
+
+Uso:
+    python -m benchmarks.bench_startup --runs 5
+    python -m benchmarks.bench_startup --module src.presentation.main --top 15
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+FIRST_PAINT = """
+import asyncio
+from src.presentation.views.main_view import BookDownloaderApp
+
+class Page:
+    def __init__(self):
+        self.overlay = []
+        self.tasks = []
+    def add(self, *controls):
+        print("painted", flush=True)
+    def update(self, *controls):
+        pass
+    def run_task(self, handler, *args):
+        self.tasks.append(handler)
+
+app = BookDownloaderApp()
+page = Page()
+app.main(page)
+app.page = None  # la precarga no debe lanzar el navegador
+asyncio.run(app.warm_up())
+print("ready", flush=True)
+"""
+
+_IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def import_times(module: str) -> Tuple[Dict[str, Tuple[int, int]], float]:
+    """Microsegundos (propio, acumulado) de cada paquete raíz y segundos totales del import"""
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    roots: Dict[str, Tuple[int, int]] = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME.match(line)
+        if not match:
+            continue
+        own, cumulative, name = int(match.group(1)), int(match.group(2)), match.group(4)
+        if name == module:
+            total = max(total, cumulative)
+        root = name.split(".")[0]
+        if "." not in name and root not in roots:
+            roots[root] = (own, cumulative)
+    return roots, total / 1e6
+
+
+def first_paint() -> Tuple[float, float]:
+    """Segundos hasta el primer dibujo y hasta tener todos los servicios"""
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", FIRST_PAINT],
+        cwd=ROOT, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+    )
+    painted = ready = float("nan")
+    for line in process.stdout:
+        if line.strip() == "painted":
+            painted = time.perf_counter() - start
+        elif line.strip() == "ready":
+            ready = time.perf_counter() - start
+    process.wait()
+    return painted, ready
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="src.presentation.views.main_view")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    runs: List[Dict[str, Tuple[int, int]]] = []
+    totals = []
+    for _ in range(args.runs):
+        roots, total = import_times(args.module)
+        runs.append(roots)
+        totals.append(total)
+    print(f"import {args.module}: {statistics.median(totals) * 1000:.0f} ms (mediana de {args.runs})")
+    median = {
+        name: statistics.median(run[name][1] for run in runs if name in run)
+        for name in runs[0]
+    }
+    print(f"{'paquete':<24}{'ms':>10}")
+    for name, micros in sorted(median.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{name:<24}{micros / 1000:>10.1f}")
+
+    paints, readies = zip(*(first_paint() for _ in range(args.runs)))
+    print(f"primer dibujo:     {statistics.median(paints) * 1000:>7.0f} ms")
+    print(f"servicios listos:  {statistics.median(readies) * 1000:>7.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
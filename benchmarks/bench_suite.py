@@ -0,0 +1,302 @@
+"""
+Suite de benchmarks reproducible contra un libgen.is simulado en local.
+
+Arranca `benchmarks.libgen_server` en otro proceso y mide, con el código
+de la aplicación:
+- búsqueda de extremo a extremo: primer libro y búsqueda completa, en frío
+  y desde la caché;
+- descarga: MB/s con varios tramos y con una sola conexión, y tiempo hasta
+  el primer byte;
+- filtro por imagen: `CompareImagesService.rank` sobre N portadas, con las
+  cachés vacías y con los descriptores ya indexados;
+- transcripción (opcional): segundos por grabación y WER sobre una carpeta
+  de pares .wav/.txt.
+
+Los resultados se guardan en JSON (mediana, p95, media, mínimo y número de
+muestras de cada métrica, más los tramos de la telemetría) junto con el
+commit medido. Con `--compare` se comparan las medianas con otro JSON y se
+marcan como regresión los empeoramientos por encima de `--threshold`; en
+ese caso el proceso termina con código 1.
+
+Uso:
+    python -m benchmarks.bench_suite
+    python -m benchmarks.bench_suite --latency 40 --candidates 100 --output base.json
+    python -m benchmarks.bench_suite --wavs ~/fixtures_es --speech-backend vosk
+    python -m benchmarks.bench_suite --compare base.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+import cv2
+import numpy as np
+
+from benchmarks.bench_matchers import synthetic_photo
+from benchmarks.libgen_server import LibgenServer, book_md5, cover_image
+from src.application.services.book_downloaderis import BookDownloader
+from src.application.services.compare_images import CompareImagesService
+from src.domain.entities.book import Book
+from src.infrastructure.cache import CoverCache, SearchCache
+from src.infrastructure.network import FileDownloader, HttpClient
+from src.infrastructure.repositories import SqliteBookRepository
+from src.infrastructure.telemetry import get_telemetry
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def summarize(samples: List[float], unit: str, better: str = "lower") -> Dict:
+    ordered = sorted(samples)
+    return {
+        "unit": unit,
+        "better": better,
+        "n": len(ordered),
+        "median": statistics.median(ordered),
+        "p95": ordered[min(len(ordered) - 1, round(0.95 * (len(ordered) - 1)))],
+        "mean": statistics.fmean(ordered),
+        "min": ordered[0],
+    }
+
+
+def git_version() -> Dict[str, str]:
+    def git(*args) -> str:
+        try:
+            return subprocess.run(
+                ["git", *args], cwd=ROOT, capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ""
+
+    return {
+        "commit": git("rev-parse", "--short", "HEAD") or "desconocido",
+        "subject": git("log", "-1", "--format=%s"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+    }
+
+
+async def bench_search(base_url: str, runs: int, workdir: Path) -> Dict[str, Dict]:
+    http_client = HttpClient()
+    downloader = BookDownloader(
+        search_cache=SearchCache(workdir / "search_cache.sqlite3"),
+        catalog=SqliteBookRepository(workdir / "catalog.sqlite3"),
+        http_client=http_client,
+        base_url=base_url
+    )
+    first, total, cached, counts = [], [], [], []
+    try:
+        for run in range(runs):
+            query = f"historia {run}"
+            start = time.perf_counter()
+            books = 0
+            async for _ in downloader.search_iter(query):
+                if not books:
+                    first.append((time.perf_counter() - start) * 1000)
+                books += 1
+            total.append((time.perf_counter() - start) * 1000)
+            counts.append(books)
+
+            start = time.perf_counter()
+            [book async for book in downloader.search_iter(query)]
+            cached.append((time.perf_counter() - start) * 1000)
+    finally:
+        await downloader.close()
+    return {
+        "search.first_book_ms": summarize(first, "ms"),
+        "search.total_ms": summarize(total, "ms"),
+        "search.cached_ms": summarize(cached, "ms"),
+        "search.books": summarize(counts, "libros", better="higher"),
+    }
+
+
+async def bench_download(base_url: str, repeat: int, workdir: Path) -> Dict[str, Dict]:
+    http_client = HttpClient()
+    telemetry = get_telemetry()
+    results = {}
+    try:
+        # "segmented" fuerza los tramos desde el principio; por defecto solo se usan con conexiones lentas
+        for name, segments in (("segmented", 4), ("single", 1)):
+            downloader = FileDownloader(http_client, segments=segments, adaptive=False)
+            speeds = []
+            telemetry.reset()
+            for run in range(repeat):
+                target = workdir / f"download_{name}_{run}.bin"
+                start = time.perf_counter()
+                path = await downloader.download(f"{base_url}/get/payload.bin", target)
+                elapsed = time.perf_counter() - start
+                speeds.append(os.path.getsize(path) / elapsed / 2**20)
+                os.remove(path)
+            results[f"download.{name}_mb_s"] = summarize(speeds, "MB/s", better="higher")
+            ttfb = [
+                value["mean"] * 1000 for key, value in telemetry.snapshot().items()
+                if key.startswith("download_ttfb_seconds")
+            ]
+            if ttfb:
+                results[f"download.{name}_ttfb_ms"] = summarize(ttfb, "ms")
+    finally:
+        await http_client.close()
+    return results
+
+
+async def bench_image_filter(base_url: str, candidates: int, repeat: int, workdir: Path) -> Dict[str, Dict]:
+    md5s = [book_md5("imagen", i) for i in range(candidates)]
+    books = [
+        Book(str(i), f"Libro {i}", "Autor", f"{base_url}/get/{md5}.pdf", f"{base_url}/covers/{md5}.jpg", "pdf")
+        for i, md5 in enumerate(md5s)
+    ]
+    target = candidates // 2
+
+    # Portadas ya generadas en el servidor: se mide al cliente, no al servidor
+    http_client = HttpClient()
+    try:
+        await asyncio.gather(*(_fetch(http_client, book.cover_url) for book in books))
+    finally:
+        await http_client.close()
+
+    cold, warm, positions = [], [], []
+    for run in range(repeat):
+        # Una foto distinta de la misma portada en cada repetición
+        photo_path = workdir / f"foto_{run}.jpg"
+        cv2.imwrite(str(photo_path), synthetic_photo(cover_image(md5s[target]), np.random.default_rng(run)))
+        service = CompareImagesService(cover_cache=CoverCache(workdir / f"covers_{run}"))
+        try:
+            start = time.perf_counter()
+            await service.rank(photo_path, books)
+            cold.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            ranking = await service.rank(photo_path, books)
+            warm.append((time.perf_counter() - start) * 1000)
+            positions.append(next(i for i, match in enumerate(ranking) if match.book.id == books[target].id))
+        finally:
+            service.close()
+    return {
+        "image.rank_cold_ms": summarize(cold, "ms"),
+        "image.rank_warm_ms": summarize(warm, "ms"),
+        "image.top1": summarize([sum(p == 0 for p in positions) / repeat], "fracción", better="higher"),
+        # Puesto de la portada correcta en la clasificación (0 = primera)
+        "image.target_position": summarize(positions, "puesto"),
+    }
+
+
+async def _fetch(http_client: HttpClient, url: str):
+    async with http_client.session().get(url) as response:
+        await response.read()
+
+
+def bench_speech(folder: Path, backend: str) -> Dict[str, Dict]:
+    from benchmarks.bench_speech import word_errors
+    from src.infrastructure.ml.speech_recognition_model import SpeechRecognitionModel
+
+    model = SpeechRecognitionModel(backend=backend)
+    model.warm_up()
+    seconds, errors, words = [], 0, 0
+    for wav_path in sorted(folder.glob("*.wav")):
+        txt_path = wav_path.with_suffix(".txt")
+        if not txt_path.exists():
+            continue
+        start = time.perf_counter()
+        text = model.transcribe_audio(wav_path)
+        seconds.append(time.perf_counter() - start)
+        edit, count = word_errors(txt_path.read_text(encoding="utf-8"), text)
+        errors += edit
+        words += count
+    if not seconds:
+        return {}
+    return {
+        f"speech.{backend}_s": summarize(seconds, "s"),
+        f"speech.{backend}_wer": summarize([errors / max(words, 1)], "fracción"),
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Imprime la comparación y devuelve las métricas que empeoraron"""
+    regressions = []
+    print(f"\nFrente a {baseline['meta']['version']['commit']} ({baseline['meta']['date']}):")
+    print(f"{'métrica':<28}{'antes':>12}{'ahora':>12}{'cambio':>10}")
+    for name, metric in current["metrics"].items():
+        old = baseline["metrics"].get(name)
+        if not old or not old["median"]:
+            continue
+        change = (metric["median"] - old["median"]) / old["median"]
+        worse = change > threshold if metric["better"] == "lower" else change < -threshold
+        flag = "  REGRESIÓN" if worse else ""
+        if worse:
+            regressions.append(name)
+        print(f"{name:<28}{old['median']:>12.2f}{metric['median']:>12.2f}{change:>+10.1%}{flag}")
+    return regressions
+
+
+async def run_suite(args, base_url: str, workdir: Path) -> Dict[str, Dict]:
+    metrics = {}
+    metrics.update(await bench_search(base_url, args.searches, workdir))
+    metrics.update(await bench_download(base_url, args.repeat, workdir))
+    metrics.update(await bench_image_filter(base_url, args.candidates, args.repeat, workdir))
+    return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--searches", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--file-mb", type=int, default=100)
+    parser.add_argument("--candidates", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.0, help="milisegundos por respuesta del servidor")
+    parser.add_argument("--wavs", type=Path, help="carpeta con pares .wav/.txt para medir la transcripción")
+    parser.add_argument("--speech-backend", default="google")
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--compare", type=Path, help="JSON de una ejecución anterior")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args()
+
+    telemetry = get_telemetry()
+    telemetry.enabled = True
+    with tempfile.TemporaryDirectory() as workdir, LibgenServer(
+        file_mb=args.file_mb, latency=args.latency / 1000
+    ) as server:
+        metrics = asyncio.run(run_suite(args, server.base_url, Path(workdir)))
+    if args.wavs:
+        metrics.update(bench_speech(args.wavs.expanduser(), args.speech_backend))
+
+    version = git_version()
+    result = {
+        "meta": {
+            "version": version,
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": {key: str(value) if isinstance(value, Path) else value for key, value in vars(args).items()},
+        },
+        "metrics": metrics,
+        "telemetry": telemetry.snapshot(),
+    }
+
+    print(f"{'métrica':<28}{'mediana':>12}{'p95':>12}  unidad")
+    for name, metric in metrics.items():
+        print(f"{name:<28}{metric['median']:>12.2f}{metric['p95']:>12.2f}  {metric['unit']}")
+
+    output = args.output
+    if output is None:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = RESULTS_DIR / f"{stamp}-{version['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"\nResultados en {output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        if compare(result, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Servidor local que imita a libgen.is para los benchmarks.
+
+Sirve páginas de resultados y de detalle con la estructura de las reales
+(plantillas en `benchmarks/fixtures/libgen`), portadas JPEG y archivos
+binarios grandes con soporte de rangos. Todo es determinista: la misma
+búsqueda devuelve siempre los mismos libros, portadas y archivos, así que
+las medidas de distintas versiones son comparables. Con `--latency` cada
+respuesta se retrasa para simular la red.
+
+Uso:
+    python -m benchmarks.libgen_server --port 8765 --file-mb 50 --latency 40
+"""
+import argparse
+import asyncio
+import hashlib
+import multiprocessing
+import socket
+import tempfile
+import time
+from functools import lru_cache
+from pathlib import Path
+from string import Template
+from typing import Dict, Optional
+
+import cv2
+import numpy as np
+from aiohttp import web
+
+from benchmarks.bench_matchers import synthetic_cover
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "libgen"
+FORMATS = ["pdf", "epub", "djvu", "mobi", "pdf"]
+AUTHORS = ["Gabriel García Márquez", "Isabel Allende", "Mario Vargas Llosa", "Julio Cortázar", "Ana María Matute"]
+TITLES = ["Historia de", "Manual de", "Revista de", "Introducción a", "Cuadernos de"]
+SUBJECTS = ["la física", "la química", "los Andes", "la economía", "la poesía", "la arquitectura"]
+
+
+def book_md5(query: str, index: int) -> str:
+    return hashlib.md5(f"{query}\0{index}".encode("utf-8")).hexdigest()
+
+
+def book_fields(md5: str) -> Dict[str, str]:
+    """Datos inventados, pero siempre los mismos, del libro `md5`"""
+    seed = int(md5[:8], 16)
+    return {
+        "md5": md5,
+        "id": str(seed % 3_000_000),
+        "title": f"{TITLES[seed % len(TITLES)]} {SUBJECTS[seed // 7 % len(SUBJECTS)]}, vol. {seed % 12 + 1}",
+        "author": AUTHORS[seed // 11 % len(AUTHORS)],
+        "publisher": "Editorial Universitaria",
+        "year": str(1990 + seed % 35),
+        "pages": str(100 + seed % 600),
+        "size": f"{seed % 40 + 1} Mb",
+        "isbn": f"978{seed % 10**10:010d}",
+        "extension": FORMATS[seed // 13 % len(FORMATS)],
+    }
+
+
+def cover_image(md5: str) -> np.ndarray:
+    """Portada en gris del libro `md5` (la misma que sirve el servidor)"""
+    return synthetic_cover(np.random.default_rng(int(md5[:12], 16)))
+
+
+@lru_cache(maxsize=None)
+def _template(name: str) -> Template:
+    return Template((FIXTURES / name).read_text(encoding="utf-8"))
+
+
+def render_search(query: str, count: int) -> str:
+    """Página search.php con `count` filas para `query`"""
+    search_row = _template("search_row.html")
+    rows = "\n".join(
+        search_row.substitute(book_fields(book_md5(query, i)), bgcolor="#C6DEFF" if i % 2 else "")
+        for i in range(count)
+    )
+    return _template("search.html").substitute(query=query, count=count, shown=count, rows=rows)
+
+
+def render_detail(md5: str) -> str:
+    """Página /main/<md5> del libro `md5`"""
+    return _template("detail.html").substitute(book_fields(md5))
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def build_app(payload: Path, results: int = 25, latency: float = 0.0) -> web.Application:
+    """
+    Args:
+        payload: Archivo que se sirve en cada /get/
+        results: Filas por página de resultados
+        latency: Segundos de retraso de cada respuesta
+    """
+    covers: Dict[str, bytes] = {}
+
+    @web.middleware
+    async def delay(request, handler):
+        if latency:
+            await asyncio.sleep(latency)
+        return await handler(request)
+
+    async def search(request):
+        query = request.query.get("req", "")
+        count = min(int(request.query.get("res", results)), results)
+        return web.Response(text=render_search(query, count), content_type="text/html")
+
+    async def detail(request):
+        return web.Response(text=render_detail(request.match_info["md5"]), content_type="text/html")
+
+    async def cover(request):
+        md5 = request.match_info["md5"]
+        if md5 not in covers:
+            _, encoded = cv2.imencode(".jpg", cover_image(md5), [cv2.IMWRITE_JPEG_QUALITY, 90])
+            covers[md5] = encoded.tobytes()
+        data = covers[md5]
+        etag = f'"{md5}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(body=data, content_type="image/jpeg", headers={"ETag": etag})
+
+    async def download(request):
+        # FileResponse responde a HEAD y a peticiones Range como un mirror real
+        return web.FileResponse(payload, headers={"ETag": '"payload"'})
+
+    app = web.Application(middlewares=[delay])
+    app.router.add_get("/search.php", search)
+    app.router.add_get("/main/{md5}", detail)
+    app.router.add_get("/covers/{md5}.jpg", cover)
+    app.router.add_get("/get/{name}", download)
+    return app
+
+
+def make_payload(path: Path, size_mb: int) -> Path:
+    """Archivo binario de `size_mb` MB, reutilizado si ya existe con ese tamaño"""
+    size = size_mb * 1024 * 1024
+    if not path.exists() or path.stat().st_size != size:
+        block = np.random.default_rng(0).integers(0, 256, 1024 * 1024, dtype=np.uint8).tobytes()
+        with open(path, "wb") as f:
+            for _ in range(size_mb):
+                f.write(block)
+    return path
+
+
+def serve(port: int, payload: str, results: int = 25, latency: float = 0.0):
+    web.run_app(build_app(Path(payload), results, latency), host="127.0.0.1", port=port, print=None)
+
+
+class LibgenServer:
+    """Arranca el servidor en otro proceso para que no compita con el event loop medido"""
+
+    def __init__(self, file_mb: int = 50, results: int = 25, latency: float = 0.0, port: Optional[int] = None):
+        self.port = port or _free_port()
+        self.payload = make_payload(Path(tempfile.gettempdir()) / f"libgen_payload_{file_mb}mb.bin", file_mb)
+        self.results = results
+        self.latency = latency
+        self._process: Optional[multiprocessing.Process] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self):
+        self._process = multiprocessing.Process(
+            target=serve, args=(self.port, str(self.payload), self.results, self.latency), daemon=True
+        )
+        self._process.start()
+        deadline = time.monotonic() + 15
+        while time.monotonic() < deadline:
+            try:
+                with socket.create_connection(("127.0.0.1", self.port), timeout=0.2):
+                    return self
+            except OSError:
+                time.sleep(0.05)
+        self.__exit__(None, None, None)
+        raise RuntimeError("El servidor de prueba no arrancó")
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+            self._process = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--file-mb", type=int, default=50)
+    parser.add_argument("--results", type=int, default=25)
+    parser.add_argument("--latency", type=float, default=0.0, help="milisegundos por respuesta")
+    args = parser.parse_args()
+    payload = make_payload(Path(tempfile.gettempdir()) / f"libgen_payload_{args.file_mb}mb.bin", args.file_mb)
+    print(f"Sirviendo en http://127.0.0.1:{args.port} (Ctrl+C para parar)")
+    serve(args.port, str(payload), args.results, args.latency / 1000)
+
+
+if __name__ == "__main__":
+    main()
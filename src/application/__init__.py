@@ -1,6 +1,19 @@
-# Importar servicios relevantes
-from .services.book_downloaderis import BookDownloader
-from .services.audio_recognition import AudioRecognitionService
-from .services.compare_images import CompareImagesService
+# Importar servicios relevantes (bajo demanda, ver services/__init__.py)
+from typing import TYPE_CHECKING
 
-__all__ = ["BookDownloader", "AudioRecognitionService" , "CompareImagesService"]
\ No newline at end of file
+from src.lazy_import import lazy_exports
+
+if TYPE_CHECKING:
+    from .services.audio_recognition import AudioRecognitionService
+    from .services.book_downloaderis import BookDownloader
+    from .services.compare_images import CompareImagesService
+    from .services.download_manager import DownloadManager
+
+__all__ = ["BookDownloader", "AudioRecognitionService" , "CompareImagesService", "DownloadManager"]
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "BookDownloader": ".services.book_downloaderis",
+    "AudioRecognitionService": ".services.audio_recognition",
+    "CompareImagesService": ".services.compare_images",
+    "DownloadManager": ".services.download_manager",
+})
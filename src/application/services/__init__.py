@@ -1,5 +1,21 @@
-# Importar todos los servicios
-from .book_downloaderis import BookDownloader
-from .audio_recognition import AudioRecognitionService
-from .compare_images import CompareImagesService
-__all__ = ["BookDownloader", "AudioRecognitionService" , "CompareImagesService"]
\ No newline at end of file
+# Importar todos los servicios bajo demanda: cada uno arrastra dependencias
+# pesadas (Selenium, OpenCV, SpeechRecognition) que no hacen falta para
+# dibujar la ventana
+from typing import TYPE_CHECKING
+
+from src.lazy_import import lazy_exports
+
+if TYPE_CHECKING:
+    from .audio_recognition import AudioRecognitionService
+    from .book_downloaderis import BookDownloader
+    from .compare_images import CompareImagesService
+    from .download_manager import DownloadManager
+
+__all__ = ["BookDownloader", "AudioRecognitionService" , "CompareImagesService", "DownloadManager"]
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "BookDownloader": ".book_downloaderis",
+    "AudioRecognitionService": ".audio_recognition",
+    "CompareImagesService": ".compare_images",
+    "DownloadManager": ".download_manager",
+})
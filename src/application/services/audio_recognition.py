@@ -1,36 +1,233 @@
 from pathlib import Path
+import asyncio
 import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional, Sequence, Tuple
+import numpy as np
+import speech_recognition as sr
+from ...infrastructure.audio import EnergyVad, RingBufferRecorder
 from ...infrastructure.ml.speech_recognition_model import SpeechRecognitionModel
 from ...domain.entities.book import Book
 
 
 class AudioRecognitionService:
-    def __init__(self):
-        self.speech_recognizer = SpeechRecognitionModel()
+    """
+    Transcripción de audio fuera del event loop.
+
+    Cada trabajo se ejecuta en un pool acotado de `max_workers` hilos con un
+    límite de `timeout` segundos, contado desde que empieza (no mientras
+    espera turno). Cancelar un trabajo que aún espera turno lo descarta; uno
+    que ya está en marcha termina en su hilo pero su resultado se ignora, y
+    conserva su turno hasta entonces: los motores locales no se pueden
+    interrumpir, así que el siguiente trabajo no empieza a contar su límite
+    mientras el hilo sigue ocupado.
+    """
+
+    def __init__(self, max_workers: int = 2, timeout: float = 30.0):
+        self.speech_recognizer = SpeechRecognitionModel(operation_timeout=timeout)
+        self.timeout = timeout
         self.logger = logging.getLogger(__name__)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="speech")
+        self._slots = asyncio.Semaphore(max_workers)
+
+    async def warm_up(self):
+        """Carga el motor local de reconocimiento, si está configurado"""
+        await asyncio.wrap_future(await self._submit(self.speech_recognizer.warm_up))
+
+    async def _submit(self, func, *args) -> Future:
+        """Espera un turno libre y lanza `func` en el pool; el turno se libera cuando el hilo acaba"""
+        loop = asyncio.get_running_loop()
+        await self._slots.acquire()
+        try:
+            future = self._executor.submit(func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._release_slot(loop))
+        return future
+
+    async def _run(self, func, arg, label, timeout: Optional[float]) -> str:
+        """Ejecuta una transcripción en el pool, esperando turno y con límite de tiempo"""
+        try:
+            future = await self._submit(func, arg)
+            # Al vencer el límite se deja de esperar, pero el turno sigue ocupado hasta que el hilo acabe
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            self.logger.error(f"Timeout transcribing audio {label}")
+            raise
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.logger.error(f"Error processing audio {label}: {str(e)}")
+            raise
+
+    def _release_slot(self, loop: asyncio.AbstractEventLoop):
+        try:
+            loop.call_soon_threadsafe(self._slots.release)
+        except RuntimeError:
+            pass  # el loop ya se cerró
 
-    async def process_audio(self, audio_path: Path | str) -> str:
+    async def process_audio(self, audio_path: Path | str, timeout: Optional[float] = None) -> str:
         """
         Procesa un archivo de audio y lo convierte a texto
+
+        Raises:
+            asyncio.TimeoutError: Si la transcripción supera el timeout
+        """
+        return await self._run(self.speech_recognizer.transcribe_audio, audio_path, audio_path, timeout)
+
+    async def process_audio_data(self, audio: sr.AudioData, timeout: Optional[float] = None) -> str:
         """
+        Transcribe un clip ya en memoria (p. ej. recién grabado), sin leer ni escribir disco
+
+        Raises:
+            asyncio.TimeoutError: Si la transcripción supera el timeout
+        """
+        seconds = len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+        return await self._run(self._transcribe_data, audio, f"en memoria ({seconds:.1f} s)", timeout)
+
+    def _transcribe_data(self, audio: sr.AudioData) -> str:
         try:
-            text = self.speech_recognizer.transcribe_audio(audio_path)
-            return text
-        except Exception as e:
-            self.logger.error(f"Error processing audio {audio_path}: {str(e)}")
-            raise
-    async def process_book_audio(self, book: Book) -> Book:
+            return self.speech_recognizer.transcribe_data(audio)
+        except sr.UnknownValueError:
+            self.logger.warning("No se pudo entender el audio grabado")
+            return ""
+
+    async def transcribe_many(self, audio_paths: Sequence[Path | str], timeout: Optional[float] = None) -> List[str]:
         """
-        Procesa todos los archivos de audio de un libro y actualiza su contenido
+        Transcribe varios clips a la vez (hasta `max_workers` en paralelo)
+
+        Devuelve los textos en el mismo orden. Si uno falla se cancelan los demás.
         """
+        tasks = [asyncio.ensure_future(self.process_audio(path, timeout)) for path in audio_paths]
         try:
-            full_text = []
-            for audio_file in book.audio_paths:
-                text = await self.process_audio(audio_file)
-                full_text.append(text)
+            return list(await asyncio.gather(*tasks))
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    async def process_book_audio(self, book: Book, audio_paths: Optional[Sequence[Path | str]] = None) -> str:
+        """
+        Procesa todos los archivos de audio de un libro y devuelve el texto completo
 
-            book.content = "\n\n".join(full_text)
-            return book
+        Book no tiene campos de audio ni de contenido (y con slots no admite
+        atributos nuevos), así que las rutas se pasan en `audio_paths` (o en
+        un atributo `audio_paths` del objeto recibido) y el texto se devuelve
+        en lugar de guardarse en el libro, que no se modifica.
+
+        Returns:
+            str: Las transcripciones en el orden de las rutas, separadas por una línea en blanco
+        """
+        paths = audio_paths if audio_paths is not None else getattr(book, "audio_paths", ())
+        try:
+            full_text = await self.transcribe_many(paths)
+            return "\n\n".join(full_text)
         except Exception as e:
             self.logger.error(f"Error processing book audio files: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+    def stream(
+        self,
+        recorder: RingBufferRecorder,
+        on_text: Optional[Callable[[str], None]] = None,
+        vad: Optional[EnergyVad] = None
+    ) -> "StreamingTranscription":
+        """
+        Empieza a grabar y transcribe cada locución en cuanto termina
+
+        Debe llamarse desde el event loop. `on_text` recibe, en el loop, el
+        texto acumulado cada vez que se transcribe un segmento nuevo.
+        """
+        session = StreamingTranscription(self, recorder, on_text, vad or EnergyVad(recorder.sample_rate))
+        session.start()
+        return session
+
+    def close(self):
+        """Descarta los trabajos pendientes y libera los hilos"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class StreamingTranscription:
+    """
+    Grabación con transcripción en vivo.
+
+    El detector de voz corre en el callback del micrófono; cada segmento
+    cerrado se lee del búfer circular y se transcribe en el pool del
+    servicio mientras se sigue grabando. Al parar solo queda por
+    transcribir el último tramo.
+    """
+
+    def __init__(self, service: AudioRecognitionService, recorder: RingBufferRecorder,
+                 on_text: Optional[Callable[[str], None]], vad: EnergyVad):
+        self.service = service
+        self.recorder = recorder
+        self.on_text = on_text
+        self.vad = vad
+        self.logger = logging.getLogger(__name__)
+        self._loop = asyncio.get_running_loop()
+        self._texts: List[str] = []
+        self._tasks: List[asyncio.Task] = []
+        self._error: Optional[sr.RequestError] = None
+
+    @property
+    def text(self) -> str:
+        """Texto de los segmentos transcritos hasta ahora, en orden"""
+        return " ".join(text for text in self._texts if text)
+
+    def start(self):
+        self.vad.reset()
+        self.recorder.start(on_block=self._on_block)
+
+    def _on_block(self, samples: np.ndarray):
+        # Hilo de audio: solo detectar y pasar el segmento al loop
+        for segment in self.vad.feed(samples):
+            self._loop.call_soon_threadsafe(self._submit, segment)
+
+    def _submit(self, segment: Tuple[int, int]):
+        index = len(self._texts)
+        self._texts.append("")
+        samples = self.recorder.read(*segment)
+        self._tasks.append(self._loop.create_task(self._transcribe(index, samples)))
+
+    async def _transcribe(self, index: int, samples: np.ndarray):
+        try:
+            text = await self.service.process_audio_data(self.recorder.to_audio_data(samples))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if isinstance(e, sr.RequestError):
+                self._error = e
+            self.logger.warning(f"Segmento {index} sin transcribir: {e}")
+            return
+        self._texts[index] = text
+        if text and self.on_text is not None:
+            self.on_text(self.text)
+
+    async def finish(self) -> Tuple[str, np.ndarray]:
+        """
+        Para la grabación, espera a los segmentos pendientes y devuelve el texto y el clip
+
+        Raises:
+            sr.RequestError: Si no se transcribió nada porque el motor no está disponible
+        """
+        samples = await asyncio.to_thread(self.recorder.stop)
+        # Dejar correr los segmentos que el hilo de audio encoló antes de parar
+        await asyncio.sleep(0)
+        segment = self.vad.flush()
+        if segment:
+            self._submit(segment)
+        elif not self._tasks and len(samples):
+            # El detector no separó ninguna locución: transcribir el clip entero
+            self._texts.append("")
+            self._tasks.append(self._loop.create_task(self._transcribe(0, samples)))
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._error is not None and not self.text:
+            raise self._error
+        return self.text, samples
+
+    async def cancel(self):
+        """Para la grabación y descarta las transcripciones en curso"""
+        await asyncio.to_thread(self.recorder.stop)
+        for task in self._tasks:
+            task.cancel()
@@ -2,114 +2,258 @@
 # src/application/services/book_downloader.py
 import os
 import asyncio
-from typing import List, Dict, Optional, Callable
-from selenium import webdriver
+from typing import TYPE_CHECKING, AsyncIterator, List, Dict, Optional, Callable, Set
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 from src.domain.entities.book import Book
+from src.domain.entities.download_status import DownloadStatus
+from src.infrastructure.browser.webdriver_pool import WebDriverPool
+from src.infrastructure.cache import SearchCache, default_cache_dir, normalize_query
+from src.infrastructure.network import FileDownloader, HttpClient, get_http_client
+from src.infrastructure.network.partial_file import PartialFile
+from src.infrastructure.telemetry import get_telemetry
+from .libgen_http_search import LibgenHttpSearch, SearchProgress
 import logging
 import io
 import mimetypes
+from dataclasses import replace
+
+if TYPE_CHECKING:
+    from src.infrastructure.repositories import SqliteBookRepository
 
 class BookDownloader:
-    def __init__(self):
-        self.driver = None
-        self.base_url = "https://libgen.is"
-        
-    async def initialize_driver(self):
-        """Inicializa el driver de Selenium en un hilo separado"""
-        loop = asyncio.get_event_loop()
-        chrome_options = webdriver.ChromeOptions()
-        chrome_options.add_argument("--headless")  # Ejecución en segundo plano
-        self.driver = await loop.run_in_executor(
-            None, 
-            lambda: webdriver.Chrome(options= chrome_options)
+    def __init__(
+        self,
+        driver_pool: Optional[WebDriverPool] = None,
+        search_cache: Optional[SearchCache] = None,
+        http_client: Optional[HttpClient] = None,
+        catalog: Optional["SqliteBookRepository"] = None,
+        base_url: str = "https://libgen.is"
+    ):
+        # Import diferido: el repositorio depende de src.application.interfaces
+        from src.infrastructure.repositories import SqliteBookRepository
+        from src.infrastructure.search import CatalogSearch
+
+        self.driver_pool = driver_pool or WebDriverPool(size=2)
+        self.search_cache = search_cache or SearchCache(default_cache_dir() / "search_cache.sqlite3")
+        self.catalog = catalog or SqliteBookRepository(default_cache_dir() / "catalog.sqlite3")
+        self.local_search = CatalogSearch(self.catalog)
+        self.base_url = base_url
+        self.http_client = http_client or get_http_client()
+        self.http_search = LibgenHttpSearch(self.base_url, http_client=self.http_client)
+        self.file_downloader = FileDownloader(self.http_client)
+        self._refresh_tasks: Dict[str, asyncio.Task] = {}
+        self._selenium_tasks: Set[asyncio.Task] = set()
+
+    async def warm_up(self):
+        """Arranca un navegador de respaldo e indexa el catálogo antes de la primera búsqueda"""
+        await asyncio.gather(
+            self.driver_pool.warm_up(1),
+            asyncio.to_thread(self.local_search.load)
         )
 
+    async def search_local(self, query: str) -> List[Book]:
+        """Búsqueda aproximada en el catálogo local, sin red"""
+        return await asyncio.to_thread(self.local_search.search, query, self.http_search.max_results)
+
+    def save_to_catalog(self, books: List[Book]):
+        """Guarda libros en el catálogo y en el índice de búsqueda local (bloqueante)"""
+        self.catalog.save_books(books)
+        self.local_search.add_books(books)
+
     async def search(self, query: str) -> List[Book]:
-        """Búsqueda asíncrona de libros"""
-        if not self.driver:
-            await self.initialize_driver()
+        """Búsqueda asíncrona de libros, usando la caché si la búsqueda ya se hizo"""
+        books = [book async for book in self.search_iter(query)]
+        return sorted(books, key=lambda book: int(book.id))
+
+    async def search_iter(self, query: str) -> AsyncIterator[Book]:
+        """
+        Búsqueda incremental: entrega cada libro en cuanto está disponible
+
+        Los resultados en caché se entregan de inmediato. Si el consumidor deja
+        de iterar (p. ej. al cancelar la búsqueda) las peticiones pendientes se
+        cancelan y no se guarda nada en la caché; tampoco si el plazo vence con
+        libros pendientes o falla alguna página de detalle. Los libros
+        encontrados se guardan en el catálogo local, que responde si no hay
+        conexión. La caché y el catálogo se consultan fuera del event loop.
+        """
+        telemetry = get_telemetry()
+        with telemetry.span("search", phase="cache"):
+            cached = await asyncio.to_thread(self.search_cache.get, query, self.base_url)
+        if cached:
+            if cached.stale:
+                self.schedule_refresh(query)
+            for book in cached.books:
+                yield book
+            return
 
+        books = []
+        progress = SearchProgress()
+        # Incluye el tiempo del consumidor entre libros: es la espera que ve el usuario
+        with telemetry.span("search", phase="total"):
+            async for book in self.iter_remote(query, progress):
+                books.append(book)
+                yield book
+        if books:
+            # Una lista incompleta no se guarda como resultado completo
+            if progress.complete:
+                await asyncio.to_thread(
+                    self.search_cache.put, query, self.base_url, sorted(books, key=lambda book: int(book.id))
+                )
+            await asyncio.to_thread(self.save_to_catalog, books)
+            return
+
+        # Sin resultados remotos (p. ej. sin conexión): buscar en el catálogo local.
+        # Como en la búsqueda remota, el id indica la posición en los resultados
+        local = await asyncio.to_thread(self.catalog.search, query, self.http_search.max_results)
+        for position, book in enumerate(local):
+            yield replace(book, id=str(position))
+
+    def schedule_refresh(self, query: str):
+        """Vuelve a lanzar una búsqueda obsoleta en segundo plano"""
+        key = normalize_query(query)
+        if key in self._refresh_tasks:
+            return
+
+        async def refresh():
+            try:
+                progress = SearchProgress()
+                books = await self.search_remote(query, progress)
+                if books:
+                    # Si queda incompleta, la entrada obsoleta sigue siendo la lista completa
+                    if progress.complete:
+                        await asyncio.to_thread(self.search_cache.put, query, self.base_url, books)
+                    await asyncio.to_thread(self.save_to_catalog, books)
+            except Exception as e:
+                logging.warning("No se pudo refrescar la búsqueda '%s': %s", query, e)
+            finally:
+                self._refresh_tasks.pop(key, None)
+
+        self._refresh_tasks[key] = asyncio.create_task(refresh())
+
+    async def search_remote(self, query: str, progress: Optional[SearchProgress] = None) -> List[Book]:
+        """Búsqueda asíncrona de libros por HTTP, con Selenium como respaldo"""
+        books = [book async for book in self.iter_remote(query, progress)]
+        return sorted(books, key=lambda book: int(book.id))
+
+    async def iter_remote(self, query: str, progress: Optional[SearchProgress] = None) -> AsyncIterator[Book]:
+        """Versión incremental de `search_remote`; si queda incompleta se anota en `progress`"""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = self.http_search.deadline
         try:
-            # Ejecutar acciones de Selenium en un executor
-            await asyncio.get_event_loop().run_in_executor(
-                None,
-                lambda: self.driver.get(self.base_url)
-            )
+            with get_telemetry().span("search", phase="results", backend="http"):
+                entries = await asyncio.wait_for(self.http_search.fetch_result_rows(query), deadline)
+        except Exception as e:
+            # TimeoutError de wait_for incluido: el navegador solo tiene lo que quede del plazo
+            logging.warning("Búsqueda HTTP fallida, usando Selenium: %s", e or type(e).__name__)
+            entries = await self.collect_result_rows_selenium(query, deadline - (loop.time() - started))
 
-           
-            
-            # Buscar elementos y escribir
-            search_form = await self.find_element(By.XPATH, '/html/body/table/tbody[2]/tr/td[2]/form/input[1]')
+        # Las páginas de detalle se descargan en paralelo sin el navegador, en
+        # lo que quede del plazo tras la página de resultados (o el navegador)
+        remaining = self.http_search.deadline - (loop.time() - started)
+        async for book in self.http_search.iter_books(entries, remaining, progress):
+            yield book
+
+    async def search_selenium(self, query: str) -> List[Book]:
+        """Búsqueda asíncrona de libros con el navegador"""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        entries = await self.collect_result_rows_selenium(query, self.http_search.deadline)
+        remaining = self.http_search.deadline - (loop.time() - started)
+        return await self.http_search.fetch_books(entries, remaining)
+
+    async def collect_result_rows_selenium(self, query: str, timeout: Optional[float] = None) -> List[Dict[str, str]]:
+        """
+        Obtiene las filas de resultados con un navegador del pool
+
+        Con `timeout` se deja de esperar al cabo de esos segundos y se devuelve
+        una lista vacía. El hilo de Selenium no se puede interrumpir, así que
+        la tarea sigue en segundo plano hasta devolver el navegador al pool.
+        """
+        if timeout is not None and timeout <= 0:
+            return []
+
+        async def collect() -> List[Dict[str, str]]:
+            try:
+                async with self.driver_pool.lease() as driver:
+                    # Ejecutar acciones de Selenium en un executor
+                    return await asyncio.get_running_loop().run_in_executor(
+                        None,
+                        lambda: self.collect_result_rows(driver, query)
+                    )
+            except Exception as e:
+                print(f"Error en búsqueda: {e}")
+                return []
+
+        task = asyncio.create_task(collect())
+        self._selenium_tasks.add(task)
+        task.add_done_callback(self._selenium_tasks.discard)
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            logging.warning("Selenium no terminó dentro del plazo de búsqueda")
+            return []
+
+    def collect_result_rows(self, driver, query: str) -> List[Dict[str, str]]:
+        """Rellena el formulario de búsqueda y lee los enlaces de los mirrors (bloqueante)"""
+        telemetry = get_telemetry()
+        with telemetry.span("search", phase="page_load", backend="selenium"):
+            driver.get(self.base_url)
+
+        # Buscar elementos y escribir
+        with telemetry.span("search", phase="submit", backend="selenium"):
+            search_form = WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located((By.XPATH, '/html/body/table/tbody[2]/tr/td[2]/form/input[1]'))
+            )
             search_form.send_keys(query)
 
             # Hacer clic en botón de búsqueda
-            search_button = WebDriverWait(self.driver, 10).until(
+            search_button = WebDriverWait(driver, 10).until(
                 EC.element_to_be_clickable((By.XPATH, '/html/body/table/tbody[2]/tr/td[2]/form/input[2]'))
             )
             search_button.click()
 
-            # Ordenar por año
-            BtnYear = WebDriverWait(self.driver, 10).until(
+        # Ordenar por año
+        with telemetry.span("search", phase="sort", backend="selenium"):
+            BtnYear = WebDriverWait(driver, 10).until(
                 EC.element_to_be_clickable((By.XPATH, '/html/body/table[3]/tbody/tr[1]/td[5]/b/a'))
             )
             BtnYear.click()# ponemos primero los libros más nuevos
-            
-            # Obtener resultados (adaptar según estructura real de la página)
-            books = []#/html/body/table[3]/tbody/tr[1] /html/body/table[3]/tbody/tr
-            WebDriverWait(self.driver, 15).until(
-            EC.presence_of_element_located((By.XPATH, '/html/body/table[3]/tbody/tr'))
+
+        # Obtener resultados (adaptar según estructura real de la página)
+        with telemetry.span("search", phase="wait_rows", backend="selenium"):
+            rows = WebDriverWait(driver, 15).until(
+                EC.presence_of_all_elements_located((By.XPATH, '/html/body/table[3]/tbody/tr'))
             )
-            rows = await self.find_elements(By.XPATH, '/html/body/table[3]/tbody/tr')
-            
 
-            for i, row in enumerate(rows[2:22]):
-                try:#/html/body/table[3]/tbody/tr[2]/td[1]
-                    file_format = row.find_element(By.CSS_SELECTOR ,  "td[nowrap]:nth-child(9)").text.strip()
-                    
-                    
-                    mirror = WebDriverWait(self.driver, 10).until(
-                    EC.element_to_be_clickable((By.XPATH, f"/html/body/table[3]/tbody/tr[{i + 2}]/td[10]/a"))
-                    )
-                    mirror.click()
-                    
-                    img_element = await self.find_element(By.XPATH, '//*[@id="info"]/div[2]/img')
-                    
-                    cover_url = img_element.get_attribute('src')
-                    
-                    
-                    if cover_url=='':
-                        cover_url = "https://e7.pngegg.com/pngimages/829/733/png-clipart-logo-brand-product-trademark-font-not-found-logo-brand.png"
-                    
-                    
+        # Reunir primero los enlaces de los mirrors y luego descargarlos en paralelo
+        entries = []
+        for row in rows[1:]:
+            # Cada fila son varias llamadas al navegador
+            with telemetry.span("search", phase="row", backend="selenium"):
+                try:
+                    cells = row.find_elements(By.TAG_NAME, "td")
+                    if len(cells) < 10:
+                        continue
+                    entries.append({
+                        "file_format": cells[8].text.strip(),
+                        "mirror_url": cells[9].find_element(By.TAG_NAME, "a").get_attribute("href"),
+                    })
                 except Exception as e:
-                    cover_url = ""
-                    logging.error(" Error al obtener la imagen del libro  : %s", e)
-                finally:
-                    book = Book(
-                        id=str(i-1),
-                        title= self.driver.find_element(By.XPATH, '//*[@id="info"]/h1').text,  
-                        author= self.driver.find_element(By.XPATH, '//*[@id="info"]/p[1]').text,
-                        url= self.driver.find_element(By.XPATH, '/html/body/table/tbody/tr/td[2]/div[1]/h2[1]/a').get_attribute('href'),
-                        cover_url=cover_url,
-                        file_format= file_format
-                    )
-                    books.append(book)
-                self.driver.back()
-            return books
-
-        except Exception as e:
-            print(f"Error en búsqueda: {e}")
-            return []
+                    logging.error(" Error al leer la fila de resultados : %s", e)
+            if len(entries) >= self.http_search.max_results:
+                break
+        return entries
 
     async def download(
         self, 
         book: Book, 
         download_path: str,
-        progress_callback: Optional[Callable[[int, int], None]] = None
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        status: Optional[DownloadStatus] = None
     ) -> Optional[str]:
         try:
            
@@ -118,7 +262,8 @@ class BookDownloader:
                 download_path, 
                 book.title,
                 book.file_format,
-                progress_callback
+                progress_callback,
+                status
             )
         except Exception as e:
             print(f"Error final en descarga: {str(e)}")
@@ -132,64 +277,43 @@ class BookDownloader:
         path: str, 
         filename: str,
         file_format: str,
-        progress_callback: Optional[Callable[[int, int], None]] = None
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        status: Optional[DownloadStatus] = None
     )-> str:
-        """Descarga asíncrona con seguimiento de progreso"""
-        import aiohttp
-        from aiohttp import ClientSession
-        
-        # Sanitizar nombre de archivo
-        def sanitize(name):
-            return "".join(c for c in name if c.isalnum() or c in " .-_")
-        
-        sanitized_name = sanitize(filename)
-        file_path = os.path.join(path, f"{sanitized_name}.{file_format}")
+        """
+        Descarga asíncrona con seguimiento de progreso
+
+        Si falla, el archivo parcial (.part) se conserva para reanudarlo en
+        el siguiente intento.
+        """
+        file_path = self.file_path_for(path, filename, file_format)
         
         try:
-            async with ClientSession() as session:
-                async with session.get(url) as response:
-                    response.raise_for_status()
-                    
-                    total_size = int(response.headers.get('Content-Length', 0))
-                    downloaded = 0
-                    
-                    with open(file_path, 'wb') as f:
-                        async for chunk in response.content.iter_chunked(8192):
-                            f.write(chunk)
-                            downloaded += len(chunk)
-                            
-                            # Actualizar progreso
-                            if progress_callback:
-                                # Ejecutar en el event loop principal
-                                await progress_callback(downloaded, total_size)
-                    
-                    return file_path
+            return await self.file_downloader.download(url, file_path, progress_callback, status)
                     
         except Exception as e:
             logging.error(f"Error inesperado durante la descarga: {str(e)}", exc_info=True)
             print(f"Error en descarga: {str(e)}")
-            if os.path.exists(file_path):
-                os.remove(file_path)
             return None 
 
-    async def close(self):
-        """Cierra el driver"""
-        if self.driver:
-            await asyncio.get_event_loop().run_in_executor(None, self.driver.quit)
-
-    # Helpers para ejecutar Selenium de forma asíncrona
-    async def find_element(self, by, value):
-        return await asyncio.get_event_loop().run_in_executor(
-            None,
-            lambda: WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((by, value))
-            )
-        )
+    def file_path_for(self, path: str, filename: str, file_format: str) -> str:
+        """Ruta de destino de una descarga"""
+        # Sanitizar nombre de archivo
+        def sanitize(name):
+            return "".join(c for c in name if c.isalnum() or c in " .-_")
 
-    async def find_elements(self, by, value):
-        return await asyncio.get_event_loop().run_in_executor(
-            None,
-            lambda: WebDriverWait(self.driver, 10).until(
-                EC.presence_of_all_elements_located((by, value))
-            )
-        )
\ No newline at end of file
+        return os.path.join(path, f"{sanitize(filename)}.{file_format}")
+
+    async def discard_partial(self, book: Book, download_path: str):
+        """Elimina el .part de una descarga cancelada"""
+        file_path = self.file_path_for(download_path, book.title, book.file_format)
+        await asyncio.to_thread(PartialFile(file_path).discard)
+
+    async def close(self):
+        """Cierra los drivers del pool, el cliente HTTP, la caché y el catálogo"""
+        for task in list(self._refresh_tasks.values()):
+            task.cancel()
+        await self.http_client.close()
+        await self.driver_pool.close()
+        self.search_cache.close()
+        self.catalog.close()
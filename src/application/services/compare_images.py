@@ -1,21 +1,135 @@
 from pathlib import Path
+import asyncio
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+import cv2
+
+from ...infrastructure.cache import CoverCache, get_cover_cache
+from ...infrastructure.ml.descriptor_index import CoverFeatures, DescriptorIndex
 from ...infrastructure.ml.feature_matching_model import FeatureMatchingModel
+from ...infrastructure.ml.perceptual_hash import CoverHashes, ImageHash, query_hashes, rank_by_hash
 from ...domain.entities.book import Book
+from ...domain.entities.image_match import ImageMatch
 
 class CompareImagesService:
-    def __init__(self):
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        matcher: str = "bf",
+        ransac: bool = False,
+        prefilter_k: int = 8,
+        cover_cache: Optional[CoverCache] = None
+    ):
         self.logger = logging.getLogger(__name__)
+        self.matcher = matcher
+        self.ransac = ransac
+        # Con más candidatos que esto, solo los `prefilter_k` más parecidos
+        # por hash perceptual pasan a la comparación ORB (0 lo desactiva).
+        # Debe quedar por debajo de los 20 resultados de una búsqueda
+        self.prefilter_k = prefilter_k
+        self.cover_cache = cover_cache or get_cover_cache()
+        self.descriptor_index = DescriptorIndex(self.cover_cache)
+        self.cover_hashes = CoverHashes(self.cover_cache)
+        # OpenCV suelta el GIL al detectar y comparar, así que bastan hilos
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or min(8, os.cpu_count() or 1),
+            thread_name_prefix="compare-images"
+        )
+
+    async def index_covers(self, books: List[Book]):
+        """
+        Calcula los descriptores de las portadas de `books` en segundo plano,
+        para que filtrar por imagen solo tenga que procesar la foto del usuario
+        """
+        urls = [book.cover_url for book in books if book.cover_url]
+        for url in urls:
+            if await asyncio.to_thread(self.descriptor_index.add, url):
+                await asyncio.to_thread(self._cover_hash, url)
 
     async def compare_images(self, image_path: Path | str, book: Book) -> bool:
         """
         Compara dos imágenes y devuelve True si son similares
         """
         try:
-            feature_matching_model = FeatureMatchingModel(image_path, book.cover_url)
-            result = feature_matching_model.compare_images()
+            cover_features = self.descriptor_index.get(book.cover_url)
+            feature_matching_model = FeatureMatchingModel(
+                image_path, book.cover_url, self.cover_cache, matcher=self.matcher, ransac=self.ransac
+            )
+            result = feature_matching_model.compare_images(cover_features=cover_features)
             return result
         except Exception as e:
             self.logger.error(f"Error comparing images: {str(e)}")
             raise
-    
\ No newline at end of file
+
+    async def rank(self, image_path: Path | str, books: List[Book], min_matches: Optional[int] = None) -> List[ImageMatch]:
+        """
+        Puntúa todas las portadas de `books` frente a la imagen
+
+        Los rasgos de la imagen se calculan una sola vez y las portadas se
+        comparan en paralelo, fuera del event loop.
+
+        Returns:
+            Un ImageMatch por libro, de mayor a menor puntuación
+        """
+        loop = asyncio.get_running_loop()
+        image = await loop.run_in_executor(self._executor, cv2.imread, str(image_path), cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError(f"No se pudo leer la imagen: {image_path}")
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        query = await loop.run_in_executor(self._executor, self.descriptor_index.compute, gray)
+        model = FeatureMatchingModel(image_path, None, self.cover_cache, matcher=self.matcher, ransac=self.ransac)
+
+        candidates, discarded = books, []
+        if self.prefilter_k and len(books) > self.prefilter_k:
+            candidates, discarded = await self._prefilter(image, books)
+
+        results = await asyncio.gather(*(
+            loop.run_in_executor(self._executor, self._score, model, query, book, min_matches)
+            for book in candidates
+        ))
+        results.extend(ImageMatch(book=book, score=0.0) for book in discarded)
+        await loop.run_in_executor(self._executor, self.descriptor_index.save)
+        return sorted(results, key=lambda match: (match.score, match.matches), reverse=True)
+
+    async def _prefilter(self, image, books: List[Book]) -> Tuple[List[Book], List[Book]]:
+        """Separa los `prefilter_k` libros más parecidos por hash perceptual del resto"""
+        loop = asyncio.get_running_loop()
+        queries = await loop.run_in_executor(self._executor, query_hashes, image)
+        hashes = await asyncio.gather(*(
+            loop.run_in_executor(self._executor, self._cover_hash, book.cover_url)
+            for book in books
+        ))
+        hashed = [(book, value) for book, value in zip(books, hashes) if value is not None]
+        discarded = [book for book, value in zip(books, hashes) if value is None]
+        order = rank_by_hash(queries, [value for _, value in hashed])
+        candidates = [hashed[i][0] for i in order[:self.prefilter_k]]
+        discarded.extend(hashed[i][0] for i in order[self.prefilter_k:])
+        self.logger.info("Prefiltro por hash: %d de %d portadas pasan a ORB", len(candidates), len(books))
+        return candidates, discarded
+
+    def _cover_hash(self, url: str) -> Optional[ImageHash]:
+        if not url:
+            return None
+        try:
+            return self.cover_hashes.get(url)
+        except Exception as e:
+            self.logger.warning("No se pudo calcular el hash de la portada %s: %s", url, e)
+            return None
+
+    def _score(self, model: FeatureMatchingModel, query: CoverFeatures, book: Book, min_matches: Optional[int]) -> ImageMatch:
+        if not book.cover_url:
+            return ImageMatch(book=book, score=0.0)
+        try:
+            matches, ratio = model.score_features(query, self.descriptor_index.get(book.cover_url))
+        except Exception as e:
+            self.logger.warning("No se pudo comparar la portada de %s: %s", book.title, e)
+            return ImageMatch(book=book, score=0.0)
+        return ImageMatch(book=book, score=ratio, matches=matches, is_match=model.is_match(matches, ratio, min_matches))
+
+    def close(self):
+        """Guarda el índice de descriptores y libera los hilos"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.descriptor_index.save()
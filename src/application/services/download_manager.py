@@ -0,0 +1,311 @@
+# src/application/services/download_manager.py
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+from src.domain.entities.book import Book
+from src.domain.entities.download_status import DownloadState, DownloadStatus
+from .book_downloaderis import BookDownloader
+
+# Estados que siguen en la cola y se guardan en disco
+UNFINISHED_STATES = (DownloadState.PENDING, DownloadState.DOWNLOADING, DownloadState.PAUSED)
+
+
+@dataclass
+class DownloadJob:
+    id: str
+    book: Book
+    download_path: str
+    priority: int = 0
+    created_at: float = field(default_factory=time.time)
+    status: DownloadStatus = None
+    file_path: Optional[str] = None
+
+    def __post_init__(self):
+        if self.status is None:
+            self.status = DownloadStatus(id=self.id, state=DownloadState.PENDING)
+
+    @property
+    def mirror(self) -> str:
+        return urlparse(self.book.url).netloc
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "book": asdict(self.book),
+            "download_path": self.download_path,
+            "priority": self.priority,
+            "created_at": self.created_at,
+            "state": self.status.state.value,
+            "progress": self.status.progress,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "DownloadJob":
+        state = DownloadState(data["state"])
+        if state == DownloadState.DOWNLOADING:
+            state = DownloadState.PENDING  # se interrumpió al cerrar la aplicación
+        job = cls(
+            id=data["id"],
+            book=Book(**data["book"]),
+            download_path=data["download_path"],
+            priority=data.get("priority", 0),
+            created_at=data.get("created_at", time.time()),
+        )
+        job.status.state = state
+        job.status.progress = data.get("progress", 0.0)
+        return job
+
+
+class DownloadManager:
+    """
+    Cola de descargas con límite global de concurrencia y límite por mirror.
+
+    Los trabajos se atienden por prioridad (mayor primero) y, a igual
+    prioridad, por orden de llegada. Pausar cancela la transferencia pero
+    conserva el .part, así que reanudar continúa donde se quedó. La cola
+    pendiente se guarda en disco y se recupera con `start()`; los cambios
+    seguidos se agrupan en una sola escritura, hecha fuera del event loop
+    como mucho una vez cada `save_delay` segundos.
+
+    Los métodos públicos pueden llamarse desde cualquier hilo (los
+    manejadores síncronos de Flet corren fuera del event loop).
+    """
+
+    def __init__(
+        self,
+        book_downloader: BookDownloader,
+        queue_path: str | Path,
+        max_concurrent: int = 3,
+        max_per_mirror: int = 2,
+        on_update: Optional[Callable[[DownloadJob], None]] = None,
+        save_delay: float = 0.5
+    ):
+        self.book_downloader = book_downloader
+        self.queue_path = Path(queue_path)
+        self.max_concurrent = max_concurrent
+        self.max_per_mirror = max_per_mirror
+        self.on_update = on_update
+        self.save_delay = save_delay
+        self.jobs: Dict[str, DownloadJob] = {}
+        self.logger = logging.getLogger(__name__)
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closing = False
+        self._save_pending = False
+        self._save_handle: Optional[asyncio.TimerHandle] = None
+        self._save_task: Optional[asyncio.Future] = None
+
+    async def start(self) -> List[DownloadJob]:
+        """Recupera la cola guardada y empieza a atenderla"""
+        self._loop = asyncio.get_running_loop()
+        restored = await asyncio.to_thread(self._load)
+        for job in restored:
+            self.jobs.setdefault(job.id, job)
+        self._schedule()
+        return restored
+
+    def _call(self, func, *args):
+        """Ejecuta `func` en el event loop del gestor"""
+        if self._loop is None:
+            func(*args)
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            func(*args)
+        else:
+            self._loop.call_soon_threadsafe(func, *args)
+
+    def enqueue(self, book: Book, download_path: str, priority: int = 0) -> DownloadJob:
+        """Añade un libro a la cola y devuelve su trabajo"""
+        job = DownloadJob(id=uuid.uuid4().hex, book=book, download_path=download_path, priority=priority)
+        self._call(self._add, job)
+        return job
+
+    def pause(self, job_id: str):
+        self._call(self._pause, job_id)
+
+    def resume(self, job_id: str):
+        self._call(self._resume, job_id)
+
+    def cancel(self, job_id: str):
+        self._call(self._cancel, job_id)
+
+    def set_priority(self, job_id: str, priority: int):
+        self._call(self._set_priority, job_id, priority)
+
+    def _add(self, job: DownloadJob):
+        self.jobs[job.id] = job
+        self._changed(job)
+        self._schedule()
+
+    def _pause(self, job_id: str):
+        job = self.jobs.get(job_id)
+        if not job or job.status.state not in (DownloadState.PENDING, DownloadState.DOWNLOADING):
+            return
+        job.status.pause()
+        task = self._tasks.get(job_id)
+        if task:
+            task.cancel()
+        self._changed(job)
+
+    def _resume(self, job_id: str):
+        job = self.jobs.get(job_id)
+        if not job or job.status.state != DownloadState.PAUSED:
+            return
+        job.status.state = DownloadState.PENDING
+        self._changed(job)
+        self._schedule()
+
+    def _cancel(self, job_id: str):
+        job = self.jobs.get(job_id)
+        if not job or job.status.is_finished:
+            return
+        job.status.cancel()
+        task = self._tasks.get(job_id)
+        if task:
+            task.cancel()
+        elif self._loop:
+            asyncio.ensure_future(self.book_downloader.discard_partial(job.book, job.download_path))
+        self._changed(job)
+
+    def _set_priority(self, job_id: str, priority: int):
+        job = self.jobs.get(job_id)
+        if job:
+            job.priority = priority
+            self._changed(job)
+            self._schedule()
+
+    def _schedule(self):
+        """Arranca los trabajos pendientes que quepan en los límites"""
+        if self._closing or self._loop is None:
+            return
+        per_mirror = Counter(self.jobs[job_id].mirror for job_id in self._tasks)
+        pending = sorted(
+            (job for job in self.jobs.values()
+             if job.status.state == DownloadState.PENDING and job.id not in self._tasks),
+            key=lambda job: (-job.priority, job.created_at)
+        )
+        for job in pending:
+            if len(self._tasks) >= self.max_concurrent:
+                break
+            if per_mirror[job.mirror] >= self.max_per_mirror:
+                continue
+            per_mirror[job.mirror] += 1
+            self._tasks[job.id] = asyncio.create_task(self._run(job))
+
+    async def _run(self, job: DownloadJob):
+        status = job.status
+        status.state = DownloadState.DOWNLOADING
+        self._changed(job)
+
+        async def update_progress(current: int, total: int):
+            status.update_transfer(current, total)
+            self._notify(job)
+
+        try:
+            Path(job.download_path).mkdir(parents=True, exist_ok=True)
+            file_path = await self.book_downloader.download(
+                job.book,
+                job.download_path,
+                progress_callback=update_progress,
+                status=status
+            )
+            if file_path:
+                job.file_path = file_path
+                status.complete()
+            else:
+                status.fail("Error en la descarga")
+        except asyncio.CancelledError:
+            if status.state == DownloadState.CANCELLED:
+                await self.book_downloader.discard_partial(job.book, job.download_path)
+            elif status.state == DownloadState.DOWNLOADING:
+                status.state = DownloadState.PENDING  # cierre de la aplicación
+        except Exception as e:
+            self.logger.error("Error en la descarga %s: %s", job.id, e)
+            status.fail(str(e))
+        finally:
+            self._tasks.pop(job.id, None)
+            self._changed(job)
+            self._schedule()
+
+    def _notify(self, job: DownloadJob):
+        if self.on_update:
+            try:
+                self.on_update(job)
+            except Exception as e:
+                self.logger.error("Error notificando la descarga %s: %s", job.id, e)
+
+    def _changed(self, job: DownloadJob):
+        """Cambio de estado: avisar y guardar la cola"""
+        self._notify(job)
+        self._save()
+
+    def _save(self):
+        """Programa el guardado de la cola; si ya hay uno programado o en curso, se suma a él"""
+        if self._loop is None:
+            self._write_queue(self._snapshot())
+            return
+        self._save_pending = True
+        if self._closing or self._save_handle is not None or self._save_task is not None:
+            return  # close() o el guardado en curso recogen este cambio
+        self._save_handle = self._loop.call_later(self.save_delay, self._start_save)
+
+    def _start_save(self):
+        self._save_handle = None
+        self._save_pending = False
+        # La foto se toma en el loop; serializar y escribir, en un hilo
+        self._save_task = asyncio.ensure_future(asyncio.to_thread(self._write_queue, self._snapshot()))
+        self._save_task.add_done_callback(self._save_done)
+
+    def _save_done(self, _):
+        self._save_task = None
+        if self._save_pending:
+            self._save()
+
+    def _snapshot(self) -> List[dict]:
+        return [job.to_dict() for job in self.jobs.values() if job.status.state in UNFINISHED_STATES]
+
+    def _write_queue(self, unfinished: List[dict]):
+        tmp_path = self.queue_path.with_name(self.queue_path.name + ".tmp")
+        try:
+            self.queue_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(json.dumps(unfinished, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp_path, self.queue_path)
+        except OSError as e:
+            self.logger.error("No se pudo guardar la cola de descargas: %s", e)
+
+    def _load(self) -> List[DownloadJob]:
+        if not self.queue_path.exists():
+            return []
+        try:
+            data = json.loads(self.queue_path.read_text(encoding="utf-8"))
+            return [DownloadJob.from_dict(item) for item in data]
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            self.logger.warning("Cola de descargas ilegible, se ignora: %s", e)
+            return []
+
+    async def close(self):
+        """Detiene las descargas en curso dejándolas pendientes para el próximo arranque"""
+        self._closing = True
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save_handle = None
+        if self._save_task is not None:
+            await asyncio.gather(self._save_task, return_exceptions=True)
+        await asyncio.to_thread(self._write_queue, self._snapshot())
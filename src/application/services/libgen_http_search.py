@@ -0,0 +1,187 @@
+# src/application/services/libgen_http_search.py
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional
+
+import aiohttp
+
+from src.domain.entities.book import Book
+from src.infrastructure.network.http_client import HttpClient, get_http_client
+from src.infrastructure.telemetry import get_telemetry
+from .libgen_parser import parse_search_results, parse_detail_page
+
+DEFAULT_COVER_URL = "https://e7.pngegg.com/pngimages/829/733/png-clipart-logo-brand-product-trademark-font-not-found-logo-brand.png"
+
+
+@dataclass
+class SearchProgress:
+    """Cómo terminó una búsqueda incremental, para decidir si se puede guardar en caché"""
+    timed_out: bool = False  # el plazo venció con páginas de detalle pendientes
+    failed: int = 0  # filas cuya página de detalle no se pudo obtener
+
+    @property
+    def complete(self) -> bool:
+        return not self.timed_out and not self.failed
+
+
+class LibgenHttpSearch:
+    """
+    Motor de búsqueda de libgen.is sin navegador.
+
+    Hace las mismas peticiones que el flujo de Selenium (búsqueda ordenada
+    por año y página de cada mirror) y analiza el HTML directamente.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "https://libgen.is",
+        max_results: int = 20,
+        timeout: float = 15.0,
+        detail_concurrency: int = 8,
+        deadline: float = 30.0,
+        http_client: Optional[HttpClient] = None
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.max_results = max_results
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.detail_concurrency = detail_concurrency
+        self.deadline = deadline  # segundos para toda la búsqueda
+        self.http_client = http_client or get_http_client()
+        self.logger = logging.getLogger(__name__)
+
+    def search_url(self) -> str:
+        return f"{self.base_url}/search.php"
+
+    async def fetch_text(self, url: str, params: Optional[dict] = None) -> str:
+        session = self.http_client.session()
+        async with session.get(url, params=params, timeout=self.timeout) as response:
+            response.raise_for_status()
+            return await response.text(errors="replace")
+
+    async def search(self, query: str) -> List[Book]:
+        """
+        Busca libros en libgen.is
+
+        Raises:
+            aiohttp.ClientError: Si falla la conexión con el servidor
+            LibgenParseError: Si la página de resultados no tiene el formato esperado
+        """
+        books = [book async for book in self.search_iter(query)]
+        return sorted(books, key=lambda book: int(book.id))
+
+    async def search_iter(self, query: str) -> AsyncIterator[Book]:
+        """
+        Igual que `search`, pero entrega cada libro en cuanto se obtiene su detalle
+
+        Los libros llegan en orden de finalización; su `id` conserva la posición
+        en la tabla de resultados.
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            # El plazo cubre también la página de resultados, no solo los detalles
+            rows = await asyncio.wait_for(self.fetch_result_rows(query), self.deadline)
+        except asyncio.TimeoutError:
+            self.logger.warning("Tiempo agotado esperando la página de resultados de '%s'", query)
+            return
+
+        remaining = self.deadline - (loop.time() - started)
+        async for book in self.iter_books(rows, remaining):
+            yield book
+
+    async def fetch_result_rows(self, query: str) -> List[Dict[str, str]]:
+        """Descarga la página de resultados y devuelve sus filas"""
+        params = {
+            "req": query,
+            "res": 25,
+            "view": "simple",
+            "column": "def",
+            "sort": "year",  # ponemos primero los libros más nuevos
+            "sortmode": "DESC",
+        }
+        html = await self.fetch_text(self.search_url(), params)
+        return parse_search_results(html, self.search_url(), self.max_results)
+
+    async def fetch_books(self, rows: List[Dict[str, str]], deadline: Optional[float] = None) -> List[Book]:
+        """
+        Descarga en paralelo las páginas de detalle de las filas de resultados
+
+        Args:
+            rows: Filas con 'mirror_url' y 'file_format'
+            deadline: Segundos máximos de espera; al vencer se devuelven
+                los libros obtenidos hasta ese momento
+
+        Returns:
+            List[Book]: Libros en el mismo orden que las filas
+        """
+        books = [book async for book in self.iter_books(rows, deadline)]
+        return sorted(books, key=lambda book: int(book.id))
+
+    async def iter_books(
+        self,
+        rows: List[Dict[str, str]],
+        deadline: Optional[float] = None,
+        progress: Optional[SearchProgress] = None
+    ) -> AsyncIterator[Book]:
+        """
+        Entrega los libros de `rows` a medida que se descargan sus páginas de detalle
+
+        Si el plazo vence antes de tenerlos todos, o falla alguna página de
+        detalle, se anota en `progress`.
+        """
+        if not rows:
+            return
+        loop = asyncio.get_running_loop()
+        expires = loop.time() + max(deadline, 0) if deadline is not None else None
+        semaphore = asyncio.Semaphore(self.detail_concurrency)
+
+        async def fetch(index: int, row: Dict[str, str]) -> Optional[Book]:
+            async with semaphore:
+                return await self.fetch_book(index, row["mirror_url"], row["file_format"])
+
+        pending = {asyncio.create_task(fetch(i, row)) for i, row in enumerate(rows)}
+        try:
+            while pending:
+                timeout = max(expires - loop.time(), 0) if expires is not None else None
+                done, pending = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    self.logger.warning(
+                        "Tiempo agotado: %d de %d detalles sin respuesta", len(pending), len(rows)
+                    )
+                    if progress is not None:
+                        progress.timed_out = True
+                    break
+                for task in done:
+                    book = task.result()
+                    if book is not None:
+                        yield book
+                    elif progress is not None:
+                        progress.failed += 1
+        finally:
+            # Si se agota el plazo o el consumidor deja de iterar, no dejar peticiones vivas
+            for task in pending:
+                task.cancel()
+
+    async def fetch_book(self, index: int, mirror_url: str, file_format: str) -> Optional[Book]:
+        """Obtiene los datos de un libro desde la página de su mirror"""
+        telemetry = get_telemetry()
+        try:
+            with telemetry.span("search", phase="detail_fetch"):
+                html = await self.fetch_text(mirror_url)
+            with telemetry.span("search", phase="detail_parse"):
+                detail = parse_detail_page(html, mirror_url)
+        except Exception as e:
+            self.logger.error("Error al obtener el detalle del libro %s: %s", mirror_url, e)
+            return None
+
+        return Book(
+            id=str(index),
+            title=detail["title"],
+            author=detail["author"],
+            url=detail["url"],
+            cover_url=detail["cover_url"] or DEFAULT_COVER_URL,
+            file_format=file_format
+        )
@@ -0,0 +1,201 @@
+# src/application/services/libgen_parser.py
+from html.parser import HTMLParser
+from typing import List, Dict, Optional
+from urllib.parse import urljoin
+
+
+class LibgenParseError(Exception):
+    """La página recibida no tiene la estructura esperada de libgen"""
+
+
+class _ResultsTableParser(HTMLParser):
+    """Extrae las celdas de la tabla de resultados (table.c) de libgen.is"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.found = False
+        self.rows: List[List[Dict]] = []
+        self._table_depth = 0  # profundidad dentro de table.c
+        self._row: Optional[List[Dict]] = None
+        self._cell: Optional[Dict] = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "table":
+            if self._table_depth:
+                self._table_depth += 1
+            elif "c" in (attrs.get("class") or "").split():
+                self.found = True
+                self._table_depth = 1
+            return
+        if not self._table_depth:
+            return
+        if tag == "tr" and self._table_depth == 1:
+            self._row = []
+        elif tag == "td" and self._table_depth == 1 and self._row is not None:
+            self._cell = {"text": [], "links": []}
+        elif tag == "a" and self._cell is not None and attrs.get("href"):
+            self._cell["links"].append(attrs["href"])
+
+    def handle_endtag(self, tag):
+        if not self._table_depth:
+            return
+        if tag == "table":
+            self._table_depth -= 1
+        elif self._table_depth == 1:
+            if tag == "td" and self._cell is not None and self._row is not None:
+                self._cell["text"] = " ".join("".join(self._cell["text"]).split())
+                self._row.append(self._cell)
+                self._cell = None
+            elif tag == "tr" and self._row is not None:
+                self.rows.append(self._row)
+                self._row = None
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell["text"].append(data)
+
+
+class _DetailPageParser(HTMLParser):
+    """
+    Extrae título, autor, portada y enlace GET de la página de un mirror
+
+    La portada es la imagen del segundo div de #info (`#info/div[2]/img`,
+    como en el flujo de Selenium); si no está ahí, la primera de #info.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self.author = ""
+        self.cover_src = ""
+        self.fallback_cover_src = ""
+        self.download_href = ""
+        self._stack: List[str] = []
+        self._info_depth = 0  # profundidad del div#info en la pila
+        self._info_divs = 0  # divs hijos directos de #info vistos
+        self._cover_div = False  # dentro de #info/div[2]
+        self._capture: Optional[str] = None
+        self._buffer: List[str] = []
+        self._in_h2 = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag in ("img", "br", "meta", "link", "input", "hr"):
+            self._void_tag(tag, attrs)
+            return
+        self._stack.append(tag)
+        if tag == "div" and attrs.get("id") == "info":
+            self._info_depth = len(self._stack)
+            self._info_divs = 0
+        elif tag == "div" and self._info_depth and len(self._stack) == self._info_depth + 1:
+            self._info_divs += 1
+            self._cover_div = self._info_divs == 2
+        elif self._info_depth and tag == "h1" and not self.title:
+            self._start_capture("title")
+        elif self._info_depth and tag == "p" and not self.author:
+            self._start_capture("author")
+        elif tag == "h2":
+            self._in_h2 = True
+        elif tag == "a" and self._in_h2 and not self.download_href:
+            self.download_href = attrs.get("href") or ""
+
+    def _void_tag(self, tag, attrs):
+        if tag != "img" or not self._info_depth:
+            return
+        if self._cover_div and not self.cover_src:
+            self.cover_src = attrs.get("src") or ""
+        elif not self.fallback_cover_src:
+            self.fallback_cover_src = attrs.get("src") or ""
+
+    def handle_startendtag(self, tag, attrs):
+        self._void_tag(tag, dict(attrs))
+
+    def handle_endtag(self, tag):
+        if tag not in self._stack:
+            return
+        # Cerrar también las etiquetas que quedaron abiertas (HTML mal formado)
+        while self._stack:
+            closed = self._stack.pop()
+            if self._capture and closed in ("h1", "p"):
+                self._end_capture()
+            if closed == "h2":
+                self._in_h2 = False
+            if closed == "div" and len(self._stack) == self._info_depth:
+                self._cover_div = False
+            if self._info_depth > len(self._stack):
+                self._info_depth = 0
+            if closed == tag:
+                break
+
+    def handle_data(self, data):
+        if self._capture:
+            self._buffer.append(data)
+
+    def _start_capture(self, field):
+        self._capture = field
+        self._buffer = []
+
+    def _end_capture(self):
+        setattr(self, self._capture, " ".join("".join(self._buffer).split()))
+        self._capture = None
+        self._buffer = []
+
+
+def parse_search_results(html: str, page_url: str, limit: int = 20) -> List[Dict[str, str]]:
+    """
+    Obtiene las filas de la tabla de resultados de libgen.is
+
+    Args:
+        html: HTML de la página search.php
+        page_url: URL de la página, para resolver enlaces relativos
+        limit: Número máximo de filas a devolver
+
+    Returns:
+        List[Dict[str, str]]: Filas con las claves 'mirror_url' y 'file_format'
+
+    Raises:
+        LibgenParseError: Si la página no contiene la tabla de resultados
+    """
+    parser = _ResultsTableParser()
+    parser.feed(html)
+    parser.close()
+    if not parser.found:
+        raise LibgenParseError("No se encontró la tabla de resultados")
+
+    results = []
+    for cells in parser.rows[1:]:  # la primera fila es la cabecera
+        if len(cells) < 10 or not cells[9]["links"]:
+            continue
+        results.append({
+            "mirror_url": urljoin(page_url, cells[9]["links"][0]),
+            "file_format": cells[8]["text"],
+        })
+        if len(results) >= limit:
+            break
+    return results
+
+
+def parse_detail_page(html: str, page_url: str) -> Dict[str, str]:
+    """
+    Obtiene los datos del libro desde la página de un mirror
+
+    Returns:
+        Dict[str, str]: Claves 'title', 'author', 'url' y 'cover_url'
+
+    Raises:
+        LibgenParseError: Si la página no contiene el bloque #info
+    """
+    parser = _DetailPageParser()
+    parser.feed(html)
+    parser.close()
+    if not parser.title and not parser.download_href:
+        raise LibgenParseError(f"Página de detalle sin información: {page_url}")
+    cover_src = parser.cover_src or parser.fallback_cover_src
+
+    return {
+        "title": parser.title,
+        "author": parser.author,
+        "url": urljoin(page_url, parser.download_href) if parser.download_href else "",
+        "cover_url": urljoin(page_url, cover_src) if cover_src else "",
+    }
@@ -1,5 +1,7 @@
 # Importar las entidades principales
-from .book import Book
+from .book import Book, FrozenBook
+from .book_batch import BookBatch
 from .download_status import DownloadStatus
+from .image_match import ImageMatch
 
-__all__ = ["Book", "DownloadStatus"]
\ No newline at end of file
+__all__ = ["Book", "BookBatch", "DownloadStatus", "FrozenBook", "ImageMatch"]
@@ -1,7 +1,8 @@
 # src/domain/entities/book.py
 from dataclasses import dataclass
 
-@dataclass
+# slots=True: sin __dict__ por instancia, importa en catálogos grandes
+@dataclass(slots=True)
 class Book:
     id: str
     title: str
@@ -10,3 +11,19 @@ class Book:
     cover_url: str  # Nuevo campo para la imagen
     file_format: str 
 
+    def freeze(self) -> "FrozenBook":
+        return FrozenBook(self.id, self.title, self.author, self.url, self.cover_url, self.file_format)
+
+
+@dataclass(slots=True, frozen=True)
+class FrozenBook:
+    """Variante inmutable (y hashable) de Book, para compartir sin copias defensivas"""
+    id: str
+    title: str
+    author: str
+    url: str
+    cover_url: str
+    file_format: str
+
+    def thaw(self) -> Book:
+        return Book(self.id, self.title, self.author, self.url, self.cover_url, self.file_format)
@@ -0,0 +1,101 @@
+from array import array
+from typing import Dict, Iterable, Iterator, List, overload
+
+from .book import Book
+
+
+class _StringPool:
+    """Codifica cadenas muy repetidas (autores, formatos) como índices de 32 bits"""
+    __slots__ = ("values", "_codes")
+
+    def __init__(self):
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def code(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class BookBatch:
+    """
+    Colección columnar de libros para catálogos y resultados grandes.
+
+    Cada campo es una columna: los ids son enteros en un `array('q')`, el
+    autor y el formato se guardan una sola vez en un pool y cada fila solo
+    lleva su índice. Al iterar o indexar se devuelven `Book` construidos al
+    vuelo, así que el resto de la aplicación no necesita saber que existe.
+    """
+    __slots__ = ("ids", "titles", "urls", "cover_urls", "_author_codes", "_format_codes", "_authors", "_formats")
+
+    def __init__(self, books: Iterable[Book] = ()):
+        self.ids = array("q")
+        self.titles: List[str] = []
+        self.urls: List[str] = []
+        self.cover_urls: List[str] = []
+        self._author_codes = array("I")
+        self._format_codes = array("I")
+        self._authors = _StringPool()
+        self._formats = _StringPool()
+        self.extend(books)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def append_row(self, id: int, title: str, author: str, url: str, cover_url: str, file_format: str) -> int:
+        """Añade una fila sin crear un Book y devuelve su posición"""
+        self.ids.append(id)
+        self.titles.append(title)
+        self.urls.append(url)
+        self.cover_urls.append(cover_url)
+        self._author_codes.append(self._authors.code(author))
+        self._format_codes.append(self._formats.code(file_format))
+        return len(self.ids) - 1
+
+    def append(self, book: Book) -> int:
+        return self.append_row(int(book.id), book.title, book.author, book.url, book.cover_url, book.file_format)
+
+    def set(self, index: int, book: Book):
+        """Sobrescribe la fila `index` con `book` (p. ej. un libro actualizado)"""
+        self.ids[index] = int(book.id)
+        self.titles[index] = book.title
+        self.urls[index] = book.url
+        self.cover_urls[index] = book.cover_url
+        self._author_codes[index] = self._authors.code(book.author)
+        self._format_codes[index] = self._formats.code(book.file_format)
+
+    def extend(self, books: Iterable[Book]):
+        for book in books:
+            self.append(book)
+
+    def _book(self, index: int) -> Book:
+        return Book(
+            id=str(self.ids[index]),
+            title=self.titles[index],
+            author=self._authors.values[self._author_codes[index]],
+            url=self.urls[index],
+            cover_url=self.cover_urls[index],
+            file_format=self._formats.values[self._format_codes[index]]
+        )
+
+    @overload
+    def __getitem__(self, index: int) -> Book: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Book]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._book(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("BookBatch index out of range")
+        return self._book(index)
+
+    def __iter__(self) -> Iterator[Book]:
+        for index in range(len(self)):
+            yield self._book(index)
@@ -1,14 +1,18 @@
+import time
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
+from typing import Optional, Tuple
 
 
 class DownloadState(Enum):
     PENDING = "pending"
     DOWNLOADING = "downloading"
+    PAUSED = "paused"
     PROCESSING = "processing"
     COMPLETED = "completed"
     ERROR = "error"
+    CANCELLED = "cancelled"
 
 
 @dataclass
@@ -19,6 +23,11 @@ class DownloadStatus:
     error_message: str = ""
     start_time: datetime = None
     end_time: datetime = None
+    resumed_bytes: int = 0  # bytes recuperados de descargas parciales anteriores
+    downloaded_bytes: int = 0
+    total_bytes: int = 0
+    speed: float = 0.0  # bytes por segundo (media móvil)
+    _last_sample: Optional[Tuple[float, int]] = field(default=None, repr=False, compare=False)
 
     def __post_init__(self):
         if self.start_time is None:
@@ -34,9 +43,55 @@ class DownloadStatus:
         self.error_message = error_message
         self.end_time = datetime.now()
 
+    def pause(self):
+        self.state = DownloadState.PAUSED
+        self.speed = 0.0
+        self._last_sample = None
+
+    def cancel(self):
+        self.state = DownloadState.CANCELLED
+        self.end_time = datetime.now()
+
+    @property
+    def is_finished(self) -> bool:
+        return self.state in (DownloadState.COMPLETED, DownloadState.ERROR, DownloadState.CANCELLED)
+
     def update_progress(self, progress: float):
         self.progress = min(max(progress, 0.0), 100.0)
 
+    def update_transfer(self, downloaded: int, total: int, smoothing: float = 0.3):
+        """Actualiza bytes, porcentaje y velocidad a partir del avance de la transferencia"""
+        now = time.monotonic()
+        if self._last_sample and downloaded >= self._last_sample[1]:
+            elapsed = now - self._last_sample[0]
+            if elapsed >= 0.2:
+                rate = (downloaded - self._last_sample[1]) / elapsed
+                self.speed = rate if not self.speed else smoothing * rate + (1 - smoothing) * self.speed
+                self._last_sample = (now, downloaded)
+        else:
+            self._last_sample = (now, downloaded)
+
+        self.downloaded_bytes = downloaded
+        self.total_bytes = total
+        if total > 0:
+            self.update_progress(downloaded / total * 100)
+
+    @property
+    def eta(self) -> Optional[float]:
+        """Segundos restantes estimados, o None si no se pueden calcular"""
+        if self.speed <= 0 or self.total_bytes <= 0:
+            return None
+        return max(self.total_bytes - self.downloaded_bytes, 0) / self.speed
+
+    def record_resume(self, offset: int):
+        """
+        Anota los bytes que no hubo que volver a descargar
+
+        Se llama en cada reanudación con el byte en que continúa; los mismos
+        bytes no se cuentan dos veces aunque la descarga se reanude varias.
+        """
+        self.resumed_bytes = max(self.resumed_bytes, offset)
+
     @property
     def duration(self) -> float:
         """Retorna la duración en segundos"""
@@ -0,0 +1,12 @@
+from dataclasses import dataclass
+
+from .book import Book
+
+
+@dataclass
+class ImageMatch:
+    """Resultado de comparar la imagen del usuario con la portada de un libro"""
+    book: Book
+    score: float        # proporción de matches, de 0 a 1
+    matches: int = 0
+    is_match: bool = False
@@ -1,4 +1,12 @@
+from typing import TYPE_CHECKING
 
-from .ml.speech_recognition_model import SpeechRecognitionModel
+from src.lazy_import import lazy_exports
 
-__all__ = ["SpeechRecognitionModel"]
\ No newline at end of file
+if TYPE_CHECKING:
+    from .ml.speech_recognition_model import SpeechRecognitionModel
+
+__all__ = ["SpeechRecognitionModel"]
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "SpeechRecognitionModel": ".ml.speech_recognition_model",
+})
@@ -0,0 +1,4 @@
+from .recorder import RingBufferRecorder, save_wav
+from .vad import EnergyVad
+
+__all__ = ["EnergyVad", "RingBufferRecorder", "save_wav"]
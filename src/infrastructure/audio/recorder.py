@@ -0,0 +1,123 @@
+import logging
+import threading
+import wave
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+import speech_recognition as sr
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2  # int16
+
+
+class RingBufferRecorder:
+    """
+    Graba del micrófono en un búfer circular int16 reservado de antemano.
+
+    El callback de sounddevice solo copia cada bloque a su sitio en el
+    búfer: no reserva memoria ni crece una lista. Si la grabación supera
+    `max_seconds` se conservan los últimos `max_seconds` segundos.
+
+    Las posiciones son absolutas (muestras desde que empezó la grabación),
+    así que se puede leer un tramo con `read` mientras se sigue grabando.
+    """
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE, max_seconds: float = 120.0):
+        self.sample_rate = sample_rate
+        self.capacity = int(sample_rate * max_seconds)
+        self.logger = logging.getLogger(__name__)
+        self._buffer = np.zeros(self.capacity, dtype=np.int16)
+        self._written = 0
+        self._lock = threading.Lock()
+        self._stream = None
+        self._on_block: Optional[Callable[[np.ndarray], None]] = None
+
+    @property
+    def frames_written(self) -> int:
+        return self._written
+
+    @property
+    def is_recording(self) -> bool:
+        return self._stream is not None
+
+    def start(self, on_block: Optional[Callable[[np.ndarray], None]] = None):
+        """
+        Empieza a grabar desde cero (el búfer se reutiliza)
+
+        Args:
+            on_block: Se llama desde el hilo de audio con cada bloque ya
+                copiado al búfer; debe ser rápido (p. ej. detección de voz)
+        """
+        import sounddevice as sd
+
+        self._written = 0
+        self._on_block = on_block
+        self._stream = sd.InputStream(
+            samplerate=self.sample_rate,
+            channels=1,
+            dtype="int16",
+            callback=self._callback
+        )
+        self._stream.start()
+
+    def _callback(self, indata, frames, time, status):
+        if status:
+            self.logger.warning(f"Estado de la grabación: {status}")
+        samples = indata[:, 0]
+        self.write(samples)
+        if self._on_block is not None:
+            self._on_block(samples)
+
+    def write(self, samples: np.ndarray):
+        """Copia un bloque de muestras al búfer, sobrescribiendo las más antiguas si no cabe"""
+        count = len(samples)
+        if count >= self.capacity:
+            samples = samples[-self.capacity:]
+        with self._lock:
+            start = (self._written + count - len(samples)) % self.capacity
+            first = min(len(samples), self.capacity - start)
+            self._buffer[start:start + first] = samples[:first]
+            self._buffer[:len(samples) - first] = samples[first:]
+            self._written += count
+
+    def read(self, start: int = 0, stop: int | None = None) -> np.ndarray:
+        """
+        Copia de las muestras entre las posiciones absolutas `start` y `stop`
+
+        Lo que ya se sobrescribió en el búfer se descarta.
+        """
+        with self._lock:
+            stop = self._written if stop is None else min(stop, self._written)
+            start = max(start, self._written - self.capacity, 0)
+            if stop <= start:
+                return np.zeros(0, dtype=np.int16)
+            first = start % self.capacity
+            last = first + (stop - start)
+            if last <= self.capacity:
+                return self._buffer[first:last].copy()
+            return np.concatenate((self._buffer[first:], self._buffer[:last - self.capacity]))
+
+    def stop(self) -> np.ndarray:
+        """Detiene la grabación y devuelve el clip completo"""
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+        self._on_block = None
+        return self.read()
+
+    def to_audio_data(self, samples: np.ndarray) -> sr.AudioData:
+        """Clip en memoria listo para el reconocedor, sin pasar por disco"""
+        return sr.AudioData(samples.tobytes(), self.sample_rate, SAMPLE_WIDTH)
+
+
+def save_wav(path: str | Path, samples: np.ndarray, sample_rate: int = SAMPLE_RATE) -> Path:
+    """Guarda muestras int16 mono como WAV"""
+    path = Path(path)
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(SAMPLE_WIDTH)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.astype(np.int16, copy=False).tobytes())
+    return path
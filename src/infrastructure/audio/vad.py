@@ -0,0 +1,112 @@
+from collections import deque
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .recorder import SAMPLE_RATE
+
+
+class EnergyVad:
+    """
+    Detector de actividad de voz por energía, pensado para el callback del micrófono.
+
+    Divide el audio en tramas de `frame_ms` y compara su energía (RMS) con un
+    umbral que sigue al ruido de fondo: una trama es voz si supera el suelo
+    de ruido en `ratio` veces (y al menos `min_rms`). El suelo es la trama
+    más tranquila de los últimos `noise_window_ms`, así que no lo fija el
+    arranque de la grabación aunque ya se esté hablando; hasta llenar esa
+    ventana el umbral es `min_rms`. Una locución termina tras `hangover_ms`
+    de silencio o al llegar a `max_segment_s`.
+
+    `feed` recibe bloques en orden y devuelve los segmentos cerrados como
+    posiciones absolutas `(inicio, fin)` en muestras, con `pre_roll_ms` de
+    margen delante para no cortar el arranque de la primera palabra.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = SAMPLE_RATE,
+        frame_ms: int = 30,
+        ratio: float = 3.0,
+        min_rms: float = 300.0,
+        min_speech_ms: int = 250,
+        hangover_ms: int = 600,
+        pre_roll_ms: int = 200,
+        max_segment_s: float = 15.0,
+        noise_window_ms: int = 1500
+    ):
+        self.frame = sample_rate * frame_ms // 1000
+        self.ratio = ratio
+        self.min_rms = min_rms
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+        self.pre_roll = sample_rate * pre_roll_ms // 1000
+        self.max_segment = int(sample_rate * max_segment_s)
+        self.noise_frames = max(1, noise_window_ms // frame_ms)
+        self.reset()
+
+    def reset(self):
+        self._pending = np.zeros(0, dtype=np.int16)
+        self._position = 0  # muestras ya clasificadas
+        self._recent: deque = deque(maxlen=self.noise_frames)
+        self._start: Optional[int] = None
+        self._speech_frames = 0
+        self._silent_frames = 0
+
+    @property
+    def in_speech(self) -> bool:
+        return self._start is not None
+
+    def feed(self, samples: np.ndarray) -> List[Tuple[int, int]]:
+        """Procesa un bloque y devuelve los segmentos de voz que se cerraron"""
+        if len(self._pending):
+            samples = np.concatenate((self._pending, samples))
+        count = len(samples) // self.frame
+        self._pending = samples[count * self.frame:].copy()
+        if not count:
+            return []
+        frames = samples[:count * self.frame].reshape(count, self.frame).astype(np.float32)
+        energies = np.sqrt(np.mean(frames * frames, axis=1))
+
+        segments = []
+        for rms in energies:
+            self._recent.append(rms)
+            if len(self._recent) == self.noise_frames:
+                threshold = max(min(self._recent) * self.ratio, self.min_rms)
+            else:
+                threshold = self.min_rms
+            voiced = rms > threshold
+            end = self._position + self.frame
+            if self._start is None:
+                if voiced:
+                    self._start = max(0, self._position - self.pre_roll)
+                    self._speech_frames = 1
+                    self._silent_frames = 0
+            else:
+                if voiced:
+                    self._speech_frames += 1
+                    self._silent_frames = 0
+                else:
+                    self._silent_frames += 1
+                if self._silent_frames >= self.hangover_frames or end - self._start >= self.max_segment:
+                    segment = self._close(end)
+                    if segment:
+                        segments.append(segment)
+            self._position = end
+        return segments
+
+    def _close(self, end: int) -> Optional[Tuple[int, int]]:
+        start, speech = self._start, self._speech_frames
+        self._start = None
+        self._speech_frames = self._silent_frames = 0
+        # Golpes o clics sueltos no llegan al mínimo de voz
+        return (start, end) if speech >= self.min_speech_frames else None
+
+    def flush(self) -> Optional[Tuple[int, int]]:
+        """Cierra la locución en curso al terminar la grabación"""
+        end = self._position + len(self._pending)
+        self._pending = np.zeros(0, dtype=np.int16)
+        self._position = end
+        if self._start is None:
+            return None
+        return self._close(end)
@@ -0,0 +1,3 @@
+from .webdriver_pool import WebDriverPool
+
+__all__ = ["WebDriverPool"]
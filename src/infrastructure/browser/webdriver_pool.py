@@ -0,0 +1,187 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Callable, Dict, Optional, Tuple
+
+from selenium import webdriver
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from ..telemetry import get_telemetry
+
+
+def create_chrome_driver() -> WebDriver:
+    """Crea un Chrome headless (llamada bloqueante)"""
+    chrome_options = webdriver.ChromeOptions()
+    chrome_options.add_argument("--headless")  # Ejecución en segundo plano
+    return webdriver.Chrome(options=chrome_options)
+
+
+class WebDriverPool:
+    """
+    Pool acotado de sesiones de WebDriver reutilizables.
+
+    Cada búsqueda toma su propio driver con `lease()` y lo devuelve al
+    terminar. Las sesiones caídas se descartan al prestarlas o devolverlas
+    y las que llevan prestadas más de `max_lease_seconds` se dan por
+    perdidas y se reemplazan.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        factory: Callable[[], WebDriver] = create_chrome_driver,
+        max_uses: int = 50,
+        max_lease_seconds: float = 300.0,
+        acquire_timeout: float = 60.0
+    ):
+        self.size = size
+        self.factory = factory
+        self.max_uses = max_uses
+        self.max_lease_seconds = max_lease_seconds
+        self.acquire_timeout = acquire_timeout
+        self.logger = logging.getLogger(__name__)
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._leased: Dict[int, Tuple[WebDriver, float]] = {}
+        self._uses: Dict[int, int] = {}
+        self._created = 0
+        self._lock = asyncio.Lock()
+        self._closed = False
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    async def _create(self) -> WebDriver:
+        """
+        Arranca un navegador en un hueco ya reservado (`_created += 1` con el cerrojo)
+
+        Se llama sin el cerrojo: arrancar Chrome tarda segundos y mientras
+        tanto los demás préstamos y devoluciones no deben esperar. Si falla,
+        el hueco se libera.
+        """
+        try:
+            # Arrancar un navegador suele ser lo más lento de una búsqueda con Selenium
+            with get_telemetry().span("webdriver", phase="start"):
+                driver = await self._run(self.factory)
+        except BaseException:  # también si se cancela el préstamo
+            self._created -= 1
+            raise
+        self._uses[id(driver)] = 0
+        return driver
+
+    async def _discard(self, driver: WebDriver):
+        """Cierra un driver y libera su hueco en el pool"""
+        self._created -= 1
+        self._uses.pop(id(driver), None)
+        try:
+            await self._run(driver.quit)
+        except Exception as e:
+            self.logger.debug("Error cerrando WebDriver: %s", e)
+
+    async def _is_alive(self, driver: WebDriver) -> bool:
+        try:
+            await self._run(lambda: driver.current_url)
+            return True
+        except Exception:
+            return False
+
+    async def _reclaim_leaked(self):
+        """Reemplaza los drivers que llevan demasiado tiempo prestados"""
+        now = time.monotonic()
+        for key, (driver, since) in list(self._leased.items()):
+            if now - since > self.max_lease_seconds:
+                self.logger.warning("WebDriver prestado hace %.0f s, se recicla", now - since)
+                del self._leased[key]
+                await self._discard(driver)
+
+    async def warm_up(self, count: Optional[int] = None):
+        """Arranca de antemano `count` navegadores (por defecto, el pool completo)"""
+        count = min(count or self.size, self.size)
+        async with self._lock:
+            missing = count - self._created
+            if missing <= 0 or self._closed:
+                return
+            self._created += missing
+        results = await asyncio.gather(
+            *(self._create() for _ in range(missing)), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                self.logger.error("No se pudo precalentar un WebDriver: %s", result)
+            elif self._closed:
+                await self._discard(result)
+            else:
+                self._idle.put_nowait(result)
+
+    async def _acquire(self) -> WebDriver:
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            if self._closed:
+                raise RuntimeError("El pool de WebDriver está cerrado")
+            reserved = False
+            async with self._lock:
+                await self._reclaim_leaked()
+                driver = None
+                if not self._idle.empty():
+                    driver = self._idle.get_nowait()
+                elif self._created < self.size:
+                    self._created += 1
+                    reserved = True
+            if reserved:
+                driver = await self._create()
+            elif driver is None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("No hay WebDriver disponible en el pool")
+                try:
+                    driver = await asyncio.wait_for(self._idle.get(), min(remaining, 5.0))
+                except asyncio.TimeoutError:
+                    continue
+            if await self._is_alive(driver):
+                return driver
+            self.logger.warning("WebDriver caído, se reemplaza")
+            async with self._lock:
+                await self._discard(driver)
+
+    async def _release(self, driver: WebDriver):
+        key = id(driver)
+        async with self._lock:
+            if self._leased.pop(key, None) is None:
+                # Ya fue reciclado por fuga; solo queda cerrarlo
+                try:
+                    await self._run(driver.quit)
+                except Exception:
+                    pass
+                return
+            self._uses[key] = self._uses.get(key, 0) + 1
+            if self._closed or self._uses[key] >= self.max_uses:
+                await self._discard(driver)
+                return
+        try:
+            # Dejar la sesión limpia para el siguiente préstamo
+            await self._run(driver.delete_all_cookies)
+            await self._run(driver.get, "about:blank")
+        except Exception as e:
+            self.logger.warning("WebDriver no se pudo reiniciar, se descarta: %s", e)
+            async with self._lock:
+                await self._discard(driver)
+            return
+        self._idle.put_nowait(driver)
+
+    @asynccontextmanager
+    async def lease(self):
+        """Presta un driver exclusivo durante el bloque `async with`"""
+        with get_telemetry().span("webdriver", phase="acquire"):
+            driver = await self._acquire()
+        self._leased[id(driver)] = (driver, time.monotonic())
+        try:
+            yield driver
+        finally:
+            await self._release(driver)
+
+    async def close(self):
+        """Cierra todos los drivers libres; los prestados se cierran al devolverse"""
+        self._closed = True
+        async with self._lock:
+            while not self._idle.empty():
+                await self._discard(self._idle.get_nowait())
@@ -0,0 +1,19 @@
+from typing import TYPE_CHECKING
+
+from src.lazy_import import lazy_exports
+
+from .paths import default_cache_dir
+
+if TYPE_CHECKING:
+    from .cover_cache import CoverCache, get_cover_cache
+    from .search_cache import SearchCache, normalize_query
+
+__all__ = ["CoverCache", "SearchCache", "default_cache_dir", "get_cover_cache", "normalize_query"]
+
+# La caché de portadas carga OpenCV y numpy: solo cuando se pide
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "CoverCache": ".cover_cache",
+    "get_cover_cache": ".cover_cache",
+    "SearchCache": ".search_cache",
+    "normalize_query": ".search_cache",
+})
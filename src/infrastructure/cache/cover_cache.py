@@ -0,0 +1,173 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+import cv2
+import numpy as np
+import requests
+
+
+class CoverCache:
+    """
+    Caché de portadas en dos niveles.
+
+    - Memoria: LRU de portadas ya decodificadas en escala de grises.
+    - Disco: los bytes se guardan por contenido (`blobs/<sha256>`), así
+      portadas idénticas servidas desde URLs distintas ocupan un solo
+      archivo; un índice por URL (`index/<sha256(url)>.json`) guarda la
+      ETag y Last-Modified para revalidar con peticiones condicionales.
+
+    Dentro de una sesión cada URL se descarga o revalida como mucho una vez.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | Path,
+        memory_items: int = 64,
+        revalidate_after: float = 7 * 24 * 3600,
+        timeout: float = 15.0
+    ):
+        self.root = Path(cache_dir) / "covers"
+        self.blob_dir = self.root / "blobs"
+        self.index_dir = self.root / "index"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.memory_items = memory_items
+        self.revalidate_after = revalidate_after
+        self.timeout = timeout
+        self.logger = logging.getLogger(__name__)
+        self._session = requests.Session()
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._validated: set = set()  # URLs ya comprobadas en esta sesión
+        self._lock = threading.Lock()
+        self._url_locks: Dict[str, threading.Lock] = {}
+
+    @staticmethod
+    def _digest(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def _index_path(self, url: str) -> Path:
+        return self.index_dir / f"{self._digest(url.encode('utf-8'))}.json"
+
+    def _read_index(self, url: str) -> Optional[dict]:
+        try:
+            meta = json.loads(self._index_path(url).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url or not (self.blob_dir / meta.get("content", "")).is_file():
+            return None
+        return meta
+
+    def _write_index(self, url: str, meta: dict):
+        path = self._index_path(url)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def _store_blob(self, data: bytes) -> str:
+        content = self._digest(data)
+        blob_path = self.blob_dir / content
+        if not blob_path.exists():
+            tmp_path = blob_path.with_name(content + ".tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, blob_path)
+        return content
+
+    def _url_lock(self, url: str) -> threading.Lock:
+        with self._lock:
+            return self._url_locks.setdefault(url, threading.Lock())
+
+    def blob_path(self, url: str) -> Path:
+        """
+        Ruta en disco de la portada, descargándola o revalidándola si hace falta
+
+        Raises:
+            ValueError: Si la portada no se puede descargar
+        """
+        with self._url_lock(url):
+            meta = self._read_index(url)
+            if meta and (url in self._validated or time.time() - meta["checked_at"] < self.revalidate_after):
+                self._validated.add(url)
+                return self.blob_dir / meta["content"]
+
+            headers = {}
+            if meta and meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta and meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+            try:
+                response = self._session.get(url, headers=headers, timeout=self.timeout)
+            except requests.RequestException as e:
+                if meta:  # sin conexión: mejor una portada vieja que ninguna
+                    self.logger.warning("No se pudo revalidar %s: %s", url, e)
+                    return self.blob_dir / meta["content"]
+                raise ValueError(f"No se pudo descargar la imagen: {e}") from e
+
+            if response.status_code == 304 and meta:
+                meta["checked_at"] = time.time()
+            elif response.status_code == 200:
+                meta = {
+                    "url": url,
+                    "content": self._store_blob(response.content),
+                    "etag": response.headers.get("ETag", ""),
+                    "last_modified": response.headers.get("Last-Modified", ""),
+                    "checked_at": time.time(),
+                }
+                with self._lock:
+                    self._memory.pop(url, None)
+            else:
+                self.logger.error(f"Error al descargar la imagen: {response.status_code}")
+                raise ValueError("No se pudo descargar la imagen")
+
+            self._write_index(url, meta)
+            self._validated.add(url)
+            return self.blob_dir / meta["content"]
+
+    def get_bytes(self, url: str) -> bytes:
+        """Bytes originales de la portada"""
+        return self.blob_path(url).read_bytes()
+
+    def get_gray(self, url: str) -> np.ndarray:
+        """
+        Portada decodificada en escala de grises
+
+        Raises:
+            ValueError: Si la portada no se puede descargar o decodificar
+        """
+        with self._lock:
+            if url in self._memory:
+                self._memory.move_to_end(url)
+                return self._memory[url]
+
+        data = np.frombuffer(self.get_bytes(url), dtype=np.uint8)
+        image = cv2.imdecode(data, cv2.IMREAD_GRAYSCALE)
+        if image is None:
+            raise ValueError(f"No se pudo decodificar la imagen: {url}")
+
+        with self._lock:
+            self._memory[url] = image
+            self._memory.move_to_end(url)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+        return image
+
+
+_shared_cache: Optional[CoverCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_cover_cache() -> CoverCache:
+    """Caché de portadas compartida de la aplicación"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            from .paths import default_cache_dir
+            _shared_cache = CoverCache(default_cache_dir())
+        return _shared_cache
@@ -0,0 +1,13 @@
+import os
+from pathlib import Path
+
+
+def default_cache_dir() -> Path:
+    """Directorio de caché de la aplicación, creado si no existe"""
+    if os.name == 'nt':  # Windows
+        base = Path(os.environ.get('LOCALAPPDATA', Path.home() / 'AppData' / 'Local'))
+    else:  # Linux/Mac
+        base = Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache'))
+    cache_dir = base / 'BookDownloader'
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
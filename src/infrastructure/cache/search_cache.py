@@ -0,0 +1,112 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+import unicodedata
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from src.domain.entities.book import Book
+
+
+def normalize_query(query: str) -> str:
+    """Normaliza una búsqueda para usarla como clave: mayúsculas, espacios y Unicode"""
+    return " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+
+
+@dataclass
+class CachedSearch:
+    books: List[Book]
+    created_at: float
+    stale: bool
+
+
+class SearchCache:
+    """
+    Caché persistente en SQLite de resultados de búsqueda.
+
+    Las entradas se identifican por la búsqueda normalizada y el mirror.
+    Pasado `ttl` segundos una entrada se sigue devolviendo pero marcada como
+    obsoleta, para que quien la usa la refresque en segundo plano. Al superar
+    `max_entries` se eliminan las menos usadas recientemente.
+    """
+
+    def __init__(self, db_path: str | Path, ttl: float = 6 * 3600, max_entries: int = 500):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS search_cache (
+                    query TEXT NOT NULL,
+                    mirror TEXT NOT NULL,
+                    books TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (query, mirror)
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_search_cache_accessed ON search_cache(accessed_at)"
+            )
+
+    def get(self, query: str, mirror: str) -> Optional[CachedSearch]:
+        """Devuelve los resultados guardados o None si no hay entrada"""
+        key = normalize_query(query)
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT books, created_at FROM search_cache WHERE query = ? AND mirror = ?",
+                (key, mirror)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE search_cache SET accessed_at = ? WHERE query = ? AND mirror = ?",
+                (now, key, mirror)
+            )
+
+        try:
+            books = [Book(**data) for data in json.loads(row[0])]
+        except (ValueError, TypeError) as e:
+            self.logger.warning("Entrada de caché corrupta para '%s': %s", key, e)
+            self.invalidate(query, mirror)
+            return None
+        return CachedSearch(books=books, created_at=row[1], stale=now - row[1] > self.ttl)
+
+    def put(self, query: str, mirror: str, books: List[Book]):
+        """Guarda los resultados de una búsqueda y aplica el límite de tamaño"""
+        key = normalize_query(query)
+        now = time.time()
+        payload = json.dumps([asdict(book) for book in books], ensure_ascii=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache (query, mirror, books, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, mirror, payload, now, now)
+            )
+            self._conn.execute(
+                "DELETE FROM search_cache WHERE rowid IN ("
+                "SELECT rowid FROM search_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def invalidate(self, query: str, mirror: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM search_cache WHERE query = ? AND mirror = ?",
+                (normalize_query(query), mirror)
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,3 +1,39 @@
-from .speech_recognition_model import SpeechRecognitionModel
+from typing import TYPE_CHECKING
 
-__all__ = ["SpeechRecognitionModel"]
\ No newline at end of file
+from src.lazy_import import lazy_exports
+
+if TYPE_CHECKING:
+    from .descriptor_index import CoverFeatures, DescriptorIndex
+    from .perceptual_hash import CoverHashes, ImageHash
+    from .speech_recognition_model import (
+        GoogleBackend,
+        SpeechBackend,
+        SpeechRecognitionModel,
+        VoskBackend,
+        WhisperBackend,
+    )
+
+__all__ = [
+    "CoverFeatures",
+    "CoverHashes",
+    "DescriptorIndex",
+    "GoogleBackend",
+    "ImageHash",
+    "SpeechBackend",
+    "SpeechRecognitionModel",
+    "VoskBackend",
+    "WhisperBackend",
+]
+
+# OpenCV y SpeechRecognition se cargan al pedir el primer nombre que los usa
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "CoverFeatures": ".descriptor_index",
+    "DescriptorIndex": ".descriptor_index",
+    "CoverHashes": ".perceptual_hash",
+    "ImageHash": ".perceptual_hash",
+    "GoogleBackend": ".speech_recognition_model",
+    "SpeechBackend": ".speech_recognition_model",
+    "SpeechRecognitionModel": ".speech_recognition_model",
+    "VoskBackend": ".speech_recognition_model",
+    "WhisperBackend": ".speech_recognition_model",
+})
@@ -0,0 +1,187 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from ..cache.cover_cache import CoverCache
+from ..telemetry import get_telemetry
+
+DESCRIPTOR_SIZE = 32  # bytes por descriptor ORB
+
+
+@dataclass
+class CoverFeatures:
+    """Rasgos ORB de una portada: coordenadas de los keypoints y descriptores"""
+    points: np.ndarray       # float32 (N, 2)
+    descriptors: np.ndarray  # uint8 (N, 32)
+
+    def __len__(self) -> int:
+        return len(self.descriptors)
+
+
+class DescriptorIndex:
+    """
+    Índice de descriptores ORB de las portadas.
+
+    Los descriptores de todas las portadas viven empaquetados en un único
+    array uint8 (M, 32), con las coordenadas de sus keypoints en otro
+    float32 (M, 2); cada portada guarda solo su desplazamiento y cuántas
+    filas ocupa. Las entradas se identifican por el hash del contenido de la
+    portada en `CoverCache`, así que una portada que cambia se recalcula.
+
+    El índice se guarda junto a la caché de portadas (`orb_index.npz`) y al
+    superar `max_entries` se descartan las portadas más antiguas.
+    """
+
+    def __init__(self, cover_cache: CoverCache, n_features: int = 500, max_entries: int = 2000):
+        self.cover_cache = cover_cache
+        self.n_features = n_features
+        self.max_entries = max_entries
+        self.index_path = cover_cache.root / "orb_index.npz"
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._entries: "OrderedDict[str, Tuple[int, int]]" = OrderedDict()
+        self._descriptors = np.empty((0, DESCRIPTOR_SIZE), dtype=np.uint8)
+        self._points = np.empty((0, 2), dtype=np.float32)
+        self._pending: List[Tuple[np.ndarray, np.ndarray]] = []
+        self._pending_rows = 0
+        self._dirty = False
+        self._load()
+
+    def _orb(self):
+        # Los detectores de OpenCV no se deben compartir entre hilos
+        orb = getattr(self._local, "orb", None)
+        if orb is None:
+            orb = self._local.orb = cv2.ORB_create(nfeatures=self.n_features)
+        return orb
+
+    def compute(self, image: np.ndarray) -> CoverFeatures:
+        """Calcula los rasgos ORB de una imagen en escala de grises"""
+        with get_telemetry().span("image", phase="detect"):
+            keypoints, descriptors = self._orb().detectAndCompute(image, None)
+        if descriptors is None:
+            return CoverFeatures(
+                np.empty((0, 2), dtype=np.float32),
+                np.empty((0, DESCRIPTOR_SIZE), dtype=np.uint8)
+            )
+        points = np.array([kp.pt for kp in keypoints], dtype=np.float32).reshape(-1, 2)
+        return CoverFeatures(points, descriptors)
+
+    def _compact(self):
+        """Une los bloques añadidos desde la última lectura al array empaquetado"""
+        if not self._pending:
+            return
+        self._descriptors = np.concatenate([self._descriptors] + [d for d, _ in self._pending])
+        self._points = np.concatenate([self._points] + [p for _, p in self._pending])
+        self._pending = []
+        self._pending_rows = 0
+
+    def _lookup(self, key: str) -> Optional[CoverFeatures]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._compact()
+            offset, count = entry
+            return CoverFeatures(
+                self._points[offset:offset + count],
+                self._descriptors[offset:offset + count]
+            )
+
+    def get(self, url: str) -> CoverFeatures:
+        """
+        Rasgos de la portada de `url`, calculándolos si aún no están indexados
+
+        Raises:
+            ValueError: Si la portada no se puede descargar o decodificar
+        """
+        # El nombre del blob es el hash de su contenido
+        key = self.cover_cache.blob_path(url).name
+        features = self._lookup(key)
+        if features is not None:
+            return features
+
+        with get_telemetry().span("image", phase="download"):
+            gray = self.cover_cache.get_gray(url)
+        features = self.compute(gray)
+        with self._lock:
+            if key not in self._entries:
+                offset = len(self._descriptors) + self._pending_rows
+                self._entries[key] = (offset, len(features))
+                self._pending.append((features.descriptors, features.points))
+                self._pending_rows += len(features)
+                self._dirty = True
+        return features
+
+    def add(self, url: str) -> bool:
+        """Indexa la portada de `url`; devuelve False si no se pudo"""
+        try:
+            self.get(url)
+            return True
+        except Exception as e:
+            self.logger.warning("No se pudo indexar la portada %s: %s", url, e)
+            return False
+
+    def _load(self):
+        if not self.index_path.exists():
+            return
+        try:
+            with np.load(self.index_path) as data:
+                if int(data["n_features"]) != self.n_features:
+                    return
+                keys = [str(key) for key in data["keys"]]
+                offsets = data["offsets"].tolist()
+                counts = data["counts"].tolist()
+                self._descriptors = data["descriptors"]
+                self._points = data["points"]
+        except (OSError, ValueError, KeyError) as e:
+            self.logger.warning("Índice de descriptores ilegible, se ignora: %s", e)
+            return
+        self._entries = OrderedDict(zip(keys, zip(offsets, counts)))
+
+    def _prune(self):
+        """Descarta las portadas más antiguas y reempaqueta los arrays"""
+        self._compact()
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        descriptors, points, entries, offset = [], [], OrderedDict(), 0
+        for key, (start, count) in self._entries.items():
+            descriptors.append(self._descriptors[start:start + count])
+            points.append(self._points[start:start + count])
+            entries[key] = (offset, count)
+            offset += count
+        self._descriptors = np.concatenate(descriptors) if descriptors else self._descriptors[:0]
+        self._points = np.concatenate(points) if points else self._points[:0]
+        self._entries = entries
+
+    def save(self):
+        """Guarda el índice en disco si ha cambiado"""
+        with self._lock:
+            if not self._dirty:
+                return
+            if len(self._entries) > self.max_entries:
+                self._prune()
+            self._compact()
+            offsets, counts = zip(*self._entries.values()) if self._entries else ((), ())
+            tmp_path = self.index_path.with_name(self.index_path.name + ".tmp")
+            try:
+                with open(tmp_path, "wb") as f:
+                    np.savez(
+                        f,
+                        n_features=np.int32(self.n_features),
+                        keys=np.array(list(self._entries), dtype=str),
+                        offsets=np.array(offsets, dtype=np.int64),
+                        counts=np.array(counts, dtype=np.int64),
+                        descriptors=self._descriptors,
+                        points=self._points
+                    )
+                os.replace(tmp_path, self.index_path)
+                self._dirty = False
+            except OSError as e:
+                self.logger.error("No se pudo guardar el índice de descriptores: %s", e)
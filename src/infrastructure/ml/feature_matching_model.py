@@ -1,70 +1,170 @@
 import cv2
 from pathlib import Path
 import numpy as np
-import requests
 from urllib.parse import urlparse
 import logging
+from typing import Optional, Tuple
+from ..cache.cover_cache import CoverCache, get_cover_cache
+from ..telemetry import get_telemetry
+from .descriptor_index import CoverFeatures
+
+MIN_MATCH_RATIO = 0.3
+# Con test de ratio o RANSAC casi no quedan matches casuales: umbrales más bajos
+VERIFIED_MIN_MATCHES = 50
+VERIFIED_MIN_RATIO = 0.1
+
+MATCHERS = ("bf", "flann")
+FLANN_INDEX_LSH = 6
+FLANN_LSH_PARAMS = dict(algorithm=FLANN_INDEX_LSH, table_number=6, key_size=12, multi_probe_level=1)
+FLANN_SEARCH_PARAMS = dict(checks=50)
+
+
+def is_match(n_matches: int, match_ratio: float, min_matches: int = 100, min_ratio: float = MIN_MATCH_RATIO) -> bool:
+    """Criterio para dar una portada por coincidente"""
+    return n_matches > min_matches and match_ratio > min_ratio
+
+
 class FeatureMatchingModel:
-    def __init__(self, image_path, image_url):
+    """
+    Compara la imagen del usuario con una portada mediante rasgos ORB.
+
+    `matcher` elige cómo emparejar descriptores:
+    - "bf": fuerza bruta con verificación cruzada (coste cuadrático).
+    - "flann": vecinos aproximados con índice LSH y test de ratio de Lowe
+      (`ratio`).
+    Con `ransac=True` solo cuentan los matches coherentes con una
+    homografía, lo que descarta coincidencias casuales en portadas parecidas.
+    """
+
+    def __init__(
+        self,
+        image_path,
+        image_url,
+        cover_cache: Optional[CoverCache] = None,
+        matcher: str = "bf",
+        ratio: float = 0.75,
+        ransac: bool = False,
+        ransac_threshold: float = 5.0
+    ):
+        if matcher not in MATCHERS:
+            raise ValueError(f"Matcher desconocido: {matcher}")
         self.image_path = image_path
         self.image_url = image_url
+        self.cover_cache = cover_cache or get_cover_cache()
+        self.matcher = matcher
+        self.ratio = ratio
+        self.ransac = ransac
+        self.ransac_threshold = ransac_threshold
         self.logger = logging.getLogger(__name__)
     
     
     def download_image(self , url : str) -> np.ndarray:
-    # Descarga la imagen desde la URL
-        response = requests.get(url, stream=True)
-        if response.status_code != 200:
-            self.logger.error(f"Error al descargar la imagen: {response.status_code}")
-            raise ValueError("No se pudo descargar la imagen")
-        
-        # Convierte los bytes de la imagen a un array de OpenCV
-        image_bytes = np.asarray(bytearray(response.content), dtype=np.uint8)
+    # Descarga la imagen desde la URL (o la toma de la caché de portadas)
+        with get_telemetry().span("image", phase="download"):
+            image_bytes = np.frombuffer(self.cover_cache.get_bytes(url), dtype=np.uint8)
         image = cv2.imdecode(image_bytes, cv2.IMREAD_COLOR)
         return image
     
     def load_images(self):
         # Load images in grayscale
-        image_url = self.download_image(self.image_url)
         img1 = cv2.imread(self.image_path, cv2.IMREAD_GRAYSCALE)
-        img2 = cv2.cvtColor(image_url, cv2.COLOR_BGR2GRAY)
+        # La portada ya decodificada en gris se reutiliza entre comparaciones
+        with get_telemetry().span("image", phase="download"):
+            img2 = self.cover_cache.get_gray(self.image_url)
         return img1, img2
 
     def detect_and_compute(self, img : np.ndarray):
         # Initialize ORB detector
         orb = cv2.ORB_create()
         # Detect keypoints and compute descriptors
-        keypoints, descriptors = orb.detectAndCompute(img, None)
+        with get_telemetry().span("image", phase="detect"):
+            keypoints, descriptors = orb.detectAndCompute(img, None)
         return keypoints, descriptors
 
     def match_features(self, des1, des2):
+        if self.matcher == "flann":
+            return self._match_flann(des1, des2)
         # Match descriptors using Brute-Force matcher
         bf = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=True)
-        matches = bf.match(des1, des2)
-        # Sort matches by distance
-        matches = sorted(matches, key=lambda x: x.distance)
+        # Solo se usa el número de matches: no hace falta ordenarlos
+        return bf.match(des1, des2)
+
+    def _match_flann(self, des1, des2):
+        """Vecinos aproximados con un índice LSH y test de ratio de Lowe"""
+        flann = cv2.FlannBasedMatcher(FLANN_LSH_PARAMS, FLANN_SEARCH_PARAMS)
+        matches = []
+        for pair in flann.knnMatch(des1, des2, k=2):
+            if len(pair) == 2 and pair[0].distance < self.ratio * pair[1].distance:
+                matches.append(pair[0])
+            elif len(pair) == 1 and self.ransac:
+                # LSH puede devolver un solo vecino: sin test de ratio, solo
+                # cuenta si después lo verifica la homografía
+                matches.append(pair[0])
         return matches
 
-    def compare_images(self , min_matches=100)->bool:
-        img1, img2 = self.load_images()
-        kp1, des1 = self.detect_and_compute(img1)
-        kp2, des2 = self.detect_and_compute(img2)
+    def _inliers(self, matches, query: CoverFeatures, cover: CoverFeatures) -> int:
+        """Matches coherentes con una homografía estimada por RANSAC"""
+        if len(matches) < 4:
+            return 0
+        src = query.points[[m.queryIdx for m in matches]].reshape(-1, 1, 2)
+        dst = cover.points[[m.trainIdx for m in matches]].reshape(-1, 1, 2)
+        _, mask = cv2.findHomography(src, dst, cv2.RANSAC, self.ransac_threshold)
+        return int(mask.sum()) if mask is not None else 0
+
+    def is_match(self, n_matches: int, match_ratio: float, min_matches: Optional[int] = None) -> bool:
+        """Aplica los umbrales que corresponden al emparejador elegido"""
+        if self.matcher == "bf" and not self.ransac:
+            return is_match(n_matches, match_ratio, min_matches or 100)
+        return is_match(n_matches, match_ratio, min_matches or VERIFIED_MIN_MATCHES, VERIFIED_MIN_RATIO)
+
+    @staticmethod
+    def _features(keypoints, descriptors) -> CoverFeatures:
+        points = np.array([kp.pt for kp in keypoints], dtype=np.float32).reshape(-1, 2)
+        if descriptors is None:
+            descriptors = np.empty((0, 32), dtype=np.uint8)
+        return CoverFeatures(points, descriptors)
+
+    def score_features(self, query: CoverFeatures, cover: CoverFeatures) -> Tuple[int, float]:
+        """
+        Compara los rasgos de la imagen del usuario con los de una portada
+
+        Returns:
+            Número de matches y proporción respecto a la imagen con más keypoints
+        """
+        if not len(query) or not len(cover):
+            return 0, 0.0
+        telemetry = get_telemetry()
+        with telemetry.span("image", phase="match", matcher=self.matcher):
+            matches = self.match_features(query.descriptors, cover.descriptors)
+        if self.ransac:
+            with telemetry.span("image", phase="verify"):
+                n_matches = self._inliers(matches, query, cover)
+        else:
+            n_matches = len(matches)
+        return n_matches, n_matches / max(len(query), len(cover))
+
+    def compare_images(self , min_matches=None, cover_features: Optional[CoverFeatures] = None)->bool:
+        if cover_features is None:
+            img1, img2 = self.load_images()
+            cover_features = self._features(*self.detect_and_compute(img2))
+        else:
+            # Portada ya indexada: solo hay que procesar la imagen del usuario
+            img1 = cv2.imread(self.image_path, cv2.IMREAD_GRAYSCALE)
+        query_features = self._features(*self.detect_and_compute(img1))
 
         # Si no se detectaron descriptores, abortar
-        if des1 is None or des2 is None:
+        if not len(query_features) or not len(cover_features):
             self.logger.info("No se detectaron descriptores en una de las imágenes.")
             return False
 
-        matches = self.match_features(des1, des2)
+        n_matches, match_ratio = self.score_features(query_features, cover_features)
 
         
-        self.logger.info(f"Número de matches encontrados: {len(matches)}")
-        
-        match_ratio = len(matches) / max(len(kp1), len(kp2)) if max(len(kp1), len(kp2)) > 0 else 0
+        self.logger.info(f"Número de matches encontrados: {n_matches}")
         
         self.logger.info(f"Match ratio: {match_ratio:.2f}")
         
-        return len(matches) > min_matches and match_ratio > 0.3
+        return self.is_match(n_matches, match_ratio, min_matches)
     #TODO: Tipar correctamente los outputs and inputs de las funciones
     
     
\ No newline at end of file
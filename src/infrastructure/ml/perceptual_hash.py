@@ -0,0 +1,124 @@
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Sequence
+
+import cv2
+import numpy as np
+
+from ..cache.cover_cache import CoverCache
+
+HASH_SIZE = 8  # 8x8 bits = enteros de 64 bits
+HIST_BINS = [8, 4, 4]  # H, S, V
+# En una foto la portada suele ocupar el centro rodeada de fondo: la huella
+# de la consulta se calcula también sobre recortes centrales
+QUERY_CROPS = (1.0, 0.8, 0.65)
+
+
+@dataclass(frozen=True)
+class ImageHash:
+    """Huella global de una imagen: pHash, dHash y histograma de color HSV"""
+    phash: int
+    dhash: int
+    histogram: np.ndarray  # float32, normalizado
+
+    def distance(self, other: "ImageHash", hist_weight: float = 16.0) -> float:
+        """
+        Distancia combinada: bits distintos en ambos hashes más la distancia
+        de Bhattacharyya entre histogramas (0 a 1) escalada por `hist_weight`
+        """
+        bits = hamming(self.phash, other.phash) + hamming(self.dhash, other.dhash)
+        colour = cv2.compareHist(self.histogram, other.histogram, cv2.HISTCMP_BHATTACHARYYA)
+        return bits + hist_weight * colour
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def _bits_to_int(bits: np.ndarray) -> int:
+    value = 0
+    for bit in bits.ravel():
+        value = (value << 1) | int(bit)
+    return value
+
+
+def dhash(gray: np.ndarray) -> int:
+    """Hash de diferencias: compara cada píxel con su vecino de la derecha"""
+    small = cv2.resize(gray, (HASH_SIZE + 1, HASH_SIZE), interpolation=cv2.INTER_AREA)
+    return _bits_to_int(small[:, 1:] > small[:, :-1])
+
+
+def phash(gray: np.ndarray) -> int:
+    """Hash perceptual: signo de las frecuencias bajas de la DCT respecto a su mediana"""
+    small = cv2.resize(gray, (HASH_SIZE * 4, HASH_SIZE * 4), interpolation=cv2.INTER_AREA)
+    low = cv2.dct(np.float32(small))[:HASH_SIZE, :HASH_SIZE]
+    # La componente continua solo refleja el brillo medio
+    median = np.median(low.ravel()[1:])
+    return _bits_to_int(low > median)
+
+
+def color_histogram(image: np.ndarray) -> np.ndarray:
+    """Histograma HSV normalizado de una imagen BGR"""
+    hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+    hist = cv2.calcHist([hsv], [0, 1, 2], None, HIST_BINS, [0, 180, 0, 256, 0, 256])
+    return cv2.normalize(hist, hist).flatten()
+
+
+def image_hash(image: np.ndarray) -> ImageHash:
+    """Calcula la huella de una imagen BGR"""
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    return ImageHash(phash(gray), dhash(gray), color_histogram(image))
+
+
+def query_hashes(image: np.ndarray, crops: Sequence[float] = QUERY_CROPS) -> List[ImageHash]:
+    """Huellas de la imagen del usuario completa y de sus recortes centrales"""
+    height, width = image.shape[:2]
+    hashes = []
+    for fraction in crops:
+        crop_h, crop_w = int(height * fraction), int(width * fraction)
+        top, left = (height - crop_h) // 2, (width - crop_w) // 2
+        hashes.append(image_hash(image[top:top + crop_h, left:left + crop_w]))
+    return hashes
+
+
+def rank_by_hash(queries: Sequence[ImageHash], candidates: Sequence[ImageHash]) -> List[int]:
+    """
+    Índices de `candidates` del más parecido al menos parecido, tomando para
+    cada uno la menor distancia a cualquiera de las huellas de la consulta
+    """
+    distances = [min(query.distance(candidate) for query in queries) for candidate in candidates]
+    return sorted(range(len(candidates)), key=distances.__getitem__)
+
+
+class CoverHashes:
+    """
+    Huellas de las portadas de `CoverCache`, calculadas una vez por sesión.
+
+    Sirven de primer filtro barato: ordenar cientos de portadas por
+    distancia de Hamming cuesta menos que emparejar ORB con una sola.
+    """
+
+    def __init__(self, cover_cache: CoverCache):
+        self.cover_cache = cover_cache
+        self._hashes: Dict[str, ImageHash] = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> ImageHash:
+        """
+        Huella de la portada de `url`
+
+        Raises:
+            ValueError: Si la portada no se puede descargar o decodificar
+        """
+        key = self.cover_cache.blob_path(url).name
+        with self._lock:
+            if key in self._hashes:
+                return self._hashes[key]
+        data = np.frombuffer(self.cover_cache.get_bytes(url), dtype=np.uint8)
+        image = cv2.imdecode(data, cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError(f"No se pudo decodificar la imagen: {url}")
+        value = image_hash(image)
+        with self._lock:
+            self._hashes[key] = value
+        return value
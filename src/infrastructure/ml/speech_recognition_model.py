@@ -1,14 +1,214 @@
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
 import speech_recognition as sr
 from pathlib import Path
 import logging
 from pydub import AudioSegment
+import numpy as np
+from ..telemetry import get_telemetry
+
+SAMPLE_RATE = 16000
+
+# Variables de entorno para elegir el motor sin tocar el código
+BACKEND_ENV = "BOOKDOWNLOADER_SPEECH_BACKEND"  # google | vosk | whisper
+VOSK_MODEL_ENV = "BOOKDOWNLOADER_VOSK_MODEL"  # carpeta del modelo de Vosk
+WHISPER_MODEL_ENV = "BOOKDOWNLOADER_WHISPER_MODEL"  # tiny, base, small...
+FALLBACK_ENV = "BOOKDOWNLOADER_SPEECH_FALLBACK"  # motor de reserva; vacío = ninguno
+
+
+class SpeechBackend(ABC):
+    """Motor de reconocimiento de voz"""
+    name = "base"
+
+    @abstractmethod
+    def recognize(self, audio: sr.AudioData) -> str:
+        """
+        Transcribe el audio
+
+        Raises:
+            sr.UnknownValueError: Si no se entiende nada
+            sr.RequestError: Si el motor no está disponible
+        """
+
+    def load(self):
+        """Carga el modelo por adelantado (los motores remotos no necesitan nada)"""
+
+
+class GoogleBackend(SpeechBackend):
+    """Servicio web de Google a través de SpeechRecognition (requiere red)"""
+    name = "google"
+
+    def __init__(self, language: str = "es-ES", operation_timeout: float | None = None):
+        self.language = language
+        self.operation_timeout = operation_timeout
+
+    def recognize(self, audio: sr.AudioData) -> str:
+        recognizer = sr.Recognizer()
+        recognizer.operation_timeout = self.operation_timeout
+        return recognizer.recognize_google(audio, language=self.language)
+
+
+class _LocalBackend(SpeechBackend):
+    """Motor local: el modelo se carga la primera vez y se reutiliza en cada llamada"""
 
-class SpeechRecognitionModel:
     def __init__(self):
-        """Initialize speech recognition model"""
-        self.recognizer = sr.Recognizer()
+        self._model = None
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def _load_model(self):
+        pass
+
+    def load(self):
+        with self._lock:
+            if self._model is None:
+                self._model = self._load_model()
+        return self._model
+
+
+class VoskBackend(_LocalBackend):
+    """Vosk (Kaldi) sin conexión; necesita `pip install vosk` y un modelo en español"""
+    name = "vosk"
+
+    def __init__(self, model_path: str | Path | None = None):
+        super().__init__()
+        if model_path is None:
+            from ..cache.paths import default_cache_dir
+            model_path = os.environ.get(VOSK_MODEL_ENV) or default_cache_dir() / "models" / "vosk-model-small-es-0.42"
+        self.model_path = Path(model_path)
+
+    def _load_model(self):
+        try:
+            import vosk
+        except ImportError as e:
+            raise sr.RequestError("Vosk no está instalado: pip install vosk") from e
+        if not self.model_path.is_dir():
+            raise sr.RequestError(f"No se encontró el modelo de Vosk en {self.model_path}")
+        vosk.SetLogLevel(-1)
+        return vosk.Model(str(self.model_path))
+
+    def recognize(self, audio: sr.AudioData) -> str:
+        model = self.load()
+        import vosk
+        # El modelo es compartido; el reconocedor es por llamada
+        recognizer = vosk.KaldiRecognizer(model, SAMPLE_RATE)
+        recognizer.AcceptWaveform(audio.get_raw_data(convert_rate=SAMPLE_RATE, convert_width=2))
+        text = json.loads(recognizer.FinalResult()).get("text", "")
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+
+class WhisperBackend(_LocalBackend):
+    """Whisper de OpenAI sin conexión; necesita `pip install openai-whisper`"""
+    name = "whisper"
+
+    def __init__(self, model_name: str | None = None, language: str = "es"):
+        super().__init__()
+        self.model_name = model_name or os.environ.get(WHISPER_MODEL_ENV, "base")
+        self.language = language
+
+    def _load_model(self):
+        try:
+            import whisper
+        except ImportError as e:
+            raise sr.RequestError("Whisper no está instalado: pip install openai-whisper") from e
+        return whisper.load_model(self.model_name)
+
+    def recognize(self, audio: sr.AudioData) -> str:
+        model = self.load()
+        raw = audio.get_raw_data(convert_rate=SAMPLE_RATE, convert_width=2)
+        samples = np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
+        result = model.transcribe(samples, language=self.language, fp16=False)
+        text = result.get("text", "").strip()
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+
+BACKENDS = {
+    GoogleBackend.name: GoogleBackend,
+    VoskBackend.name: VoskBackend,
+    WhisperBackend.name: WhisperBackend,
+}
+
+
+def create_backend(name: str, operation_timeout: float | None = None) -> SpeechBackend:
+    """Crea un motor por nombre"""
+    if name not in BACKENDS:
+        raise ValueError(f"Motor de reconocimiento desconocido: {name}")
+    if name == GoogleBackend.name:
+        return GoogleBackend(operation_timeout=operation_timeout)
+    return BACKENDS[name]()
+
+
+class SpeechRecognitionModel:
+    def __init__(
+        self,
+        operation_timeout: float | None = None,
+        backend: SpeechBackend | str | None = None,
+        fallback: SpeechBackend | str | None = None
+    ):
+        """
+        Initialize speech recognition model
+
+        Args:
+            operation_timeout: Límite de la petición a motores remotos
+            backend: Motor o nombre de motor; por defecto el de BOOKDOWNLOADER_SPEECH_BACKEND o Google
+            fallback: Motor o nombre de motor a usar si el principal no está
+                disponible (p. ej. falta el modelo local); por defecto el de
+                BOOKDOWNLOADER_SPEECH_FALLBACK o ninguno. Sin él, el error llega
+                al llamador en vez de enviar el audio a un servicio remoto
+        """
+        self.operation_timeout = operation_timeout
         self.logger = logging.getLogger(__name__)
-    
+        if backend is None:
+            backend = os.environ.get(BACKEND_ENV, GoogleBackend.name)
+        if isinstance(backend, str):
+            backend = create_backend(backend, operation_timeout)
+        self.backend = backend
+        if fallback is None:
+            fallback = os.environ.get(FALLBACK_ENV) or None
+        if isinstance(fallback, str):
+            fallback = create_backend(fallback, operation_timeout)
+        self.fallback = fallback
+        self.recognizer = self._new_recognizer()
+
+    def _new_recognizer(self) -> sr.Recognizer:
+        recognizer = sr.Recognizer()
+        # Límite para la petición al servicio de reconocimiento
+        recognizer.operation_timeout = self.operation_timeout
+        return recognizer
+
+    def warm_up(self):
+        """Carga el modelo local, si lo hay, para que la primera transcripción no espere"""
+        try:
+            self.backend.load()
+        except sr.RequestError as e:
+            self.logger.warning(f"Motor {self.backend.name} no disponible: {e}")
+
+    def transcribe_data(self, audio: sr.AudioData) -> str:
+        """
+        Transcribe audio ya cargado en memoria
+
+        Raises:
+            sr.UnknownValueError: Si no se entiende nada
+            sr.RequestError: Si ningún motor está disponible
+        """
+        telemetry = get_telemetry()
+        telemetry.observe("speech_audio_seconds", len(audio.frame_data) / (audio.sample_rate * audio.sample_width))
+        try:
+            with telemetry.span("speech", phase="recognize", backend=self.backend.name):
+                return self.backend.recognize(audio).strip()
+        except sr.RequestError as e:
+            if self.fallback is None:
+                raise sr.RequestError(f"Motor {self.backend.name} no disponible: {e}") from e
+            self.logger.warning(f"Motor {self.backend.name} no disponible ({e}), usando {self.fallback.name}")
+            with telemetry.span("speech", phase="recognize", backend=self.fallback.name):
+                return self.fallback.recognize(audio).strip()
+
     def transcribe_audio(self, audio_path: str | Path) -> str:
         """
         Transcribe audio file to text
@@ -30,17 +230,20 @@ class SpeechRecognitionModel:
             if not audio_path.exists():
                 raise FileNotFoundError(f"No se encontró el archivo de audio: {audio_path}")
 
+            # adjust_for_ambient_noise modifica el recognizer: uno por llamada
+            # para poder transcribir varios clips a la vez desde distintos hilos
+            recognizer = self._new_recognizer()
+
             # Cargar y procesar el audio
-            with sr.AudioFile(str(audio_path)) as source:
+            with get_telemetry().span("speech", phase="load"), sr.AudioFile(str(audio_path)) as source:
                 # Ajustar por ruido ambiental
-                self.recognizer.adjust_for_ambient_noise(source)
+                recognizer.adjust_for_ambient_noise(source)
 
                 # Capturar audio
-                audio = self.recognizer.record(source)
+                audio = recognizer.record(source)
 
-                # Realizar reconocimiento usando Google Speech Recognition
-                text = self.recognizer.recognize_google(audio, language='es-ES')
-                return text.strip()
+            # Realizar reconocimiento con el motor configurado
+            return self.transcribe_data(audio)
 
         except sr.UnknownValueError:
             self.logger.warning(f"No se pudo entender el audio en {audio_path}")
@@ -50,4 +253,4 @@ class SpeechRecognitionModel:
             raise
         except Exception as e:
             self.logger.error(f"Error procesando audio {audio_path}: {str(e)}")
-            raise
\ No newline at end of file
+            raise
@@ -0,0 +1,4 @@
+from .http_client import HttpClient, get_http_client
+from .file_download import AsyncFileWriter, FileDownloader, IncompleteDownloadError
+
+__all__ = ["HttpClient", "get_http_client", "AsyncFileWriter", "FileDownloader", "IncompleteDownloadError"]
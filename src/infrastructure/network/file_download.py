@@ -0,0 +1,475 @@
+import asyncio
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from src.domain.entities.download_status import DownloadStatus
+
+from ..telemetry import get_telemetry
+from .http_client import HttpClient, get_http_client
+from .partial_file import PartialFile, PartialState
+
+ProgressCallback = Callable[[int, int], Awaitable[None]]
+
+MIN_FLUSH_SIZE = 256 * 1024
+MAX_FLUSH_SIZE = 8 * 1024 * 1024
+
+
+class AsyncFileWriter:
+    """
+    Escritura en disco fuera del event loop.
+
+    Los fragmentos recibidos se acumulan en memoria y se escriben en un hilo
+    en bloques grandes. Mientras un bloque se escribe se sigue leyendo de la
+    red (doble búfer). El tamaño del bloque se adapta a la velocidad para
+    hacer unas diez escrituras por segundo.
+    """
+
+    def __init__(
+        self,
+        file_path: str | Path,
+        mode: str = "wb",
+        target_interval: float = 0.1,
+        offset: Optional[int] = None
+    ):
+        self.file_path = Path(file_path)
+        # Con `offset` se escribe en esa posición de un archivo ya existente
+        self.mode = "r+b" if offset is not None else mode
+        self.target_interval = target_interval
+        self.flush_size = MIN_FLUSH_SIZE
+        self.written = 0  # bytes ya escritos en disco
+        self._position = offset
+        self._file = None
+        self._buffer = bytearray()
+        self._pending: Optional[asyncio.Future] = None
+        self._last_flush = 0.0
+
+    async def open(self):
+        buffering = 0 if self._position is not None else -1
+        self._file = await asyncio.to_thread(open, self.file_path, self.mode, buffering)
+        self._last_flush = time.monotonic()
+        return self
+
+    def _write_blocking(self, data: bytearray):
+        if self._position is None:
+            self._file.write(data)
+        elif hasattr(os, "pwrite"):
+            view = memoryview(data)
+            while view:
+                count = os.pwrite(self._file.fileno(), view, self._position)
+                self._position += count
+                view = view[count:]
+        else:  # Windows no tiene pwrite; cada tramo usa su propio descriptor
+            self._file.seek(self._position)
+            self._file.write(data)
+            self._position += len(data)
+        self.written += len(data)
+
+    async def write(self, data: bytes) -> bool:
+        """Añade datos al búfer; devuelve True si se lanzó una escritura a disco"""
+        self._buffer += data
+        if len(self._buffer) < self.flush_size:
+            return False
+        await self._flush()
+        return True
+
+    async def _flush(self):
+        if self._pending is not None:
+            await self._pending
+            self._pending = None
+        if not self._buffer:
+            return
+
+        now = time.monotonic()
+        elapsed = now - self._last_flush
+        if elapsed > 0:
+            rate = len(self._buffer) / elapsed
+            self.flush_size = int(min(max(rate * self.target_interval, MIN_FLUSH_SIZE), MAX_FLUSH_SIZE))
+        self._last_flush = now
+
+        data, self._buffer = self._buffer, bytearray()
+        self._pending = asyncio.ensure_future(asyncio.to_thread(self._write_blocking, data))
+
+    async def aclose(self):
+        """Escribe lo pendiente y cierra el archivo"""
+        if self._file is None:
+            return
+        try:
+            await self._flush()
+            if self._pending is not None:
+                await self._pending
+        finally:
+            self._pending = None
+            await asyncio.to_thread(self._file.close)
+            self._file = None
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+
+class IncompleteDownloadError(Exception):
+    """La conexión terminó antes de recibir el archivo completo"""
+
+
+class RangeNotSupportedError(IncompleteDownloadError):
+    """El servidor anunció rangos pero respondió con el archivo completo"""
+
+
+def _content_range(header: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    """Devuelve (inicio, total) de una cabecera 'bytes inicio-fin/total'"""
+    if not header or not header.startswith("bytes "):
+        return None, None
+    try:
+        span, _, total = header[6:].partition("/")
+        start = int(span.split("-")[0])
+        return start, int(total) if total.isdigit() else None
+    except ValueError:
+        return None, None
+
+
+class FileDownloader:
+    """
+    Descarga de archivos por HTTP sobre el cliente compartido.
+
+    Los datos se escriben en `<destino>.part` y, si la conexión falla, el
+    siguiente intento (o un reinicio de la aplicación) continúa con una
+    petición `Range` validada con If-Range. Al terminar, el archivo se
+    renombra atómicamente a su nombre final.
+
+    Si el servidor anuncia `Accept-Ranges: bytes` y el archivo es grande, se
+    puede dividir en `segments` rangos que se descargan a la vez sobre un
+    archivo preasignado. Varias conexiones solo compensan si el servidor
+    limita cada una: por eso se empieza con una sola y, si tras
+    `probe_seconds` va por debajo de `segment_below` bytes/s, lo que falta
+    se reparte en tramos. Los hosts lentos se recuerdan y sus siguientes
+    descargas empiezan ya por tramos. Con `adaptive=False` los archivos
+    grandes se descargan por tramos desde el principio.
+    """
+
+    def __init__(
+        self,
+        http_client: Optional[HttpClient] = None,
+        read_size: int = 256 * 1024,
+        retries: int = 3,
+        retry_delay: float = 2.0,
+        segments: int = 4,
+        min_segment_size: int = 8 * 1024 * 1024,
+        checkpoint_interval: float = 1.0,
+        adaptive: bool = True,
+        probe_seconds: float = 1.0,
+        segment_below: float = 10 * 1024 * 1024
+    ):
+        self.http_client = http_client or get_http_client()
+        self.read_size = read_size
+        self.segments = segments
+        self.min_segment_size = min_segment_size
+        self.checkpoint_interval = checkpoint_interval
+        self.adaptive = adaptive
+        self.probe_seconds = probe_seconds
+        self.segment_below = segment_below
+        self._throttled_hosts: Set[str] = set()  # hosts cuya conexión única resultó lenta
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.logger = logging.getLogger(__name__)
+
+    async def download(
+        self,
+        url: str,
+        file_path: str | Path,
+        progress_callback: Optional[ProgressCallback] = None,
+        status: Optional[DownloadStatus] = None
+    ) -> str:
+        """
+        Descarga `url` en `file_path`, reanudando si hay una descarga parcial
+
+        Args:
+            url: URL del archivo
+            file_path: Ruta de destino
+            progress_callback: Corrutina que recibe (bytes descargados, total)
+            status: Estado de la descarga donde anotar los bytes reanudados
+
+        Returns:
+            str: Ruta del archivo descargado
+
+        Raises:
+            aiohttp.ClientError: Si falla la conexión o el servidor responde con error
+            IncompleteDownloadError: Si tras los reintentos el archivo sigue incompleto
+        """
+        partial = PartialFile(file_path)
+        attempt = 0
+        allow_segments = self.segments > 1
+        telemetry = get_telemetry()
+        started = time.perf_counter()
+        received = 0  # bytes recibidos en esta sesión, sin contar lo reanudado
+        while True:
+            try:
+                with telemetry.span("download", phase="transfer"):
+                    received += await self._download_once(url, partial, progress_callback, status, allow_segments)
+                await asyncio.to_thread(partial.commit)
+                elapsed = time.perf_counter() - started
+                telemetry.observe("download_bytes", received)
+                if elapsed > 0:
+                    telemetry.observe("download_bytes_per_second", received / elapsed)
+                return str(partial.final_path)
+            except RangeNotSupportedError as e:
+                self.logger.warning("%s; se usa una sola conexión", e)
+                allow_segments = False
+            except (aiohttp.ClientError, asyncio.TimeoutError, IncompleteDownloadError) as e:
+                attempt += 1
+                if attempt > self.retries:
+                    raise
+                self.logger.warning(
+                    "Descarga interrumpida (%s), reintento %d de %d", e, attempt, self.retries
+                )
+                await asyncio.sleep(self.retry_delay * attempt)
+
+    async def _download_once(
+        self,
+        url: str,
+        partial: PartialFile,
+        progress_callback: Optional[ProgressCallback],
+        status: Optional[DownloadStatus],
+        allow_segments: bool
+    ) -> int:
+        """Un intento de descarga; devuelve los bytes recibidos"""
+        state = await asyncio.to_thread(partial.load, url)
+        if state and state.segments:
+            if not allow_segments:
+                await asyncio.to_thread(partial.discard)
+                state = None
+            else:
+                if status and state.offset:
+                    status.record_resume(state.offset)
+                return await self._download_segments(url, partial, state, progress_callback)
+        if state is None and allow_segments and (not self.adaptive or _host(url) in self._throttled_hosts):
+            plan = await self._plan_segments(url, partial)
+            if plan:
+                return await self._download_segments(url, partial, plan, progress_callback)
+
+        headers = {}
+        if state and state.offset > 0:
+            headers["Range"] = f"bytes={state.offset}-"
+            headers["If-Range"] = state.if_range()
+
+        session = self.http_client.session()
+        requested = time.perf_counter()
+        async with session.get(url, headers=headers) as response:
+            get_telemetry().observe("download_ttfb_seconds", time.perf_counter() - requested, mode="single")
+            if response.status == 416 and state:
+                if state.total and state.offset >= state.total:
+                    return 0  # el .part ya estaba completo
+                await asyncio.to_thread(partial.discard)
+                raise IncompleteDownloadError("Rango no válido, se reinicia la descarga")
+            response.raise_for_status()
+
+            length = int(response.headers.get('Content-Length', 0))
+            start, total = _content_range(response.headers.get('Content-Range'))
+            if response.status == 206 and not (state and start == state.offset):
+                await asyncio.to_thread(partial.discard)
+                raise IncompleteDownloadError("El servidor devolvió un rango inesperado")
+            if response.status == 206:
+                offset = state.offset
+                total_size = total or offset + length
+                mode = "ab"
+                if status:
+                    status.record_resume(offset)
+                self.logger.info("Reanudando descarga en el byte %d", offset)
+            else:
+                # El servidor ignoró el rango o el archivo cambió: empezar de cero
+                offset = 0
+                total_size = length
+                mode = "wb"
+                state = PartialState(
+                    url=url,
+                    etag=response.headers.get('ETag', ''),
+                    last_modified=response.headers.get('Last-Modified', ''),
+                    total=total_size
+                )
+                await asyncio.to_thread(partial.save, state)
+
+            downloaded = offset
+            # Medir la conexión única para decidir si conviene pasar a tramos
+            probe_until = None
+            if (
+                allow_segments and self.adaptive
+                and response.headers.get('Accept-Ranges', '').lower() == "bytes"
+                and state.if_range()
+                and total_size - offset >= 2 * self.min_segment_size
+            ):
+                probe_start = time.perf_counter()
+                probe_until = probe_start + self.probe_seconds
+            switch = False
+            try:
+                async with AsyncFileWriter(partial.part_path, mode) as writer:
+                    async for chunk in response.content.iter_chunked(self.read_size):
+                        downloaded += len(chunk)
+                        flushed = await writer.write(chunk)
+                        # Informar del progreso una vez por bloque escrito, no por fragmento
+                        if flushed and progress_callback:
+                            await progress_callback(downloaded, total_size)
+                        if probe_until is not None and time.perf_counter() >= probe_until:
+                            probe_until = None
+                            rate = (downloaded - offset) / (time.perf_counter() - probe_start)
+                            if rate < self.segment_below and total_size - downloaded >= 2 * self.min_segment_size:
+                                self.logger.info("Conexión única a %.1f MB/s: se pasa a tramos", rate / 2**20)
+                                self._throttled_hosts.add(_host(url))
+                                switch = True
+                                break
+            finally:
+                state.offset = partial.size()
+                await asyncio.to_thread(partial.save, state)
+
+            if switch:
+                plan = await self._split_remaining(partial, state)
+                return downloaded - offset + await self._download_segments(url, partial, plan, progress_callback)
+            if total_size and downloaded < total_size:
+                raise IncompleteDownloadError(f"Recibidos {downloaded} de {total_size} bytes")
+            if progress_callback:
+                await progress_callback(downloaded, total_size)
+            return downloaded - offset
+
+    async def _split_remaining(self, partial: PartialFile, state: PartialState) -> PartialState:
+        """Convierte una descarga de una conexión en tramos: lo recibido queda como tramo completo"""
+        done, size = state.offset, state.total
+        count = max(2, min(self.segments, (size - done) // self.min_segment_size))
+        step = (size - done) // count
+        segments = [[0, done - 1, done]] if done else []
+        segments += [
+            [done + i * step, size - 1 if i == count - 1 else done + (i + 1) * step - 1, 0]
+            for i in range(count)
+        ]
+        plan = PartialState(
+            url=state.url, etag=state.etag, last_modified=state.last_modified,
+            offset=done, total=size, segments=segments
+        )
+        await asyncio.to_thread(partial.preallocate, size, True)
+        await asyncio.to_thread(partial.save, plan)
+        return plan
+
+    async def _plan_segments(self, url: str, partial: PartialFile) -> Optional[PartialState]:
+        """Consulta el tamaño con HEAD y reparte el archivo en rangos, si procede"""
+        session = self.http_client.session()
+        try:
+            async with session.head(url, allow_redirects=True) as response:
+                if response.status != 200:
+                    return None
+                accept_ranges = response.headers.get('Accept-Ranges', '').lower()
+                size = int(response.headers.get('Content-Length', 0))
+                etag = response.headers.get('ETag', '')
+                last_modified = response.headers.get('Last-Modified', '')
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            self.logger.debug("HEAD fallido para %s: %s", url, e)
+            return None
+
+        count = min(self.segments, size // self.min_segment_size)
+        if accept_ranges != "bytes" or count < 2:
+            return None
+
+        step = size // count
+        segments = [
+            [i * step, size - 1 if i == count - 1 else (i + 1) * step - 1, 0]
+            for i in range(count)
+        ]
+        state = PartialState(
+            url=url, etag=etag, last_modified=last_modified, total=size, segments=segments
+        )
+        await asyncio.to_thread(partial.preallocate, size)
+        await asyncio.to_thread(partial.save, state)
+        self.logger.info("Descarga en %d tramos de %s", count, url)
+        return state
+
+    async def _download_segments(
+        self,
+        url: str,
+        partial: PartialFile,
+        state: PartialState,
+        progress_callback: Optional[ProgressCallback]
+    ) -> int:
+        """Descarga en paralelo los tramos pendientes sobre el archivo preasignado; devuelve los bytes recibidos"""
+        session = self.http_client.session()
+        total_size = state.total
+        received = [state.segmented_done()]
+        already_done = received[0]
+        telemetry = get_telemetry()
+
+        async def fetch(segment: List[int]):
+            start, end, done = segment
+            if start + done > end:
+                return
+            headers = {"Range": f"bytes={start + done}-{end}"}
+            if state.if_range():
+                headers["If-Range"] = state.if_range()
+            requested = time.perf_counter()
+            async with session.get(url, headers=headers) as response:
+                telemetry.observe("download_ttfb_seconds", time.perf_counter() - requested, mode="segments")
+                response.raise_for_status()
+                range_start, _ = _content_range(response.headers.get('Content-Range'))
+                if response.status != 206 or range_start != start + done:
+                    raise RangeNotSupportedError(f"Respuesta {response.status} a una petición de rango")
+                async with AsyncFileWriter(partial.part_path, offset=start + done) as writer:
+                    try:
+                        async for chunk in response.content.iter_chunked(self.read_size):
+                            received[0] += len(chunk)
+                            flushed = await writer.write(chunk)
+                            segment[2] = done + writer.written
+                            # El progreso es el agregado de todos los tramos
+                            if flushed and progress_callback:
+                                await progress_callback(received[0], total_size)
+                    finally:
+                        await writer.aclose()
+                        segment[2] = done + writer.written
+
+        async def checkpoint():
+            while True:
+                await asyncio.sleep(self.checkpoint_interval)
+                await asyncio.to_thread(partial.save, _snapshot(state))
+
+        saver = asyncio.create_task(checkpoint())
+        tasks = [asyncio.create_task(fetch(segment)) for segment in state.segments]
+        try:
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            for task in done:
+                if task.exception():
+                    raise task.exception()
+        finally:
+            for task in tasks:
+                task.cancel()
+            saver.cancel()
+            # Los tramos cerrados actualizan su progreso al terminar de cancelarse:
+            # hay que esperarlos antes de guardar el estado final
+            await asyncio.gather(*tasks, saver, return_exceptions=True)
+            await asyncio.to_thread(partial.save, _snapshot(state))
+
+        missing = [s for s in state.segments if s[0] + s[2] <= s[1]]
+        if missing:
+            raise IncompleteDownloadError(f"{len(missing)} tramos sin completar")
+        if progress_callback:
+            await progress_callback(total_size, total_size)
+        return received[0] - already_done
+
+
+def _host(url: str) -> str:
+    return urlsplit(url).netloc
+
+
+def _snapshot(state: PartialState) -> PartialState:
+    """Copia del estado para guardarla desde otro hilo"""
+    return PartialState(
+        url=state.url,
+        etag=state.etag,
+        last_modified=state.last_modified,
+        offset=state.segmented_done(),
+        total=state.total,
+        segments=[list(segment) for segment in state.segments]
+    )
@@ -0,0 +1,68 @@
+import asyncio
+import logging
+from typing import Optional
+
+import aiohttp
+
+
+class HttpClient:
+    """
+    Cliente HTTP de larga duración compartido por toda la aplicación.
+
+    Mantiene un único `aiohttp.ClientSession` con conexiones keep-alive y
+    límites globales y por host, para que búsquedas, portadas y descargas
+    reutilicen las conexiones TCP/TLS en lugar de abrir una sesión por
+    petición.
+    """
+
+    def __init__(
+        self,
+        limit: int = 32,
+        limit_per_host: int = 8,
+        keepalive_timeout: float = 60.0,
+        timeout: Optional[aiohttp.ClientTimeout] = None,
+        user_agent: str = "Mozilla/5.0 (compatible; Revistook)"
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout or aiohttp.ClientTimeout(total=None, sock_connect=15, sock_read=60)
+        self.user_agent = user_agent
+        self.logger = logging.getLogger(__name__)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def session(self) -> aiohttp.ClientSession:
+        """Devuelve la sesión compartida, creándola en el event loop actual"""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+                headers={"User-Agent": self.user_agent}
+            )
+            self._loop = loop
+        return self._session
+
+    async def close(self):
+        """Cierra la sesión y sus conexiones"""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+_shared_client: Optional[HttpClient] = None
+
+
+def get_http_client() -> HttpClient:
+    """Cliente HTTP compartido de la aplicación"""
+    global _shared_client
+    if _shared_client is None:
+        _shared_client = HttpClient()
+    return _shared_client
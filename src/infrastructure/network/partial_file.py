@@ -0,0 +1,97 @@
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PartialState:
+    """Metadatos de una descarga a medias, guardados junto al archivo .part"""
+    url: str
+    etag: str = ""
+    last_modified: str = ""
+    offset: int = 0
+    total: int = 0
+    # Descarga por tramos: [inicio, fin, bytes escritos] de cada rango
+    segments: List[List[int]] = field(default_factory=list)
+
+    def segmented_done(self) -> int:
+        return sum(done for _, _, done in self.segments)
+
+    def if_range(self) -> str:
+        """Validador para la cabecera If-Range (las ETag débiles no sirven)"""
+        if self.etag and not self.etag.startswith("W/"):
+            return self.etag
+        return self.last_modified
+
+
+class PartialFile:
+    """
+    Archivo de descarga parcial: `<destino>.part` más el sidecar
+    `<destino>.part.json` con ETag, Last-Modified y bytes recibidos.
+    """
+
+    def __init__(self, file_path: str | Path):
+        self.final_path = Path(file_path)
+        self.part_path = self.final_path.with_name(self.final_path.name + ".part")
+        self.meta_path = self.final_path.with_name(self.final_path.name + ".part.json")
+
+    def size(self) -> int:
+        try:
+            return self.part_path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def load(self, url: str) -> Optional[PartialState]:
+        """Estado guardado para `url`, o None si no se puede reanudar"""
+        if not self.part_path.exists() or not self.meta_path.exists():
+            return None
+        try:
+            state = PartialState(**json.loads(self.meta_path.read_text(encoding="utf-8")))
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning("Sidecar de descarga ilegible %s: %s", self.meta_path, e)
+            return None
+        if state.url != url or not state.if_range():
+            return None
+        if state.segments:
+            # Archivo preasignado: el avance de cada tramo está en el sidecar
+            if self.size() != state.total:
+                return None
+            state.offset = state.segmented_done()
+        else:
+            # Lo escrito en disco manda: el sidecar puede ir por detrás si el proceso murió
+            state.offset = self.size()
+        return state
+
+    def preallocate(self, size: int, keep: bool = False):
+        """
+        Crea el .part con su tamaño final para escribir los tramos en su posición
+
+        Con `keep` se conserva lo ya descargado y solo se alarga el archivo.
+        """
+        with open(self.part_path, "r+b" if keep and self.part_path.exists() else "wb") as f:
+            f.truncate(size)
+
+    def save(self, state: PartialState):
+        tmp_path = self.meta_path.with_name(self.meta_path.name + ".tmp")
+        tmp_path.write_text(json.dumps(asdict(state)), encoding="utf-8")
+        os.replace(tmp_path, self.meta_path)
+
+    def discard(self):
+        for path in (self.part_path, self.meta_path):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def commit(self):
+        """Renombra atómicamente el .part al nombre final y borra el sidecar"""
+        os.replace(self.part_path, self.final_path)
+        try:
+            self.meta_path.unlink()
+        except FileNotFoundError:
+            pass
@@ -1,4 +1,4 @@
 # Importar repositorios concretos
-#from .file_book_repository import FileBookRepository
+from .sqlite_book_repository import SqliteBookRepository
 
-#__all__ = ["FileBookRepository"]
\ No newline at end of file
+__all__ = ["SqliteBookRepository"]
@@ -0,0 +1,149 @@
+import logging
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from src.application.interfaces.book_repository_interface import BookRepositoryInterface
+from src.domain.entities.book import Book
+from src.domain.entities.book_batch import BookBatch
+
+_COLUMNS = "id, title, author, url, cover_url, file_format"
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+class SqliteBookRepository(BookRepositoryInterface):
+    """
+    Catálogo local de libros en SQLite.
+
+    Cada libro encontrado se guarda una sola vez, identificado por su URL;
+    su `id` en el catálogo es el rowid. Un índice FTS5 sobre título y autor
+    (sin distinguir acentos) permite responder búsquedas repetidas sin red.
+    """
+
+    def __init__(self, db_path: str | Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS books (
+                    id INTEGER PRIMARY KEY,
+                    url TEXT NOT NULL UNIQUE,
+                    title TEXT NOT NULL,
+                    author TEXT NOT NULL,
+                    cover_url TEXT NOT NULL,
+                    file_format TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+                CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5(
+                    title, author,
+                    content='books', content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2'
+                );
+                CREATE TRIGGER IF NOT EXISTS books_ai AFTER INSERT ON books BEGIN
+                    INSERT INTO books_fts(rowid, title, author) VALUES (new.id, new.title, new.author);
+                END;
+                CREATE TRIGGER IF NOT EXISTS books_ad AFTER DELETE ON books BEGIN
+                    INSERT INTO books_fts(books_fts, rowid, title, author)
+                    VALUES ('delete', old.id, old.title, old.author);
+                END;
+                CREATE TRIGGER IF NOT EXISTS books_au AFTER UPDATE OF title, author ON books BEGIN
+                    INSERT INTO books_fts(books_fts, rowid, title, author)
+                    VALUES ('delete', old.id, old.title, old.author);
+                    INSERT INTO books_fts(rowid, title, author) VALUES (new.id, new.title, new.author);
+                END;
+                """
+            )
+
+    @staticmethod
+    def _to_book(row) -> Book:
+        return Book(
+            id=str(row[0]),
+            title=row[1],
+            author=row[2],
+            url=row[3],
+            cover_url=row[4],
+            file_format=row[5]
+        )
+
+    def get_all_books(self) -> list[Book]:
+        with self._lock:
+            rows = self._conn.execute(f"SELECT {_COLUMNS} FROM books ORDER BY id").fetchall()
+        return [self._to_book(row) for row in rows]
+
+    def get_book_batch(self) -> BookBatch:
+        """Todo el catálogo en formato columnar, sin crear un Book por fila"""
+        batch = BookBatch()
+        with self._lock:
+            cursor = self._conn.execute(f"SELECT {_COLUMNS} FROM books ORDER BY id")
+            for row in cursor:
+                batch.append_row(*row)
+        return batch
+
+    def get_book_by_id(self, book_id: int) -> Optional[Book]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {_COLUMNS} FROM books WHERE id = ?", (int(book_id),)).fetchone()
+        return self._to_book(row) if row else None
+
+    def save_book(self, book: Book) -> None:
+        self.save_books([book])
+
+    def save_books(self, books: Iterable[Book]) -> None:
+        """Inserta o actualiza (por URL) varios libros en una sola transacción"""
+        now = time.time()
+        rows = [
+            (book.url, book.title, book.author, book.cover_url or "", book.file_format or "", now)
+            for book in books if book.url
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """
+                INSERT INTO books (url, title, author, cover_url, file_format, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    title = excluded.title,
+                    author = excluded.author,
+                    cover_url = excluded.cover_url,
+                    file_format = excluded.file_format,
+                    updated_at = excluded.updated_at
+                """,
+                rows
+            )
+
+    def delete_book(self, book_id: int) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM books WHERE id = ?", (int(book_id),))
+
+    @staticmethod
+    def _match_expression(query: str) -> str:
+        """Convierte la búsqueda del usuario en una consulta FTS5 segura (prefijos con AND)"""
+        return " ".join(f'"{token}"*' for token in _TOKEN.findall(query))
+
+    def search(self, query: str, limit: int = 20) -> List[Book]:
+        """Libros cuyo título o autor contienen todas las palabras de `query`, por relevancia"""
+        expression = self._match_expression(query)
+        if not expression:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT {', '.join('books.' + column for column in _COLUMNS.split(', '))}
+                FROM books_fts JOIN books ON books.id = books_fts.rowid
+                WHERE books_fts MATCH ?
+                ORDER BY bm25(books_fts)
+                LIMIT ?
+                """,
+                (expression, limit)
+            ).fetchall()
+        return [self._to_book(row) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
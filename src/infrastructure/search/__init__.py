@@ -0,0 +1,4 @@
+from .catalog_search import CatalogSearch
+from .trigram_index import TrigramIndex, fold
+
+__all__ = ["CatalogSearch", "TrigramIndex", "fold"]
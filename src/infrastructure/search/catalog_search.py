@@ -0,0 +1,70 @@
+import logging
+import threading
+from dataclasses import replace
+from typing import Dict, Iterable, List
+
+from src.domain.entities.book import Book
+from src.domain.entities.book_batch import BookBatch
+from src.infrastructure.repositories.sqlite_book_repository import SqliteBookRepository
+from .trigram_index import TrigramIndex
+
+
+class CatalogSearch:
+    """
+    Fuente de búsqueda local y tolerante a errores sobre el catálogo.
+
+    Mantiene en memoria un `TrigramIndex` de título y autor de los libros
+    guardados (que viven en un `BookBatch` columnar), así que responde sin
+    red a títulos aproximados, sin acentos o mal transcritos por el
+    reconocimiento de voz. El índice se construye la primera vez que se usa
+    (o con `load()` en segundo plano) y se actualiza con `add_books()`
+    cuando llegan resultados nuevos.
+    """
+
+    def __init__(self, catalog: SqliteBookRepository, min_score: float = 0.6):
+        self.catalog = catalog
+        self.min_score = min_score
+        self.books = BookBatch()
+        self.index: TrigramIndex[int] = TrigramIndex()  # valor: fila de `books`
+        self._rows: Dict[str, int] = {}  # url -> fila de `books`
+        self.logger = logging.getLogger(__name__)
+        self._loaded = False
+        self._load_lock = threading.Lock()
+
+    def load(self):
+        """Indexa todo el catálogo (bloqueante, una sola vez)"""
+        with self._load_lock:
+            if self._loaded:
+                return
+            self.books = self.catalog.get_book_batch()
+            for row, book in enumerate(self.books):
+                self.index.add(book.url, f"{book.title} {book.author}", row)
+                self._rows[book.url] = row
+            self._loaded = True
+            self.logger.info("Catálogo local indexado: %d libros", len(self.books))
+
+    def add_books(self, books: Iterable[Book]):
+        """Añade al índice libros recién guardados en el catálogo (puede llamarse desde otro hilo)"""
+        # Mismo cerrojo que `load()`: si el catálogo se está indexando, esperar a que termine
+        with self._load_lock:
+            if not self._loaded:
+                return  # `load()` los leerá del catálogo
+            for book in books:
+                # Un libro ya indexado reutiliza su fila en lugar de dejarla huérfana
+                row = self._rows.get(book.url)
+                if row is None:
+                    row = self._rows[book.url] = self.books.append(book)
+                else:
+                    self.books.set(row, book)
+                self.index.add(book.url, f"{book.title} {book.author}", row)
+
+    def search(self, query: str, limit: int = 20) -> List[Book]:
+        """
+        Libros del catálogo parecidos a `query`, del más al menos parecido
+
+        Como en la búsqueda remota, el id de cada libro es su posición.
+        """
+        self.load()
+        results = self.index.search(query, limit)
+        rows = [row for score, row in results if score >= self.min_score]
+        return [replace(self.books[row], id=str(position)) for position, row in enumerate(rows)]
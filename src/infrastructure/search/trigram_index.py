@@ -0,0 +1,145 @@
+import math
+import threading
+import unicodedata
+from array import array
+from difflib import SequenceMatcher
+from typing import Dict, Generic, Hashable, List, Set, Tuple, TypeVar
+
+import numpy as np
+
+T = TypeVar("T")
+
+
+def fold(text: str) -> str:
+    """Minúsculas sin acentos ni signos: "Márquez, G." -> "marquez g" """
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    chars = [
+        char if char.isalnum() else " "
+        for char in decomposed
+        if not unicodedata.combining(char)
+    ]
+    return " ".join("".join(chars).split())
+
+
+def trigrams(folded: str) -> Set[str]:
+    """Trigramas de cada palabra, con relleno para que cuenten inicio y final"""
+    grams = set()
+    for word in folded.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex(Generic[T]):
+    """
+    Índice invertido de trigramas para búsqueda aproximada.
+
+    Cada documento es un texto (título y autor) con un valor asociado y una
+    clave única para poder reemplazarlo. Las listas de documentos por
+    trigrama son `array('i')`, que numpy lee sin copiar. Una consulta:
+
+    1. Descarta los trigramas de la consulta demasiado comunes (IDF bajo)
+       y se queda con los `max_query_grams` más informativos.
+    2. Suma con `np.bincount` el IDF de los trigramas compartidos por cada
+       documento: la fracción cubierta de la consulta tolera errores de
+       tecleo y de dictado.
+    3. Reordena los mejores candidatos por parecido de cadena.
+    """
+
+    def __init__(self, max_df: float = 0.2, max_query_grams: int = 16, min_coverage: float = 0.5):
+        self.max_df = max_df
+        self.max_query_grams = max_query_grams
+        self.min_coverage = min_coverage
+        self._postings: Dict[str, array] = {}
+        self._values: List[T] = []
+        self._texts: List[str] = []
+        self._alive = array("b")
+        self._by_key: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._by_key)
+
+    def add(self, key: Hashable, text: str, value: T):
+        """Añade un documento o reemplaza el que tenga la misma clave"""
+        folded = fold(text)
+        with self._lock:
+            previous = self._by_key.get(key)
+            if previous is not None:
+                if self._texts[previous] == folded:
+                    self._values[previous] = value
+                    return
+                self._alive[previous] = 0
+            doc = len(self._values)
+            self._values.append(value)
+            self._texts.append(folded)
+            self._alive.append(1)
+            self._by_key[key] = doc
+            for gram in trigrams(folded):
+                posting = self._postings.get(gram)
+                if posting is None:
+                    posting = self._postings[gram] = array("i")
+                posting.append(doc)
+
+    def remove(self, key: Hashable):
+        with self._lock:
+            doc = self._by_key.pop(key, None)
+            if doc is not None:
+                self._alive[doc] = 0
+
+    def search(self, query: str, limit: int = 20, rerank: int = 100) -> List[Tuple[float, T]]:
+        """Mejores documentos para `query` como (puntuación de 0 a 1, valor)"""
+        folded = fold(query)
+        grams = trigrams(folded)
+        with self._lock:
+            n_docs = len(self._values)
+            if not grams or not n_docs:
+                return []
+
+            weighted = []
+            for gram in grams:
+                df = len(self._postings.get(gram, ()))
+                if df:
+                    weighted.append((math.log(n_docs / df), gram, df))
+            if not weighted:
+                return []
+
+            weighted.sort(reverse=True)
+            # Podar solo compensa en catálogos grandes
+            max_df = max(self.max_df * n_docs, 1000)
+            selected = [item for item in weighted if item[2] <= max_df]
+            if len(selected) < 3:
+                selected = weighted[:3]
+            selected = selected[:self.max_query_grams]
+            # Los trigramas que no aparecen en ningún documento cuentan como
+            # fallos: una consulta con muchos errores cubre menos
+            selected_weight = sum(w for w, _, _ in selected)
+            missing_weight = selected_weight / len(selected) * (len(grams) - len(weighted))
+            total_weight = selected_weight + missing_weight
+            if total_weight <= 0:
+                return []
+
+            docs = np.concatenate([np.frombuffer(self._postings[gram], dtype=np.int32) for _, gram, _ in selected])
+            weights = np.concatenate([
+                np.full(df, w, dtype=np.float32) for w, _, df in selected
+            ])
+            scores = np.bincount(docs, weights=weights, minlength=n_docs)
+            scores *= np.frombuffer(self._alive, dtype=np.int8)
+
+            top = min(rerank, n_docs)
+            candidates = np.argpartition(-scores, top - 1)[:top]
+            candidates = candidates[scores[candidates] > 0]
+            coverage = scores[candidates] / total_weight
+            found = [
+                (float(cov), self._texts[doc], self._values[doc])
+                for doc, cov in zip(candidates.tolist(), coverage.tolist())
+                if cov >= self.min_coverage
+            ]
+
+        ranked = []
+        for cov, text, value in found:
+            # Desempate a igual cobertura: el texto más parecido en conjunto
+            similarity = SequenceMatcher(None, folded, text).ratio()
+            ranked.append((min(1.0, 0.9 * cov + 0.1 * similarity), value))
+        ranked.sort(key=lambda item: item[0], reverse=True)
+        return ranked[:limit]
@@ -0,0 +1,297 @@
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+# Variables de entorno; por defecto la telemetría está apagada
+TELEMETRY_ENV = "BOOKDOWNLOADER_TELEMETRY"  # off | on (solo en memoria) | file | http | file,http
+METRICS_FILE_ENV = "BOOKDOWNLOADER_METRICS_FILE"  # por defecto <caché>/metrics.prom
+METRICS_PORT_ENV = "BOOKDOWNLOADER_METRICS_PORT"  # por defecto 9464
+
+PREFIX = "bookdownloader"
+# Límites (segundos) del histograma de duraciones
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class _NoopSpan:
+    """Tramo que no mide nada: lo que devuelve `span` con la telemetría apagada"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **labels):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """Tramo medido con `perf_counter`; se registra al salir del bloque `with`"""
+    __slots__ = ("telemetry", "name", "labels", "start")
+
+    def __init__(self, telemetry: "Telemetry", name: str, labels: Dict[str, str]):
+        self.telemetry = telemetry
+        self.name = name
+        self.labels = labels
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.labels["outcome"] = "error"
+        self.telemetry.record_span(self.name, time.perf_counter() - self.start, self.labels)
+        return False
+
+    def set(self, **labels):
+        """Añade etiquetas conocidas a mitad del tramo (p. ej. el motor usado)"""
+        self.labels.update(labels)
+
+
+class _Histogram:
+    __slots__ = ("buckets", "count", "total")
+
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        for i, limit in enumerate(BUCKETS):
+            if value <= limit:
+                self.buckets[i] += 1
+                break
+
+
+class _Summary:
+    __slots__ = ("count", "total", "maximum")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        self.maximum = max(self.maximum, value)
+
+
+class Telemetry:
+    """
+    Tramos y métricas de los caminos calientes (búsqueda, descargas, imágenes, voz).
+
+    - `span(nombre, **etiquetas)` mide un bloque `with` y lo acumula en el
+      histograma `bookdownloader_span_seconds` con esas etiquetas.
+    - `observe(nombre, valor, **etiquetas)` acumula un valor suelto
+      (bytes/s, bytes, tiempo hasta el primer byte...) como resumen.
+
+    Todo se guarda agregado en memoria, sin una entrada por evento. Las
+    métricas se exportan en formato de texto de Prometheus a un archivo
+    (`write_metrics`, también periódicamente) o por HTTP en `/metrics`.
+    Desactivada, `span` devuelve un tramo vacío compartido y `observe`
+    vuelve en la primera línea.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._spans: Dict[Tuple[str, LabelKey], _Histogram] = {}
+        self._values: Dict[Tuple[str, LabelKey], _Summary] = {}
+        self._metrics_path: Optional[Path] = None
+        self._stop = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def span(self, name: str, **labels):
+        if not self.enabled:
+            return _NOOP_SPAN
+        return Span(self, name, labels)
+
+    def observe(self, name: str, value: float, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            summary = self._values.get(key)
+            if summary is None:
+                summary = self._values[key] = _Summary()
+            summary.add(value)
+
+    def record_span(self, name: str, seconds: float, labels: Dict[str, str]):
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            histogram = self._spans.get(key)
+            if histogram is None:
+                histogram = self._spans[key] = _Histogram()
+            histogram.add(seconds)
+        self.logger.debug("%s %s: %.1f ms", name, labels, seconds * 1000)
+
+    def reset(self):
+        with self._lock:
+            self._spans.clear()
+            self._values.clear()
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Recuento, suma y media de cada tramo y valor, con sus etiquetas en la clave"""
+        result = {}
+        with self._lock:
+            for (name, labels), histogram in self._spans.items():
+                result[_series(f"span:{name}", labels)] = {
+                    "count": histogram.count,
+                    "sum": histogram.total,
+                    "mean": histogram.total / histogram.count,
+                }
+            for (name, labels), summary in self._values.items():
+                result[_series(name, labels)] = {
+                    "count": summary.count,
+                    "sum": summary.total,
+                    "mean": summary.total / summary.count,
+                    "max": summary.maximum,
+                }
+        return result
+
+    def prometheus_text(self) -> str:
+        """Métricas en el formato de texto de Prometheus"""
+        lines = []
+        with self._lock:
+            if self._spans:
+                metric = f"{PREFIX}_span_seconds"
+                lines.append(f"# HELP {metric} Duración de los tramos instrumentados")
+                lines.append(f"# TYPE {metric} histogram")
+                for (name, labels), histogram in sorted(self._spans.items()):
+                    labels = (("span", name),) + labels
+                    cumulative = 0
+                    for limit, count in zip(BUCKETS, histogram.buckets):
+                        cumulative += count
+                        lines.append(f"{metric}_bucket{_labels(labels + (('le', repr(limit)),))} {cumulative}")
+                    lines.append(f"{metric}_bucket{_labels(labels + (('le', '+Inf'),))} {histogram.count}")
+                    lines.append(f"{metric}_sum{_labels(labels)} {histogram.total:.6f}")
+                    lines.append(f"{metric}_count{_labels(labels)} {histogram.count}")
+            for name in sorted({name for name, _ in self._values}):
+                metric = f"{PREFIX}_{name}"
+                series = [(labels, summary) for (other, labels), summary in sorted(self._values.items()) if other == name]
+                lines.append(f"# TYPE {metric} summary")
+                for labels, summary in series:
+                    lines.append(f"{metric}_sum{_labels(labels)} {summary.total:.6f}")
+                    lines.append(f"{metric}_count{_labels(labels)} {summary.count}")
+                # El máximo no forma parte de un summary: va como gauge aparte
+                lines.append(f"# TYPE {metric}_max gauge")
+                for labels, summary in series:
+                    lines.append(f"{metric}_max{_labels(labels)} {summary.maximum:.6f}")
+        return "\n".join(lines) + "\n"
+
+    def write_metrics(self, path: Optional[str | Path] = None):
+        """Escribe las métricas en `path` (o el archivo configurado) de forma atómica"""
+        path = Path(path) if path is not None else self._metrics_path
+        if path is None:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(self.prometheus_text(), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def export_to_file(self, path: str | Path, interval: float = 10.0):
+        """Reescribe el archivo de métricas cada `interval` segundos y al cerrar"""
+        self._metrics_path = Path(path)
+
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.write_metrics()
+                except OSError as e:
+                    self.logger.warning("No se pudieron escribir las métricas: %s", e)
+
+        self._writer = threading.Thread(target=loop, name="metrics-writer", daemon=True)
+        self._writer.start()
+
+    def serve(self, port: int, host: str = "127.0.0.1"):
+        """Publica las métricas en http://host:port/metrics (solo en local por defecto)"""
+        telemetry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = telemetry.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        self.logger.info("Métricas en http://%s:%d/metrics", host, port)
+
+    def close(self):
+        """Detiene los exportadores y escribe las métricas finales"""
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._metrics_path is not None:
+            try:
+                self.write_metrics()
+            except OSError as e:
+                self.logger.warning("No se pudieron escribir las métricas: %s", e)
+
+
+def _labels(labels: LabelKey) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (key, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+def _series(name: str, labels: LabelKey) -> str:
+    return name + "".join(f",{key}={value}" for key, value in labels)
+
+
+_shared_telemetry: Optional[Telemetry] = None
+
+
+def get_telemetry() -> Telemetry:
+    """
+    Telemetría compartida de la aplicación, configurada con BOOKDOWNLOADER_TELEMETRY
+
+    Con "file" las métricas se escriben en BOOKDOWNLOADER_METRICS_FILE; con
+    "http" se sirven en el puerto BOOKDOWNLOADER_METRICS_PORT.
+    """
+    global _shared_telemetry
+    if _shared_telemetry is None:
+        modes = {mode.strip() for mode in os.environ.get(TELEMETRY_ENV, "off").lower().split(",")}
+        telemetry = Telemetry(enabled=bool(modes & {"file", "http", "on"}))
+        if "file" in modes:
+            from .cache.paths import default_cache_dir
+            telemetry.export_to_file(os.environ.get(METRICS_FILE_ENV) or default_cache_dir() / "metrics.prom")
+        if "http" in modes:
+            try:
+                telemetry.serve(int(os.environ.get(METRICS_PORT_ENV, 9464)))
+            except (OSError, ValueError) as e:
+                telemetry.logger.warning("No se pudo publicar las métricas por HTTP: %s", e)
+        _shared_telemetry = telemetry
+    return _shared_telemetry
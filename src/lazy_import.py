@@ -0,0 +1,30 @@
+from importlib import import_module
+from typing import Callable, Dict, List, Tuple
+
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Tuple[Callable[[str], object], Callable[[], List[str]]]:
+    """
+    `__getattr__` y `__dir__` de módulo (PEP 562) que importan cada nombre
+    exportado la primera vez que se pide.
+
+    Así `from paquete import Nombre` solo carga el submódulo de `Nombre` y
+    no las dependencias pesadas de los demás.
+
+    Args:
+        package: `__name__` del paquete
+        exports: Nombre exportado -> submódulo relativo que lo define
+    """
+    namespace = import_module(package).__dict__
+
+    def __getattr__(name: str):
+        module = exports.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(import_module(module, package), name)
+        namespace[name] = value
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(namespace) | set(exports))
+
+    return __getattr__, __dir__
@@ -0,0 +1,101 @@
+import asyncio
+import time
+from typing import Callable, Dict, Hashable, Optional
+
+
+class ProgressReporter:
+    """
+    Agrupa actualizaciones de progreso en un único refresco de la página.
+
+    Cada descarga registra con `report()` la función que pinta su estado.
+    Las llamadas se acumulan y se pintan juntas como mucho una vez cada
+    `interval` segundos, con un solo `page.update()` para todas. Se ignoran
+    los avances menores que `min_delta` puntos porcentuales salvo que hayan
+    pasado `max_silence` segundos, para que la velocidad y el tiempo
+    restante sigan al día.
+
+    Debe usarse desde el event loop de la página.
+    """
+
+    def __init__(
+        self,
+        page_update: Callable[[], None],
+        interval: float = 0.1,
+        min_delta: float = 1.0,
+        max_silence: float = 1.0
+    ):
+        self.page_update = page_update
+        self.interval = interval
+        self.min_delta = min_delta
+        self.max_silence = max_silence
+        self._dirty: Dict[Hashable, Callable[[], None]] = {}
+        self._last_progress: Dict[Hashable, float] = {}
+        self._last_render: Dict[Hashable, float] = {}
+        self._last_flush = 0.0
+        self._handle: Optional[asyncio.TimerHandle] = None
+
+    def report(
+        self,
+        key: Hashable,
+        render: Callable[[], None],
+        progress: Optional[float] = None,
+        force: bool = False
+    ):
+        """
+        Programa el repintado de `key`
+
+        Args:
+            key: Identificador del elemento (p. ej. el id de la descarga)
+            render: Función que actualiza los controles, sin llamar a page.update()
+            progress: Porcentaje actual, para descartar avances pequeños
+            force: Pintar cuanto antes (cambios de estado)
+        """
+        now = time.monotonic()
+        if not force and progress is not None and key in self._last_progress:
+            small_step = abs(progress - self._last_progress[key]) < self.min_delta
+            recent = now - self._last_render.get(key, 0.0) < self.max_silence
+            if small_step and recent:
+                return
+
+        if progress is not None:
+            self._last_progress[key] = progress
+        self._dirty[key] = render
+        if force:
+            self.flush()
+        elif self._handle is None:
+            delay = max(self.interval - (now - self._last_flush), 0.0)
+            self._handle = asyncio.get_running_loop().call_later(delay, self.flush)
+
+    def flush(self):
+        """Pinta todo lo pendiente con un único refresco de la página"""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, {}
+        now = time.monotonic()
+        for key, render in dirty.items():
+            render()
+            self._last_render[key] = now
+        self._last_flush = now
+        self.page_update()
+
+    def refresh(self):
+        """
+        Refresca la página ya, con lo pendiente si lo hay
+
+        Para controles cambiados directamente, fuera de `report()`: comparten
+        el refresco con las descargas en lugar de pedir otro page.update().
+        """
+        if self._dirty:
+            self.flush()
+        else:
+            self._last_flush = time.monotonic()
+            self.page_update()
+
+    def forget(self, key: Hashable):
+        """Olvida un elemento terminado"""
+        self._dirty.pop(key, None)
+        self._last_progress.pop(key, None)
+        self._last_render.pop(key, None)
@@ -1,35 +1,125 @@
 # src/presentation/views/main_view.py
 import shutil
+import bisect
+import threading
+from functools import cached_property
 
 import flet as ft
 from pathlib import Path
 import os
 from datetime import datetime
 import asyncio
-import sounddevice as sd
-from scipy.io.wavfile import write
-import numpy as np
-from datetime import datetime
-from src.application.services.book_downloaderis import BookDownloader
-from src.application.services.compare_images import CompareImagesService
-from src.application.services.audio_recognition import AudioRecognitionService
-from src.domain.entities.download_status import DownloadStatus, DownloadState
+from src.infrastructure.cache import default_cache_dir
+from src.infrastructure.telemetry import get_telemetry
+from src.presentation.progress_reporter import ProgressReporter
+from src.domain.entities.download_status import DownloadState
+import base64
 import logging
 
+PLACEHOLDER_COVER = "https://png.pngtree.com/png-clipart/20190925/original/pngtree-no-image-vector-illustration-isolated-png-image_4979075.jpg"
+
+
+class lazy_service(cached_property):
+    """
+    Servicio que se construye (e importa sus dependencias) la primera vez que se usa.
+
+    Como `functools.cached_property`, pero con un cerrojo por servicio: la
+    precarga en segundo plano y un manejador de la interfaz pueden pedir el
+    mismo servicio a la vez y solo se construye uno, sin esperar a los demás.
+    """
+
+    def __init__(self, func):
+        super().__init__(func)
+        self._lock = threading.RLock()
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        with self._lock:
+            return super().__get__(instance, owner)
+
 
 class BookDownloaderApp:
-    def __init__(self):
-        self.book_downloader = BookDownloader()
-        self.audio_recognition = AudioRecognitionService()
-        self.compare_images = CompareImagesService()
+    def __init__(
+        self,
+        archive_recordings: bool = True,
+        live_transcription: bool = True,
+        background_warm_up: bool = True
+    ):
+        # Los servicios se construyen al usarlos (ver lazy_service); con
+        # background_warm_up se cargan en segundo plano tras dibujar la ventana
+        self.background_warm_up = background_warm_up
+        self.logger = logging.getLogger(__name__)
         self.page = None
+        self.progress_reporter = ProgressReporter(self.refresh_page)
         self.download_tasks = {}
+        self.search_task = None
+        self.current_results = []
         self.setup_directories()
         self.directory_picker = ft.FilePicker(on_result=self.handle_directory_picked)
         self.download_dir = str(Path.home() / "Downloads")
         self.is_recording = False
         self.recording_filename = None
-        self.audio_data = []
+        # Guardar una copia WAV de cada grabación en audio_dir (en segundo plano)
+        self.archive_recordings = archive_recordings
+        # Transcribir cada frase mientras se graba y buscar al parar
+        self.live_transcription = live_transcription
+        self.transcription = None
+        self.text_before_recording = ""
+
+    @lazy_service
+    def book_downloader(self):
+        from src.application.services.book_downloaderis import BookDownloader
+        return BookDownloader()
+
+    @lazy_service
+    def audio_recognition(self):
+        from src.application.services.audio_recognition import AudioRecognitionService
+        return AudioRecognitionService()
+
+    @lazy_service
+    def compare_images(self):
+        from src.application.services.compare_images import CompareImagesService
+        return CompareImagesService()
+
+    @lazy_service
+    def cover_cache(self):
+        from src.infrastructure.cache import get_cover_cache
+        return get_cover_cache()
+
+    @lazy_service
+    def download_manager(self):
+        from src.application.services.download_manager import DownloadManager
+        return DownloadManager(
+            self.book_downloader,
+            default_cache_dir() / "download_queue.json",
+            on_update=self.on_download_update
+        )
+
+    @lazy_service
+    def recorder(self):
+        from src.infrastructure.audio import RingBufferRecorder
+        return RingBufferRecorder()
+
+    def is_loaded(self, name: str) -> bool:
+        """Si el servicio `name` ya se construyó"""
+        return name in self.__dict__
+
+    async def load_service(self, name: str):
+        """Construye el servicio fuera del event loop si aún no existe"""
+        if self.is_loaded(name):
+            return self.__dict__[name]
+        return await asyncio.to_thread(getattr, self, name)
+
+    async def warm_up(self):
+        """Carga los servicios y precalienta navegador y reconocedor sin bloquear la interfaz"""
+        # Con BOOKDOWNLOADER_TELEMETRY=http el endpoint de métricas queda disponible desde ya
+        get_telemetry()
+        for name in ("book_downloader", "compare_images", "cover_cache", "audio_recognition", "recorder"):
+            await self.load_service(name)
+        if self.page:
+            self.page.run_task(self.book_downloader.warm_up)
+            self.page.run_task(self.audio_recognition.warm_up)
 
     def setup_directories(self):
         """Configura los directorios para guardar imágenes y audios"""
@@ -166,9 +256,32 @@ class BookDownloaderApp:
         )
         page.add(main_content)
 
+        # Con la ventana ya dibujada: reanudar descargas y precargar servicios
+        page.run_task(self.restore_downloads)
+        if self.background_warm_up:
+            page.run_task(self.warm_up)
+
     def on_page_close(self):
         """Maneja el cierre de la página"""
-        self.page = None    
+        if self.page:
+            self.page.run_task(self.shutdown)
+        self.page = None
+
+    async def shutdown(self):
+        """Deja la cola de descargas guardada y libera navegador y conexiones"""
+        # Solo se cierra lo que llegó a construirse
+        if self.is_loaded("download_manager"):
+            await self.download_manager.close()
+        if self.is_loaded("book_downloader"):
+            await self.book_downloader.close()
+        if self.is_loaded("compare_images"):
+            await asyncio.to_thread(self.compare_images.close)
+        if self.transcription is not None:
+            await self.transcription.cancel()
+        if self.is_loaded("audio_recognition"):
+            self.audio_recognition.close()
+        await asyncio.to_thread(get_telemetry().close)
+
     async def handle_image_picked(self, e: ft.FilePickerResultEvent):
         """Maneja la selección de imagen"""
         try:
@@ -193,14 +306,13 @@ class BookDownloaderApp:
                 self.results_list.controls.clear()
                 
                 self.results_list.update()
-                for  book in self.current_results:
-                    result = await self.compare_images.compare_images(image_path, book)
-                    print(f"Comparando con {book.title}: {result}")
-                    if result:
-                        self.results_list.controls.append(self.create_book_card(book))
-                        self.results_list.update()
-                    else:
-                        print(f"El libro {book.title} no coincide con la imagen.")
+                await self.load_service("compare_images")
+                ranking = await self.compare_images.rank(image_path, self.current_results)
+                for match in ranking:
+                    self.logger.info("Comparando con %s: %.2f (%d matches)", match.book.title, match.score, match.matches)
+                    if match.is_match:
+                        self.results_list.controls.append(self.create_book_card(match.book))
+                self.results_list.update()
 
                 
                 self.status_text.value = "Imagen procesada correctamente"
@@ -226,44 +338,55 @@ class BookDownloaderApp:
         
         # Configuración de grabación
         self.recording_filename = datetime.now().strftime("%Y%m%d_%H%M%S") + ".wav"
-        self.audio_data = []
+        self.text_before_recording = self.search_field.value or ""
         
         # Inicia grabación en segundo plano
-        sd.default.samplerate = 16000
-        sd.default.channels = 1
-        sd.default.dtype = 'int16'
-        
-        self.stream = sd.InputStream(callback=self.audio_callback)
-        self.stream.start()
-    def audio_callback(self, indata, frames, time, status):
-        if status:
-            print(status)
-        self.audio_data.append(indata.copy())
-    def stop_recording(self):
+        if self.live_transcription:
+            self.transcription = self.audio_recognition.stream(self.recorder, on_text=self.show_partial_text)
+        else:
+            self.recorder.start()
+
+    async def stop_recording(self):
         self.is_recording = False
         self.record_button.icon = ft.icons.MIC
         self.record_button.text = "Grabar audio"
         self.status_text.value = "Procesando grabación..."
         self.page.update()
         
-        # Detener grabación
-        self.stream.stop()
-        self.stream.close()
-        
-        # Guardar archivo WAV
-        audio_path = Path(self.audio_dir) / self.recording_filename
-        audio_data = np.concatenate(self.audio_data)
-        write(str(audio_path), 16000, audio_data)
-        
-        # Procesar audio
-        asyncio.run_coroutine_threadsafe(
-            self.process_recorded_audio(audio_path),
-            self.page.loop
-        )
-    async def process_recorded_audio(self, audio_path):
+        if self.transcription is None:
+            # Detener grabación y procesar el clip completo
+            samples = await asyncio.to_thread(self.recorder.stop)
+            await self.process_recorded_audio(samples, self.recording_filename)
+            return
+
+        # Casi todo está ya transcrito: solo falta el último segmento
+        transcription, self.transcription = self.transcription, None
+        try:
+            text, samples = await transcription.finish()
+            if self.archive_recordings:
+                self.page.run_task(self.archive_recording, samples, self.recording_filename)
+            self.show_partial_text(text)
+            self.status_text.value = "Grabación procesada correctamente" if text else "No se entendió la grabación"
+        except Exception as ex:
+            self.status_text.value = f"Error procesando grabación: {str(ex)}"
+            text = ""
+        self.page.update()
+        if text:
+            # La búsqueda arranca en cuanto el usuario deja de hablar
+            self.page.run_task(self.search_book, None)
+
+    def show_partial_text(self, text: str):
+        """Muestra en el buscador lo dictado hasta ahora, tras lo que ya hubiera escrito"""
+        before = self.text_before_recording
+        self.search_field.value = f"{before}\n{text}" if before and text else (text or before)
+        self.search_field.update()
+
+    async def process_recorded_audio(self, samples, filename):
         try:
-            # Convertir si es necesario (en este caso ya está en WAV)
-            text = await self.audio_recognition.process_audio(audio_path)
+            if self.archive_recordings:
+                self.page.run_task(self.archive_recording, samples, filename)
+            # El clip va al reconocedor en memoria, sin escribir ni leer el WAV
+            text = await self.audio_recognition.process_audio_data(self.recorder.to_audio_data(samples))
             
             # Actualizar campo de búsqueda
             current_text = self.search_field.value or ""
@@ -273,20 +396,34 @@ class BookDownloaderApp:
             self.status_text.value = f"Error procesando grabación: {str(ex)}"
         finally:
             self.page.update()
-    def toggle_recording(self, e):
+
+    async def archive_recording(self, samples, filename):
+        """Guarda la grabación en audio_dir sin retrasar la transcripción"""
+        from src.infrastructure.audio import save_wav
+        try:
+            await asyncio.to_thread(save_wav, Path(self.audio_dir) / filename, samples, self.recorder.sample_rate)
+        except OSError as e:
+            self.logger.warning(f"No se pudo guardar la grabación {filename}: {e}")
+
+    async def toggle_recording(self, e):
         if not self.is_recording:
+            await self.load_service("audio_recognition")
+            await self.load_service("recorder")
             self.start_recording()
         else:
-            self.stop_recording()
+            await self.stop_recording()
 
     def create_book_card(self, book):
         cover_image = ft.Image(
-            src=book.cover_url if book.cover_url else "https://png.pngtree.com/png-clipart/20190925/original/pngtree-no-image-vector-illustration-isolated-png-image_4979075.jpg",
+            src=PLACEHOLDER_COVER,
             width=100,
             height=150,
             fit=ft.ImageFit.CONTAIN,
             border_radius=5
         )
+        if book.cover_url:
+            # La miniatura sale de la misma caché que usa el filtro por imagen
+            self.page.run_task(self.load_cover, book.cover_url, cover_image)
         
         # Crear contenedor para el estado de la descarga
         download_status = ft.Text(
@@ -306,8 +443,28 @@ class BookDownloaderApp:
         download_button = ft.ElevatedButton(
             "Descargar",
             icon=ft.icons.DOWNLOAD,
-            on_click=lambda e: self.start_download(e, book, progress_bar, download_button, download_status)
+            on_click=lambda e: self.start_download(e, book, widgets)
+        )
+        pause_button = ft.IconButton(
+            icon=ft.icons.PAUSE,
+            tooltip="Pausar",
+            visible=False,
+            on_click=lambda e: self.toggle_pause(widgets)
         )
+        cancel_button = ft.IconButton(
+            icon=ft.icons.CLOSE,
+            tooltip="Cancelar",
+            visible=False,
+            on_click=lambda e: self.download_manager.cancel(widgets["job_id"])
+        )
+        widgets = {
+            "job_id": None,
+            "progress_bar": progress_bar,
+            "download_button": download_button,
+            "pause_button": pause_button,
+            "cancel_button": cancel_button,
+            "download_status": download_status,
+        }
 
         card = ft.Card(
             content=ft.Container(
@@ -318,7 +475,7 @@ class BookDownloaderApp:
                             controls=[
                                 ft.Text(book.title, size=18, weight=ft.FontWeight.BOLD),
                                 ft.Text(book.author, size=14, color=ft.colors.GREY_600),
-                                ft.Row([download_button]),
+                                ft.Row([download_button, pause_button, cancel_button]),
                                 progress_bar,
                                 download_status
                             ],
@@ -333,87 +490,202 @@ class BookDownloaderApp:
             elevation=3
         )
         return card
+    async def load_cover(self, url: str, cover_image: ft.Image):
+        """Carga la portada desde la caché y la pinta en la tarjeta"""
+        try:
+            cover_cache = await self.load_service("cover_cache")
+            data = await asyncio.to_thread(cover_cache.get_bytes, url)
+        except Exception as ex:
+            self.logger.warning("No se pudo cargar la portada %s: %s", url, ex)
+            return
+        cover_image.src = None
+        cover_image.src_base64 = base64.b64encode(data).decode("ascii")
+        if cover_image.page:
+            cover_image.update()
+
     async def search_book(self, e):
         search_term = self.search_field.value
         if not search_term:
             return
 
+        # Una búsqueda nueva cancela la que esté en curso
+        if self.search_task and not self.search_task.done():
+            self.search_task.cancel()
+        self.search_task = asyncio.current_task()
+
         self.progress_bar.visible = True
         self.status_text.value = "Buscando libros..."
+        self.current_results = []
+        self.books_dict = {}
+        self.results_list.controls.clear()
         self.page.update()
 
         try:
-            self.current_results = await self.book_downloader.search(search_term)
-            self.books_dict = {b.id: b for b in self.current_results}
-            self.results_list.controls.clear()
-
-            for book in self.current_results:
-                self.results_list.controls.append(
-                    self.create_book_card(book)
+            await self.load_service("book_downloader")
+            # El catálogo local responde al instante y tolera errores de tecleo
+            # o de dictado; los resultados remotos lo sustituyen al llegar
+            showing_local = await self.show_local_results(search_term)
+            async for book in self.book_downloader.search_iter(search_term):
+                if showing_local:
+                    showing_local = False
+                    self.current_results = []
+                    self.books_dict = {}
+                    self.results_list.controls.clear()
+                # Insertar la tarjeta respetando el orden de la tabla de resultados
+                position = bisect.bisect(
+                    [int(b.id) for b in self.current_results], int(book.id)
                 )
+                self.current_results.insert(position, book)
+                self.books_dict[book.id] = book
+                self.results_list.controls.insert(position, self.create_book_card(book))
+                self.results_list.update()
+                # Los descriptores de la portada quedan listos para filtrar por imagen
+                self.page.run_task(self.index_cover, book)
+            self.status_text.value = ""
+        except asyncio.CancelledError:
+            raise
         except Exception as ex:
             self.status_text.value = f"Error: {str(ex)}"
         finally:
-            self.progress_bar.visible = False
-            self.status_text.value = ""
-            self.page.update()
+            if self.search_task is asyncio.current_task():
+                self.search_task = None
+                self.progress_bar.visible = False
+                self.page.update()
 
-    def start_download(self, e, book, progress_bar, download_button, download_status):
-        """Inicia la descarga de un libro"""
-        status = DownloadStatus(
-            id=str(book.id),
-            state=DownloadState.PENDING
-        )
-        # Deshabilitar el botón durante la descarga
-        download_button.disabled = True
-        self.page.update()
-        self.page.run_task(self.download_book, book, status, progress_bar, download_button, download_status)
+    async def index_cover(self, book):
+        """Indexa la portada de `book`, construyendo el comparador fuera del loop si hace falta"""
+        compare_images = await self.load_service("compare_images")
+        await compare_images.index_covers([book])
 
-    # En main_view.py, actualizar el método de descarga:
-    async def download_book(self, book, status, progress_bar, download_button, download_status):
-        """Descarga un libro y actualiza la UI"""
+    async def show_local_results(self, search_term: str) -> bool:
+        """Muestra las coincidencias del catálogo local; devuelve si había alguna"""
         try:
-            status.state = DownloadState.DOWNLOADING
-            progress_bar.visible = True
-            download_status.visible = True
-            download_status.value = "Iniciando descarga..."
-            
-            self.page.update()
-            
-            download_path = self.download_dir
-            Path(download_path).mkdir(parents=True, exist_ok=True)
-            
-            async def update_progress(current: int, total: int):
-                if total > 0:
-                    progress = current / total
-                    progress_bar.value = progress
-                    download_status.value = f"Descargando... {int(progress * 100)}%"
-                    self.page.update()
-            
-            file_path = await self.book_downloader.download(
-                book, 
-                download_path,
-                progress_callback=update_progress
-            )
-            
-            if file_path:
-                status.complete()
-                download_status.value = "¡Descarga completada!"
-                download_status.color = ft.colors.GREEN
-            else:
-                status.fail("Error en la descarga")
-                download_status.value = "Error en la descarga"
-                download_status.color = ft.colors.RED
-                
+            books = await self.book_downloader.search_local(search_term)
         except Exception as ex:
-            status.fail(str(ex))
-            download_status.value = f"Error: {str(ex)}"
+            self.logger.warning("Búsqueda local fallida: %s", ex)
+            return False
+        if not books:
+            return False
+        self.current_results = list(books)
+        self.books_dict = {book.id: book for book in books}
+        self.results_list.controls.extend(self.create_book_card(book) for book in books)
+        self.status_text.value = "Resultados guardados; buscando en línea..."
+        self.page.update()
+        return True
+
+    def start_download(self, e, book, widgets):
+        """Añade la descarga de un libro a la cola"""
+        # Deshabilitar el botón mientras la descarga esté en la cola
+        widgets["download_button"].disabled = True
+        widgets["download_status"].visible = True
+        widgets["download_status"].value = "En cola..."
+        widgets["download_status"].color = ft.colors.CYAN_600
+        self.page.update()
+
+        job = self.download_manager.enqueue(book, self.download_dir)
+        widgets["job_id"] = job.id
+        self.download_tasks[job.id] = widgets
+
+    def toggle_pause(self, widgets):
+        job = self.download_manager.jobs.get(widgets["job_id"])
+        if not job:
+            return
+        if job.status.state == DownloadState.PAUSED:
+            self.download_manager.resume(job.id)
+        else:
+            self.download_manager.pause(job.id)
+
+    async def restore_downloads(self):
+        """Reanuda las descargas que quedaron pendientes en la sesión anterior"""
+        download_manager = await self.load_service("download_manager")
+        restored = await download_manager.start()
+        if restored and self.page:
+            self.status_text.value = f"Reanudando {len(restored)} descargas pendientes"
+            self.page.update()
+
+    def on_download_update(self, job):
+        """Programa el repintado de la tarjeta del libro según el estado de su descarga"""
+        if not self.page:
+            return
+        widgets = self.download_tasks.get(job.id)
+        status = job.status
+        if widgets is None:
+            # Descarga recuperada de otra sesión: solo se informa al terminar
+            if status.state == DownloadState.COMPLETED:
+                self.status_text.value = f"Descarga completada: {job.book.title}"
+                self.progress_reporter.refresh()
+            return
+
+        # Los cambios de estado se pintan ya; el avance se agrupa y se limita
+        state_changed = widgets.get("state") != status.state
+        widgets["state"] = status.state
+        self.progress_reporter.report(
+            job.id,
+            lambda: self.render_download(job, widgets),
+            progress=status.progress,
+            force=state_changed
+        )
+        if status.is_finished:
+            self.download_tasks.pop(job.id, None)
+            self.progress_reporter.forget(job.id)
+
+    def render_download(self, job, widgets):
+        """Actualiza los controles de la tarjeta (sin refrescar la página)"""
+        status = job.status
+        progress_bar = widgets["progress_bar"]
+        download_status = widgets["download_status"]
+        pause_button = widgets["pause_button"]
+        active = status.state in (DownloadState.PENDING, DownloadState.DOWNLOADING, DownloadState.PAUSED)
+
+        progress_bar.visible = status.state in (DownloadState.DOWNLOADING, DownloadState.PAUSED)
+        progress_bar.value = status.progress / 100
+        pause_button.visible = active
+        pause_button.icon = ft.icons.PLAY_ARROW if status.state == DownloadState.PAUSED else ft.icons.PAUSE
+        pause_button.tooltip = "Reanudar" if status.state == DownloadState.PAUSED else "Pausar"
+        widgets["cancel_button"].visible = active
+        widgets["download_button"].disabled = active
+        download_status.visible = True
+        download_status.color = ft.colors.CYAN_600
+
+        if status.state == DownloadState.PENDING:
+            download_status.value = "En cola..."
+        elif status.state == DownloadState.DOWNLOADING:
+            download_status.value = f"Descargando... {int(status.progress)}%"
+            if status.speed > 0:
+                download_status.value += f" · {self.format_speed(status.speed)}"
+            if status.eta is not None:
+                download_status.value += f" · {self.format_eta(status.eta)} restantes"
+        elif status.state == DownloadState.PAUSED:
+            download_status.value = f"En pausa ({int(status.progress)}%)"
+        elif status.state == DownloadState.COMPLETED:
+            download_status.value = "¡Descarga completada!"
+            download_status.color = ft.colors.GREEN
+        elif status.state == DownloadState.CANCELLED:
+            download_status.value = "Descarga cancelada"
+            download_status.color = ft.colors.GREY_500
+        else:
+            download_status.value = f"Error: {status.error_message}"
             download_status.color = ft.colors.RED
-        finally:
-            progress_bar.visible = False
-            download_button.disabled = False
+
+    @staticmethod
+    def format_speed(bytes_per_second: float) -> str:
+        if bytes_per_second >= 1024 * 1024:
+            return f"{bytes_per_second / (1024 * 1024):.1f} MB/s"
+        return f"{bytes_per_second / 1024:.0f} KB/s"
+
+    @staticmethod
+    def format_eta(seconds: float) -> str:
+        seconds = int(seconds)
+        if seconds >= 3600:
+            return f"{seconds // 3600} h {seconds % 3600 // 60} min"
+        if seconds >= 60:
+            return f"{seconds // 60} min {seconds % 60} s"
+        return f"{seconds} s"
+
+    def refresh_page(self):
+        if self.page:
             self.page.update()
-    
+
     async def safe_update(self):
         """Actualiza la página de forma segura"""
         if self.page and not self.page._close:
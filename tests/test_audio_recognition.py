@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+import speech_recognition as sr
+
+from src.application.services.audio_recognition import AudioRecognitionService
+from src.domain.entities.book import Book
+from src.infrastructure.ml import speech_recognition_model
+from src.infrastructure.ml.speech_recognition_model import SpeechBackend, SpeechRecognitionModel
+
+
+class _MissingBackend(SpeechBackend):
+    name = "missing"
+
+    def recognize(self, audio):
+        raise sr.RequestError("sin modelo")
+
+
+class _FixedBackend(SpeechBackend):
+    name = "fixed"
+
+    def __init__(self, text="hola"):
+        self.text = text
+        self.calls = 0
+
+    def recognize(self, audio):
+        self.calls += 1
+        return self.text
+
+
+def _silence(seconds=0.1):
+    return sr.AudioData(b"\0\0" * int(16000 * seconds), 16000, 2)
+
+
+def test_missing_backend_is_reported_without_fallback(monkeypatch):
+    monkeypatch.delenv(speech_recognition_model.FALLBACK_ENV, raising=False)
+    model = SpeechRecognitionModel(backend=_MissingBackend())
+
+    assert model.fallback is None
+    with pytest.raises(sr.RequestError, match="missing no disponible"):
+        model.transcribe_data(_silence())
+
+
+def test_fallback_is_used_only_when_requested(monkeypatch):
+    monkeypatch.delenv(speech_recognition_model.FALLBACK_ENV, raising=False)
+    fallback = _FixedBackend()
+    model = SpeechRecognitionModel(backend=_MissingBackend(), fallback=fallback)
+
+    assert model.transcribe_data(_silence()) == "hola"
+    assert fallback.calls == 1
+
+
+def test_fallback_can_be_chosen_from_the_environment(monkeypatch):
+    monkeypatch.setenv(speech_recognition_model.FALLBACK_ENV, "google")
+    model = SpeechRecognitionModel(backend=_MissingBackend())
+
+    assert model.fallback.name == "google"
+
+
+def test_service_surfaces_unavailable_backend(monkeypatch):
+    monkeypatch.delenv(speech_recognition_model.FALLBACK_ENV, raising=False)
+
+    async def transcribe():
+        service = AudioRecognitionService(max_workers=1, timeout=5)
+        service.speech_recognizer = SpeechRecognitionModel(backend=_MissingBackend())
+        try:
+            return await service.process_audio_data(_silence())
+        finally:
+            service.close()
+
+    with pytest.raises(sr.RequestError):
+        asyncio.run(transcribe())
+
+
+def test_book_audio_returns_text_in_path_order():
+    book = Book("1", "Título", "Autor", "http://example.org/1", "", "pdf")
+
+    async def transcribe():
+        service = AudioRecognitionService(max_workers=2, timeout=5)
+        service.speech_recognizer.transcribe_audio = lambda path: f"texto de {path}"
+        try:
+            return await service.process_book_audio(book, ["uno.wav", "dos.wav", "tres.wav"])
+        finally:
+            service.close()
+
+    text = asyncio.run(transcribe())
+
+    assert text == "texto de uno.wav\n\ntexto de dos.wav\n\ntexto de tres.wav"
+    assert book == Book("1", "Título", "Autor", "http://example.org/1", "", "pdf")
@@ -0,0 +1,46 @@
+import asyncio
+import json
+
+from src.application.services.download_manager import DownloadManager
+from src.domain.entities.book import Book
+
+
+def _book(index: int) -> Book:
+    return Book(str(index), f"Libro {index}", "Autor", f"http://mirror.example/{index}", "", "pdf")
+
+
+class _IdleDownloader:
+    async def discard_partial(self, book, download_path):
+        pass
+
+
+def test_queue_changes_are_saved_together_off_the_loop(tmp_path):
+    queue_path = tmp_path / "queue.json"
+
+    async def run():
+        # Sin hueco para descargar: los trabajos se quedan en la cola
+        manager = DownloadManager(_IdleDownloader(), queue_path, max_concurrent=0, save_delay=0.05)
+        writes = []
+        write_queue = manager._write_queue
+        manager._write_queue = lambda unfinished: writes.append(len(unfinished)) or write_queue(unfinished)
+        await manager.start()
+
+        jobs = [manager.enqueue(_book(index), str(tmp_path)) for index in range(5)]
+        manager.set_priority(jobs[0].id, 3)
+        manager.pause(jobs[1].id)
+        assert writes == []
+
+        await asyncio.sleep(0.2)
+        assert writes == [5]
+
+        manager.cancel(jobs[2].id)
+        await manager.close()
+        return writes, jobs
+
+    writes, jobs = asyncio.run(run())
+
+    assert writes == [5, 4]
+    saved = {item["id"]: item for item in json.loads(queue_path.read_text(encoding="utf-8"))}
+    assert set(saved) == {jobs[index].id for index in (0, 1, 3, 4)}
+    assert saved[jobs[0].id]["priority"] == 3
+    assert saved[jobs[1].id]["state"] == "paused"
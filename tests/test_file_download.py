@@ -0,0 +1,110 @@
+import asyncio
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.domain.entities.download_status import DownloadState, DownloadStatus
+from src.infrastructure.network import FileDownloader, HttpClient
+
+PAYLOAD = bytes(range(256)) * 4096  # 1 MB
+CUTS = (len(PAYLOAD) // 3, 2 * len(PAYLOAD) // 3)
+
+
+def _flaky_app(requests: list) -> web.Application:
+    """Sirve PAYLOAD y corta la conexión en cada punto de CUTS, una vez cada uno"""
+
+    async def download(request):
+        start = int(request.headers.get("Range", "bytes=0-")[6:].split("-")[0])
+        requests.append(start)
+        cut = next((cut for cut in CUTS if cut > start), len(PAYLOAD))
+        response = web.StreamResponse(status=206 if start else 200, headers={"ETag": '"payload"'})
+        response.content_length = len(PAYLOAD) - start
+        if start:
+            response.headers["Content-Range"] = f"bytes {start}-{len(PAYLOAD) - 1}/{len(PAYLOAD)}"
+        await response.prepare(request)
+        await response.write(PAYLOAD[start:cut])
+        if cut < len(PAYLOAD):
+            # Dar tiempo al cliente a leer lo enviado antes de cortar
+            await asyncio.sleep(0.2)
+            request.transport.close()
+        return response
+
+    app = web.Application()
+    app.router.add_get("/file.bin", download)
+    return app
+
+
+async def _download(app: web.Application, tmp_path, status: DownloadStatus = None, **options) -> str:
+    server = TestServer(app)
+    await server.start_server()
+    http_client = HttpClient()
+    try:
+        downloader = FileDownloader(http_client, retry_delay=0, **options)
+        return await downloader.download(str(server.make_url("/file.bin")), tmp_path / "file.bin", status=status)
+    finally:
+        await http_client.close()
+        await server.close()
+
+
+def test_retries_resume_without_counting_bytes_twice(tmp_path):
+    status = DownloadStatus(id="1", state=DownloadState.DOWNLOADING)
+    requests = []
+
+    path = asyncio.run(_download(_flaky_app(requests), tmp_path, status, segments=1))
+
+    assert (tmp_path / "file.bin").read_bytes() == PAYLOAD
+    assert path == str(tmp_path / "file.bin")
+    # Dos cortes: se reanuda en cada uno, pero solo cuenta el último desplazamiento
+    assert requests == [0, *CUTS]
+    assert status.resumed_bytes == CUTS[-1]
+
+
+def _ranged_app(requests: list) -> web.Application:
+    """Sirve PAYLOAD con soporte de rangos, despacio para que dé tiempo a medir"""
+
+    async def download(request):
+        requests.append(request.headers.get("Range"))
+        start = request.http_range.start or 0
+        end = request.http_range.stop - 1 if request.http_range.stop else len(PAYLOAD) - 1
+        headers = {"Accept-Ranges": "bytes", "ETag": '"payload"', "Content-Length": str(end - start + 1)}
+        status = 206 if request.headers.get("Range") else 200
+        if status == 206:
+            headers["Content-Range"] = f"bytes {start}-{end}/{len(PAYLOAD)}"
+        if request.method == "HEAD":
+            return web.Response(status=status, headers=headers)
+        response = web.StreamResponse(status=status, headers=headers)
+        await response.prepare(request)
+        try:
+            for position in range(start, end + 1, 64 * 1024):
+                await response.write(PAYLOAD[position:min(position + 64 * 1024, end + 1)])
+                await asyncio.sleep(0.01)
+        except ConnectionError:
+            pass
+        return response
+
+    app = web.Application()
+    app.router.add_get("/file.bin", download)
+    return app
+
+
+def test_slow_single_stream_switches_to_segments(tmp_path):
+    requests = []
+
+    asyncio.run(_download(
+        _ranged_app(requests), tmp_path, min_segment_size=64 * 1024, probe_seconds=0.05, segment_below=float("inf")
+    ))
+
+    assert (tmp_path / "file.bin").read_bytes() == PAYLOAD
+    # Primero una conexión sin rango; después, los tramos de lo que faltaba
+    assert requests[0] is None
+    assert len(requests) == 1 + 4
+    assert all(header.startswith("bytes=") for header in requests[1:])
+
+
+def test_fast_single_stream_stays_single(tmp_path):
+    requests = []
+
+    asyncio.run(_download(_ranged_app(requests), tmp_path, min_segment_size=64 * 1024, probe_seconds=0.05, segment_below=0))
+
+    assert (tmp_path / "file.bin").read_bytes() == PAYLOAD
+    assert requests == [None]
@@ -0,0 +1,197 @@
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from benchmarks.libgen_server import book_fields, book_md5, build_app, render_detail, render_search
+from src.application.services.book_downloaderis import BookDownloader
+from src.application.services.libgen_http_search import LibgenHttpSearch
+from src.application.services.libgen_parser import LibgenParseError, parse_detail_page, parse_search_results
+from src.infrastructure.browser.webdriver_pool import WebDriverPool
+from src.infrastructure.cache import SearchCache
+from src.infrastructure.network.http_client import HttpClient
+from src.infrastructure.repositories import SqliteBookRepository
+
+BASE_URL = "https://libgen.is"
+QUERY = "historia de la física"
+
+
+def test_parse_search_results_reads_mirror_and_format():
+    rows = parse_search_results(render_search(QUERY, 5), f"{BASE_URL}/search.php")
+
+    assert len(rows) == 5
+    for i, row in enumerate(rows):
+        fields = book_fields(book_md5(QUERY, i))
+        assert row == {"mirror_url": f"{BASE_URL}/main/{fields['md5']}", "file_format": fields["extension"]}
+
+
+def test_parse_search_results_respects_limit():
+    rows = parse_search_results(render_search(QUERY, 25), f"{BASE_URL}/search.php", limit=20)
+
+    assert len(rows) == 20
+
+
+def test_parse_search_results_without_table():
+    with pytest.raises(LibgenParseError):
+        parse_search_results("<html><body><p>Error</p></body></html>", f"{BASE_URL}/search.php")
+
+
+def test_parse_detail_page_follows_mirror_layout():
+    md5 = book_md5(QUERY, 3)
+    fields = book_fields(md5)
+    page_url = f"{BASE_URL}/main/{md5}"
+
+    detail = parse_detail_page(render_detail(md5), page_url)
+
+    assert detail == {
+        "title": fields["title"],
+        "author": f"Author(s): {fields['author']}",
+        "url": f"{BASE_URL}/get/{md5}.{fields['extension']}",
+        # La portada es la de #info/div[2], no el logo ni el icono del torrent
+        "cover_url": f"{BASE_URL}/covers/{md5}.jpg",
+    }
+
+
+def test_parse_detail_page_cover_outside_second_div():
+    html = '<div id="info"><div><img src="/covers/x.jpg"></div><h1>Libro</h1></div>'
+
+    assert parse_detail_page(html, f"{BASE_URL}/main/x")["cover_url"] == f"{BASE_URL}/covers/x.jpg"
+
+
+def test_parse_detail_page_without_info():
+    with pytest.raises(LibgenParseError):
+        parse_detail_page("<html><body></body></html>", f"{BASE_URL}/main/x")
+
+
+async def _search(tmp_path, query: str, latency: float = 0.0, **options):
+    payload = tmp_path / "payload.bin"
+    payload.write_bytes(b"\0" * 1024)
+    server = TestServer(build_app(payload, latency=latency))
+    await server.start_server()
+    http_client = HttpClient()
+    try:
+        engine = LibgenHttpSearch(base_url=str(server.make_url("")), http_client=http_client, **options)
+        return engine.base_url, await engine.search(query)
+    finally:
+        await http_client.close()
+        await server.close()
+
+
+def test_http_search_against_stand_in_server(tmp_path):
+    base_url, books = asyncio.run(_search(tmp_path, QUERY))
+
+    assert [book.id for book in books] == [str(i) for i in range(20)]
+    for book in books:
+        fields = book_fields(book_md5(QUERY, int(book.id)))
+        assert book.title == fields["title"]
+        assert book.author == f"Author(s): {fields['author']}"
+        assert book.url == f"{base_url}/get/{fields['md5']}.{fields['extension']}"
+        assert book.cover_url == f"{base_url}/covers/{fields['md5']}.jpg"
+        assert book.file_format == fields["extension"]
+
+
+def test_http_search_stops_at_deadline(tmp_path):
+    # Cada respuesta tarda 0.2 s: la página de resultados ya agota el plazo
+    _, books = asyncio.run(_search(tmp_path, QUERY, latency=0.2, deadline=0.1))
+
+    assert books == []
+
+
+async def _search_and_cache(tmp_path, query: str, broken_detail: str = "", latency: float = 0.0, deadline: float = 30.0):
+    """Busca con BookDownloader contra el servidor y dice si el resultado quedó en caché"""
+    @web.middleware
+    async def broken(request, handler):
+        if broken_detail and request.path == f"/main/{broken_detail}":
+            raise web.HTTPInternalServerError()
+        return await handler(request)
+
+    payload = tmp_path / "payload.bin"
+    payload.write_bytes(b"\0" * 1024)
+    app = build_app(payload, latency=latency)
+    app.middlewares.append(broken)
+    server = TestServer(app)
+    await server.start_server()
+    http_client = HttpClient()
+    downloader = BookDownloader(
+        search_cache=SearchCache(tmp_path / "search_cache.sqlite3"),
+        catalog=SqliteBookRepository(tmp_path / "catalog.sqlite3"),
+        http_client=http_client,
+        base_url=str(server.make_url("")).rstrip("/")
+    )
+    downloader.http_search.deadline = deadline
+    try:
+        books = [book async for book in downloader.search_iter(query)]
+        return len(books), downloader.search_cache.get(query, downloader.base_url) is not None
+    finally:
+        await http_client.close()
+        await server.close()
+
+
+def test_complete_search_is_cached(tmp_path):
+    assert asyncio.run(_search_and_cache(tmp_path, QUERY)) == (20, True)
+
+
+def test_search_with_failed_detail_is_not_cached(tmp_path):
+    assert asyncio.run(_search_and_cache(tmp_path, QUERY, broken_detail=book_md5(QUERY, 4))) == (19, False)
+
+
+def test_search_cut_by_deadline_is_not_cached(tmp_path):
+    # 0.1 s por respuesta y 8 detalles a la vez: la primera tanda llega a los 0.2 s, la segunda ya no
+    count, cached = asyncio.run(_search_and_cache(tmp_path, QUERY, latency=0.1, deadline=0.25))
+
+    assert 0 < count < 20
+    assert not cached
+
+
+async def _timed_remote_search(tmp_path, driver_factory, deadline: float, latency: float = 0.0, results_fail: bool = False):
+    """Segundos que tarda BookDownloader.iter_remote y libros que devuelve"""
+    @web.middleware
+    async def failing_results(request, handler):
+        if results_fail and request.path == "/search.php":
+            raise web.HTTPInternalServerError()
+        return await handler(request)
+
+    payload = tmp_path / "payload.bin"
+    payload.write_bytes(b"\0" * 1024)
+    app = build_app(payload, latency=latency)
+    app.middlewares.append(failing_results)
+    server = TestServer(app)
+    await server.start_server()
+    http_client = HttpClient()
+    downloader = BookDownloader(
+        driver_pool=WebDriverPool(size=1, factory=driver_factory),
+        search_cache=SearchCache(tmp_path / "search_cache.sqlite3"),
+        catalog=SqliteBookRepository(tmp_path / "catalog.sqlite3"),
+        http_client=http_client,
+        base_url=str(server.make_url("")).rstrip("/")
+    )
+    downloader.http_search.deadline = deadline
+    try:
+        started = time.perf_counter()
+        books = [book async for book in downloader.iter_remote(QUERY)]
+        return time.perf_counter() - started, books
+    finally:
+        await http_client.close()
+        await server.close()
+
+
+def _slow_browser():
+    time.sleep(1.0)
+    raise RuntimeError("sin navegador en las pruebas")
+
+
+def test_slow_results_page_is_bounded_by_deadline(tmp_path):
+    elapsed, books = asyncio.run(_timed_remote_search(tmp_path, _slow_browser, deadline=0.3, latency=1.0))
+
+    assert books == []
+    assert elapsed < 0.6
+
+
+def test_selenium_fallback_is_bounded_by_deadline(tmp_path):
+    # La página de resultados falla al momento; el navegador tardaría 1 s en arrancar
+    elapsed, books = asyncio.run(_timed_remote_search(tmp_path, _slow_browser, deadline=0.3, results_fail=True))
+
+    assert books == []
+    assert elapsed < 0.6
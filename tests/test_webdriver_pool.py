@@ -0,0 +1,64 @@
+import asyncio
+import time
+
+import pytest
+
+from src.infrastructure.browser.webdriver_pool import WebDriverPool
+
+
+class FakeDriver:
+    current_url = "about:blank"
+
+    def delete_all_cookies(self):
+        pass
+
+    def get(self, url):
+        pass
+
+    def quit(self):
+        pass
+
+
+def slow_factory():
+    time.sleep(0.3)  # arrancar un navegador tarda
+    return FakeDriver()
+
+
+def test_drivers_start_in_parallel_without_holding_the_lock():
+    async def run():
+        pool = WebDriverPool(size=2, factory=slow_factory)
+
+        async def use():
+            async with pool.lease():
+                pass
+
+        started = time.perf_counter()
+        await asyncio.gather(use(), use())
+        elapsed = time.perf_counter() - started
+        await pool.close()
+        return elapsed
+
+    # Con el cerrojo tomado durante el arranque, los dos navegadores irían en serie (0.6 s)
+    assert asyncio.run(run()) < 0.5
+
+
+def test_failed_start_frees_its_slot():
+    attempts = []
+
+    def flaky_factory():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("Chrome no arrancó")
+        return FakeDriver()
+
+    async def run():
+        pool = WebDriverPool(size=1, factory=flaky_factory)
+        with pytest.raises(RuntimeError):
+            async with pool.lease():
+                pass
+        async with pool.lease() as driver:
+            assert isinstance(driver, FakeDriver)
+        await pool.close()
+
+    asyncio.run(run())
+    assert len(attempts) == 2